@@ -2,6 +2,7 @@ from flask import Flask, render_template, request, jsonify, send_file, Response
 from flask_cors import CORS
 import os
 import json
+import atexit
 import config
 from services.translation_service import TranslationService
 from services.vector_db_service import VectorDBService
@@ -16,6 +17,7 @@ CORS(app)
 # 初始化服务
 translation_service = TranslationService()
 vector_db_service = VectorDBService()
+atexit.register(vector_db_service.close)  # 退出前把预写日志中的新增条目写入快照
 terminology_service = TerminologyService()
 evaluation_service = EvaluationService()
 file_handler = FileHandler()
@@ -85,6 +87,10 @@ def translate_stream():
         use_vector_db = data.get('use_vector_db', True)
         use_terminology = data.get('use_terminology', True)
         model = data.get('model', None)
+        multiplex = data.get('multiplex', True)  # 各语言并发流式输出
+        stream_protocol = data.get('stream_protocol', 'delta')  # 'delta' 只发送增量，'full' 附带完整文本
+        frame_size = int(data.get('frame_size', 32))
+        frame_age = float(data.get('frame_age', 0.05))
         
         if not source_text:
             return jsonify({'error': '请输入要翻译的文本'}), 400
@@ -113,7 +119,11 @@ def translate_stream():
                     use_terminology=use_terminology,
                     vector_db_service=vector_db_service,
                     terminology_service=terminology_service,
-                    model=model
+                    model=model,
+                    multiplex=multiplex,
+                    protocol=stream_protocol,
+                    frame_size=frame_size,
+                    frame_age=frame_age
                 ):
                     yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
                 
@@ -465,5 +475,10 @@ def get_models():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/queue', methods=['GET'])
+def get_queue():
+    """获取按模型分组的排队情况"""
+    return jsonify(translation_service.scheduler.get_statistics())
+
 if __name__ == '__main__':
     app.run(debug=config.DEBUG, host='0.0.0.0', port=5555) 
\ No newline at end of file
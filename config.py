@@ -10,12 +10,29 @@ DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
 # Ollama配置
 OLLAMA_HOST = os.getenv('OLLAMA_HOST', 'http://localhost:11434')
 OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'qwen3:0.6b')  # 默认使用qwen3:0.6b
+OLLAMA_NUM_PARALLEL = int(os.getenv('OLLAMA_NUM_PARALLEL', '4'))  # Ollama可同时处理的请求数
+
+# 按模型分组调度：先处理完当前模型的排队请求再切换模型，避免反复换入换出
+SCHEDULER_MAX_BATCH = int(os.getenv('TRANSCODER_SCHEDULER_MAX_BATCH', '32'))  # 有其他模型等待时，当前模型最多连续处理的请求数
+SCHEDULER_MAX_WAIT = float(os.getenv('TRANSCODER_SCHEDULER_MAX_WAIT', '10'))  # 请求最长等待秒数，超时后强制切换
 
 # 向量数据库配置
 EMBEDDING_MODEL = 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'
 VECTOR_DB_PATH = 'data/vector_db'
 TERMINOLOGY_DB_PATH = 'data/terminology'
 
+# 翻译记忆模糊匹配分级：分数 >= 高阈值直接复用译文，>= 中阈值作为完整参考译文，更低则忽略
+TM_HIGH_THRESHOLD = float(os.getenv('TRANSCODER_TM_HIGH', '0.95'))
+TM_MID_THRESHOLD = float(os.getenv('TRANSCODER_TM_MID', '0.75'))
+
+# 翻译记忆持久化：新增条目先追加写入预写日志，后台按时间间隔或新增条数做快照
+TM_SNAPSHOT_INTERVAL = float(os.getenv('TRANSCODER_TM_SNAPSHOT_INTERVAL', '60'))  # 快照间隔秒数
+TM_SNAPSHOT_EVERY = int(os.getenv('TRANSCODER_TM_SNAPSHOT_EVERY', '1000'))  # 累计新增条数达到该值时立即快照
+
+# 翻译记忆批量导入：每批编码一次并整批写入索引，每导入一定条数做一次检查点快照
+TM_IMPORT_BATCH_SIZE = int(os.getenv('TRANSCODER_TM_IMPORT_BATCH_SIZE', '256'))  # 每批编码的条数
+TM_IMPORT_CHECKPOINT_EVERY = int(os.getenv('TRANSCODER_TM_IMPORT_CHECKPOINT_EVERY', '10000'))  # 检查点间隔条数，0表示只在导入结束时快照
+
 # 支持的语言
 SUPPORTED_LANGUAGES = {
     'zh-cn': '中文大陆地区现代文简体',
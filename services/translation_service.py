@@ -2,12 +2,37 @@ import ollama
 from langdetect import detect
 import config
 import json
+from functools import partial
 from typing import List, Dict, Any
+from transcoder.memory import LeverageTiers
+from transcoder.providers import GenerationResult
+from transcoder.scheduler import ModelAffinityScheduler
+from transcoder.streaming import DeltaFramer, multiplex as multiplex_streams
 
 class TranslationService:
     def __init__(self):
         self.client = ollama.Client(host=config.OLLAMA_HOST)
         self.default_model = config.OLLAMA_MODEL
+        # 按模型分组调度请求，避免不同模型交替请求导致Ollama反复加载模型
+        self.scheduler = ModelAffinityScheduler(
+            capacity=config.OLLAMA_NUM_PARALLEL,
+            max_batch=config.SCHEDULER_MAX_BATCH,
+            max_wait=config.SCHEDULER_MAX_WAIT
+        )
+        # 翻译记忆模糊匹配分级
+        self.tm_tiers = LeverageTiers(high=config.TM_HIGH_THRESHOLD, mid=config.TM_MID_THRESHOLD)
+    
+    def _chat(self, model: str, messages: List[Dict], stream: bool = False):
+        """经调度器排队后调用Ollama chat接口"""
+        if stream:
+            return self._chat_stream(model, messages)
+        with self.scheduler.slot(model):
+            return self.client.chat(model=model, messages=messages)
+    
+    def _chat_stream(self, model: str, messages: List[Dict]):
+        """流式调用，在整个流结束前一直占用调度槽位"""
+        with self.scheduler.slot(model):
+            yield from self.client.chat(model=model, messages=messages, stream=True)
         
     def get_available_models(self) -> List[str]:
         """获取可用的Ollama模型列表"""
@@ -130,18 +155,33 @@ class TranslationService:
         terminology_dict = {}
         
         if use_vector_db and vector_db_service:
-            similar_translations = vector_db_service.search_similar_translations(source_text, k=3)
+            similar_translations = vector_db_service.search_similar_translations(source_text, k=3, tiers=self.tm_tiers)
         
         if use_terminology and terminology_service:
             terminology_dict = terminology_service.get_relevant_terms(source_text, source_lang)
         
         # 对每个目标语言进行翻译
         for target_lang in target_langs:
+            tier, best, references = self.tm_tiers.classify(similar_translations.get(target_lang, []), source_text)
+            
+            # 高分匹配直接复用记忆译文，不调用模型
+            if tier == 'high':
+                metrics = self._usage_metrics(None, best['translation'], 0.0)
+                metrics['word_count'] = len(best['translation'].split())
+                results['translations'][target_lang] = {
+                    'text': best['translation'],
+                    'used_terminology': terminology_dict,
+                    'similar_references': [best],
+                    'tm_tier': tier,
+                    'performance_metrics': metrics
+                }
+                continue
+            
             translation_result = self._translate_single_with_metrics(
                 source_text=source_text,
                 source_lang=source_lang,
                 target_lang=target_lang,
-                similar_translations=similar_translations.get(target_lang, []),
+                similar_translations=references,
                 terminology=terminology_dict,
                 model=current_model
             )
@@ -149,7 +189,8 @@ class TranslationService:
             results['translations'][target_lang] = {
                 'text': translation_result['text'],
                 'used_terminology': terminology_dict,
-                'similar_references': similar_translations.get(target_lang, []),
+                'similar_references': references,
+                'tm_tier': tier,
                 'performance_metrics': translation_result['metrics']
             }
         
@@ -159,6 +200,18 @@ class TranslationService:
                          similar_translations: List[Dict], terminology: Dict,
                          model: str) -> str:
         """翻译到单个目标语言"""
+        try:
+            return self._generate_translation(
+                source_text, source_lang, target_lang, similar_translations, terminology, model
+            ).text
+        except Exception as e:
+            print(f"Translation error with model {model}: {e}")
+            return f"Translation failed: {str(e)}"
+    
+    def _generate_translation(self, source_text: str, source_lang: str, target_lang: str,
+                              similar_translations: List[Dict], terminology: Dict,
+                              model: str) -> GenerationResult:
+        """翻译到单个目标语言，返回译文及Ollama报告的token用量"""
         
         # 构建翻译提示
         prompt = self._build_translation_prompt(
@@ -169,31 +222,26 @@ class TranslationService:
             terminology=terminology
         )
         
-        try:
-            response = self.client.chat(
-                model=model,
-                messages=[
-                    {
-                        'role': 'system',
-                        'content': 'You are a professional translator with expertise in multiple languages. Translate accurately while preserving the original meaning, tone, and style.'
-                    },
-                    {
-                        'role': 'user',
-                        'content': prompt
-                    }
-                ]
-            )
-            
-            translation = response['message']['content'].strip()
-            
-            # 清理翻译结果（去除可能的额外标记）
-            translation = self._clean_translation(translation)
-            
-            return translation
-            
-        except Exception as e:
-            print(f"Translation error with model {model}: {e}")
-            return f"Translation failed: {str(e)}"
+        response = self._chat(
+            model=model,
+            messages=[
+                {
+                    'role': 'system',
+                    'content': 'You are a professional translator with expertise in multiple languages. Translate accurately while preserving the original meaning, tone, and style.'
+                },
+                {
+                    'role': 'user',
+                    'content': prompt
+                }
+            ]
+        )
+        
+        generation = GenerationResult.from_ollama(response)
+        
+        # 清理翻译结果（去除可能的额外标记）
+        generation.text = self._clean_translation(generation.text)
+        
+        return generation
     
     def _build_translation_prompt(self, source_text: str, source_lang: str, 
                                  target_lang: str, similar_translations: List[Dict],
@@ -238,8 +286,8 @@ class TranslationService:
         if similar_translations:
             prompt += "Reference translations for similar texts:\n"
             for ref in similar_translations[:3]:
-                prompt += f"- Original: {ref['source'][:100]}...\n"
-                prompt += f"  Translation: {ref['translation'][:100]}...\n"
+                prompt += f"- Original: {ref['source']}\n"
+                prompt += f"  Translation: {ref['translation']}\n"
             prompt += "\n"
         
         # 添加术语表
@@ -339,8 +387,14 @@ class TranslationService:
     def translate_streaming(self, source_text: str, source_lang: str, target_langs: List[str], 
                            use_vector_db: bool = True, use_terminology: bool = True,
                            vector_db_service=None, terminology_service=None,
-                           model: str = None):
-        """执行流式翻译，返回生成器"""
+                           model: str = None, multiplex: bool = False,
+                           protocol: str = 'full', frame_size: int = 32, frame_age: float = 0.05):
+        """执行流式翻译，返回生成器
+        
+        multiplex=True 时所有目标语言并发生成，各语言的事件按到达顺序交错输出（均带 target_lang）
+        protocol='delta' 时 content 事件只携带新增文本及其 offset（不再附带 full_content），
+        细小的 token 会合并为不超过 frame_size 个字符或 frame_age 秒的帧，并定期附带 CRC32 校验值
+        """
         
         # 使用指定的模型或默认模型
         current_model = model if model else self.default_model
@@ -354,11 +408,34 @@ class TranslationService:
         terminology_dict = {}
         
         if use_vector_db and vector_db_service:
-            similar_translations = vector_db_service.search_similar_translations(source_text, k=3)
+            similar_translations = vector_db_service.search_similar_translations(source_text, k=3, tiers=self.tm_tiers)
+            # 流式输出仍由模型生成；低分匹配不作为参考
+            similar_translations = {
+                lang: self.tm_tiers.classify(matches)[2] for lang, matches in similar_translations.items()
+            }
         
         if use_terminology and terminology_service:
             terminology_dict = terminology_service.get_relevant_terms(source_text, source_lang)
         
+        # 多路复用：所有目标语言同时开始流式翻译
+        if multiplex and len(target_langs) > 1:
+            yield from multiplex_streams([
+                partial(
+                    self._translate_single_streaming,
+                    source_text=source_text,
+                    source_lang=source_lang,
+                    target_lang=target_lang,
+                    similar_translations=similar_translations.get(target_lang, []),
+                    terminology=terminology_dict,
+                    model=current_model,
+                    protocol=protocol,
+                    frame_size=frame_size,
+                    frame_age=frame_age
+                )
+                for target_lang in target_langs
+            ])
+            return
+        
         # 对每个目标语言进行流式翻译
         for target_lang in target_langs:
             yield from self._translate_single_streaming(
@@ -367,12 +444,16 @@ class TranslationService:
                 target_lang=target_lang,
                 similar_translations=similar_translations.get(target_lang, []),
                 terminology=terminology_dict,
-                model=current_model
+                model=current_model,
+                protocol=protocol,
+                frame_size=frame_size,
+                frame_age=frame_age
             )
     
     def _translate_single_streaming(self, source_text: str, source_lang: str, target_lang: str,
                                    similar_translations: List[Dict], terminology: Dict,
-                                   model: str):
+                                   model: str, protocol: str = 'full', frame_size: int = 32,
+                                   frame_age: float = 0.05):
         """流式翻译到单个目标语言"""
         
         # 构建翻译提示
@@ -397,7 +478,7 @@ class TranslationService:
             }
             
             # 使用流式API
-            stream = self.client.chat(
+            stream = self._chat(
                 model=model,
                 messages=[
                     {
@@ -415,10 +496,21 @@ class TranslationService:
             full_response = ""
             token_count = 0
             last_time = start_time
+            framer = DeltaFramer(frame_size=frame_size, frame_age=frame_age) if protocol == 'delta' else None
             
+            first_token_time = None
+            generation = None
             for chunk in stream:
+                if chunk.get('done'):
+                    # 最后一个块携带Ollama统计的真实token用量
+                    generation = GenerationResult.from_ollama(chunk, text=full_response)
+                    generation.time_to_first_token = first_token_time
                 if 'message' in chunk and 'content' in chunk['message']:
                     content = chunk['message']['content']
+                    if not content:
+                        continue
+                    if first_token_time is None:
+                        first_token_time = time.time() - start_time
                     full_response += content
                     
                     # 估算token数量（简单按空格和字符数估算）
@@ -430,35 +522,65 @@ class TranslationService:
                     # 计算当前速度
                     tokens_per_second = token_count / elapsed_time if elapsed_time > 0 else 0
                     
-                    # 发送增量内容
+                    if framer is not None:
+                        # 增量协议：只发送新文本，小块合并成帧
+                        frame = framer.push(content)
+                        if frame:
+                            yield {
+                                'type': 'content',
+                                'target_lang': target_lang,
+                                **frame,
+                                'token_count': token_count,
+                                'elapsed_time': elapsed_time,
+                                'tokens_per_second': round(tokens_per_second, 1)
+                            }
+                    else:
+                        # 发送增量内容
+                        yield {
+                            'type': 'content',
+                            'target_lang': target_lang,
+                            'content': content,
+                            'full_content': full_response,
+                            'token_count': token_count,
+                            'elapsed_time': elapsed_time,
+                            'tokens_per_second': round(tokens_per_second, 1)
+                        }
+                    
+                    last_time = current_time
+            
+            if framer is not None:
+                frame = framer.flush(final=True)
+                if frame:
+                    elapsed_time = time.time() - start_time
                     yield {
                         'type': 'content',
                         'target_lang': target_lang,
-                        'content': content,
-                        'full_content': full_response,
+                        **frame,
                         'token_count': token_count,
                         'elapsed_time': elapsed_time,
-                        'tokens_per_second': round(tokens_per_second, 1)
+                        'tokens_per_second': round(token_count / elapsed_time, 1) if elapsed_time > 0 else 0
                     }
-                    
-                    last_time = current_time
             
             # 清理最终结果
             cleaned_translation = self._clean_translation(full_response)
             end_time = time.time()
             total_time = end_time - start_time
-            final_tokens_per_second = token_count / total_time if total_time > 0 else 0
+            metrics = self._usage_metrics(generation, full_response, total_time)
+            if generation is None:
+                metrics['total_tokens'] = token_count
+                metrics['tokens_per_second'] = round(token_count / total_time, 1) if total_time > 0 else 0
             
             # 翻译完成
-            yield {
+            complete_data = {
                 'type': 'complete',
                 'target_lang': target_lang,
                 'final_content': cleaned_translation,
                 'raw_content': full_response,
-                'total_tokens': token_count,
-                'total_time': round(total_time, 2),
-                'tokens_per_second': round(final_tokens_per_second, 1)
+                **metrics
             }
+            if framer is not None:
+                complete_data['checksum'] = f"{framer.checksum:08x}"
+            yield complete_data
             
         except Exception as e:
             print(f"Streaming translation error with model {model}: {e}")
@@ -485,7 +607,7 @@ class TranslationService:
         )
         
         try:
-            response = self.client.chat(
+            response = self._chat(
                 model=current_model,
                 messages=[
                     {
@@ -499,25 +621,16 @@ class TranslationService:
                 ]
             )
             
-            reflection = response['message']['content'].strip()
-            cleaned_reflection = self._clean_reflection(reflection)
+            generation = GenerationResult.from_ollama(response)
+            cleaned_reflection = self._clean_reflection(generation.text)
             
             end_time = time.time()
             total_time = end_time - start_time
             
             # 计算反思的性能指标
-            word_count = len(cleaned_reflection.split())
-            char_count = len(cleaned_reflection)
-            estimated_tokens = word_count + char_count // 4
-            tokens_per_second = estimated_tokens / total_time if total_time > 0 else 0
-            
             return {
                 'reflection': cleaned_reflection,
-                'metrics': {
-                    'tokens_per_second': round(tokens_per_second, 1),
-                    'total_time': round(total_time, 2),
-                    'total_tokens': estimated_tokens
-                }
+                'metrics': self._usage_metrics(generation, cleaned_reflection, total_time)
             }
             
         except Exception as e:
@@ -550,7 +663,7 @@ class TranslationService:
         )
         
         try:
-            response = self.client.chat(
+            response = self._chat(
                 model=current_model,
                 messages=[
                     {
@@ -564,25 +677,16 @@ class TranslationService:
                 ]
             )
             
-            improved_translation = response['message']['content'].strip()
-            cleaned_translation = self._clean_improved_translation(improved_translation)
+            generation = GenerationResult.from_ollama(response)
+            cleaned_translation = self._clean_improved_translation(generation.text)
             
             end_time = time.time()
             total_time = end_time - start_time
             
             # 计算改进的性能指标
-            word_count = len(cleaned_translation.split())
-            char_count = len(cleaned_translation)
-            estimated_tokens = word_count + char_count // 4
-            tokens_per_second = estimated_tokens / total_time if total_time > 0 else 0
-            
             return {
                 'improved_translation': cleaned_translation,
-                'metrics': {
-                    'tokens_per_second': round(tokens_per_second, 1),
-                    'total_time': round(total_time, 2),
-                    'total_tokens': estimated_tokens
-                }
+                'metrics': self._usage_metrics(generation, cleaned_translation, total_time)
             }
             
         except Exception as e:
@@ -802,32 +906,44 @@ The improved translation should address the specific issues mentioned in the fee
         start_time = time.time()
         
         # 翻译
-        translation = self._translate_single(
-            source_text=source_text,
-            source_lang=source_lang,
-            target_lang=target_lang,
-            similar_translations=similar_translations,
-            terminology=terminology,
-            model=model
-        )
-        
-        end_time = time.time()
-        total_time = end_time - start_time
+        generation = None
+        try:
+            generation = self._generate_translation(
+                source_text=source_text,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                similar_translations=similar_translations,
+                terminology=terminology,
+                model=model
+            )
+            translation = generation.text
+        except Exception as e:
+            print(f"Translation error with model {model}: {e}")
+            translation = f"Translation failed: {str(e)}"
         
-        # 计算token数量（简单估算：按空格分割的词数 + 字符数/4）
-        word_count = len(translation.split())
-        char_count = len(translation)
-        estimated_tokens = word_count + char_count // 4
+        total_time = time.time() - start_time
         
-        # 计算tokens/s
-        tokens_per_second = estimated_tokens / total_time if total_time > 0 else 0
+        metrics = self._usage_metrics(generation, translation, total_time)
+        metrics['word_count'] = len(translation.split())
         
         return {
             'text': translation,
-            'metrics': {
-                'tokens_per_second': round(tokens_per_second, 1),
-                'total_time': round(total_time, 2),
-                'total_tokens': estimated_tokens,
-                'word_count': word_count
-            }
+            'metrics': metrics
+        }
+    
+    def _usage_metrics(self, generation, text: str, total_time: float) -> Dict[str, Any]:
+        """根据Ollama返回的真实token计数计算性能指标（预填充/解码速度、首token时间、模型加载时间）
+        
+        Ollama未返回计数时回退到按词数和字符数估算。
+        """
+        usage = generation.metrics(total_time) if generation is not None else {}
+        total_tokens = usage.get('completion_tokens') or len(text.split()) + len(text) // 4
+        tokens_per_second = usage.get('decode_tokens_per_second') or (
+            total_tokens / total_time if total_time > 0 else 0
+        )
+        return {
+            **usage,
+            'tokens_per_second': round(tokens_per_second, 1),
+            'total_time': round(total_time, 2),
+            'total_tokens': total_tokens
         } 
\ No newline at end of file
@@ -1,10 +1,14 @@
 import os
+import json
 import numpy as np
 import faiss
 import pickle
+import threading
 from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import config
+from transcoder.memory import IngestProgress, LeverageTiers, cosine_similarity, edit_ratio, iter_pair_batches
+from transcoder.persistence import PeriodicSnapshot, WriteAheadLog, atomic_write
 
 class VectorDBService:
     def __init__(self):
@@ -12,45 +16,86 @@ class VectorDBService:
         self.index_path = os.path.join(config.VECTOR_DB_PATH, 'faiss_index.bin')
         self.metadata_path = os.path.join(config.VECTOR_DB_PATH, 'metadata.pkl')
         self.dimension = 384  # 多语言模型的维度
+        self._lock = threading.RLock()
+        self._snapshot_lock = threading.Lock()
         
-        # 加载或创建索引
+        # 加载或创建索引，并重放预写日志
         self._load_or_create_index()
+        
+        # 新增条目只追加写入日志，由后台线程定期快照，避免每次新增都重写整个索引和元数据
+        self._snapshots = PeriodicSnapshot(
+            self._save_index,
+            interval=config.TM_SNAPSHOT_INTERVAL,
+            max_pending=config.TM_SNAPSHOT_EVERY
+        )
     
     def _load_or_create_index(self):
-        """加载或创建FAISS索引"""
+        """加载最近的快照（或创建新索引），再重放预写日志中快照之后的新增条目"""
+        os.makedirs(config.VECTOR_DB_PATH, exist_ok=True)
+        self.wal = WriteAheadLog(os.path.join(config.VECTOR_DB_PATH, 'tm.wal'))
+        
         if os.path.exists(self.index_path) and os.path.exists(self.metadata_path):
             # 加载现有索引
             self.index = faiss.read_index(self.index_path)
             with open(self.metadata_path, 'rb') as f:
                 self.metadata = pickle.load(f)
+            # 两个快照文件之间发生崩溃时，用元数据中的向量重建索引
+            if self.index.ntotal != len(self.metadata):
+                self.index = faiss.IndexFlatL2(self.dimension)
+                if self.metadata:
+                    self.index.add(np.array([item['embedding'] for item in self.metadata], dtype=np.float32))
         else:
             # 创建新索引
             self.index = faiss.IndexFlatL2(self.dimension)
             self.metadata = []
+        
+        # 序号小于快照条数的记录已包含在快照中；翻译对已存在的记录来自缩减条目的快照期间的崩溃，同样跳过
+        stored = None
+        for record in self.wal.replay():
+            if stored is None:
+                stored = {self._pair_key(item['source'], item['translations']) for item in self.metadata}
+            key = self._pair_key(record['source'], record['translations'])
+            if record.get('seq', -1) >= len(self.metadata) and key not in stored:
+                self._append(record['source'], record['translations'], record['embedding'])
+                stored.add(key)
+    
+    @staticmethod
+    def _pair_key(source_text: str, translations: Dict[str, str]) -> str:
+        return json.dumps([source_text, translations], sort_keys=True, ensure_ascii=False)
+    
+    def _append(self, source_text: str, translations: Dict[str, str], embedding: List[float]) -> int:
+        """在内存中添加一条翻译记忆（调用方持有锁），返回其序号"""
+        seq = len(self.metadata)
+        self.index.add(np.array([embedding], dtype=np.float32))
+        self.metadata.append({
+            'source': source_text,
+            'translations': translations,
+            'embedding': embedding
+        })
+        return seq
     
     def add_translation_pair(self, source_text: str, translations: Dict[str, str]) -> Dict[str, Any]:
-        """添加翻译对到向量数据库"""
+        """添加翻译对到向量数据库（追加写入预写日志，O(1)磁盘开销）"""
         try:
             # 生成源文本的向量
-            embedding = self.model.encode(source_text)
-            
-            # 添加到索引
-            self.index.add(np.array([embedding]))
+            embedding = self.model.encode(source_text).tolist()
             
-            # 保存元数据
-            self.metadata.append({
-                'source': source_text,
-                'translations': translations,
-                'embedding': embedding.tolist()
-            })
-            
-            # 保存索引和元数据
-            self._save_index()
+            # 添加到索引和元数据，并追加写入日志
+            with self._lock:
+                seq = self._append(source_text, translations, embedding)
+                self.wal.append({
+                    'seq': seq,
+                    'source': source_text,
+                    'translations': translations,
+                    'embedding': embedding
+                })
+                total = len(self.metadata)
+            self._snapshots.mark()
             
             return {
                 'success': True,
                 'message': 'Translation pair added successfully',
-                'total_pairs': len(self.metadata)
+                'total_pairs': total
             }
             
         except Exception as e:
@@ -59,8 +104,69 @@ class VectorDBService:
                 'error': str(e)
             }
     
-    def search_similar_translations(self, query_text: str, k: int = 5) -> Dict[str, List[Dict]]:
-        """搜索相似的翻译"""
+    def _extend(self, pairs: List[Tuple[str, Dict[str, str]]], embeddings: np.ndarray):
+        """在内存中批量添加翻译记忆，整批只调用一次索引添加（调用方持有锁）"""
+        self.index.add(embeddings)
+        for (source_text, translations), embedding in zip(pairs, embeddings.tolist()):
+            self.metadata.append({
+                'source': source_text,
+                'translations': translations,
+                'embedding': embedding
+            })
+    
+    def add_translation_pairs(self, pairs: Iterable, batch_size: int = None, checkpoint_every: Optional[int] = None,
+                              progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """批量添加翻译对：每批只编码一次、写入索引一次
+        
+        pairs 为 (源文本, 译文字典) 元组或 {'source', 'translations'} 条目，按需逐批读取。
+        批量条目不写预写日志，而是每 checkpoint_every 条（默认取配置，0 表示不设检查点）及导入结束时各快照一次，
+        崩溃时最多丢失上个检查点之后的条目。
+        progress 在每批之后以已添加条数、批数、检查点数、耗时和每秒条数调用
+        """
+        batch_size = batch_size or config.TM_IMPORT_BATCH_SIZE
+        if checkpoint_every is None:
+            checkpoint_every = config.TM_IMPORT_CHECKPOINT_EVERY
+        stats = IngestProgress()
+        unsaved = 0
+        try:
+            for batch in iter_pair_batches(pairs, batch_size):
+                sources = [source_text for source_text, _ in batch]
+                embeddings = np.asarray(self.model.encode(sources, batch_size=batch_size), dtype=np.float32)
+                with self._lock:
+                    self._extend(batch, embeddings)
+                stats.add_batch(len(batch))
+                unsaved += len(batch)
+                if checkpoint_every and unsaved >= checkpoint_every:
+                    self.save()
+                    stats.checkpoints += 1
+                    unsaved = 0
+                if progress is not None:
+                    progress(stats.report())
+            if unsaved:
+                self.save()
+                stats.checkpoints += 1
+        except Exception as e:
+            # 已添加但未快照的条目交给后台快照
+            self._snapshots.mark(unsaved)
+            return {
+                'success': False,
+                'error': str(e),
+                **stats.report()
+            }
+        
+        return {
+            'success': True,
+            'message': f'Successfully added {stats.added} translation pairs',
+            'total_pairs': len(self.metadata),
+            **stats.report()
+        }
+    
+    def search_similar_translations(self, query_text: str, k: int = 5, tiers: LeverageTiers = None) -> Dict[str, List[Dict]]:
+        """搜索相似的翻译
+        
+        每条结果附带语义余弦相似度 cosine、字符编辑相似度 edit_ratio 及两者加权的匹配分数 score，按 score 排序
+        """
+        tiers = tiers or LeverageTiers()
         if self.index.ntotal == 0:
             return {}
         
@@ -69,8 +175,9 @@ class VectorDBService:
             query_embedding = self.model.encode(query_text)
             
             # 搜索最相似的k个结果
-            k = min(k, self.index.ntotal)
-            distances, indices = self.index.search(np.array([query_embedding]), k)
+            with self._lock:
+                k = min(k, self.index.ntotal)
+                distances, indices = self.index.search(np.array([query_embedding]), k)
             
             # 组织结果
             results = {}
@@ -78,6 +185,8 @@ class VectorDBService:
                 if idx < len(self.metadata):
                     item = self.metadata[idx]
                     similarity_score = 1 / (1 + distance)  # 转换距离为相似度分数
+                    cosine = cosine_similarity(query_embedding, item['embedding'])
+                    edit = edit_ratio(query_text, item['source'])
                     
                     for lang, translation in item['translations'].items():
                         if lang not in results:
@@ -86,12 +195,15 @@ class VectorDBService:
                         results[lang].append({
                             'source': item['source'],
                             'translation': translation,
-                            'similarity': float(similarity_score)
+                            'similarity': float(similarity_score),
+                            'cosine': round(cosine, 4),
+                            'edit_ratio': round(edit, 4),
+                            'score': tiers.score(cosine, edit)
                         })
             
-            # 按相似度排序
+            # 按匹配分数排序
             for lang in results:
-                results[lang].sort(key=lambda x: x['similarity'], reverse=True)
+                results[lang].sort(key=lambda x: x['score'], reverse=True)
             
             return results
             
@@ -100,46 +212,45 @@ class VectorDBService:
             return {}
     
     def _save_index(self):
-        """保存索引和元数据"""
+        """快照索引和元数据（写临时文件后原子重命名），然后丢弃已包含在快照中的日志记录"""
         os.makedirs(config.VECTOR_DB_PATH, exist_ok=True)
-        faiss.write_index(self.index, self.index_path)
-        with open(self.metadata_path, 'wb') as f:
-            pickle.dump(self.metadata, f)
+        with self._snapshot_lock:
+            # 复制状态的同时把当前日志移到一旁，写快照期间的新增条目仍记录在新日志中
+            with self._lock:
+                index = faiss.clone_index(self.index)
+                metadata = list(self.metadata)
+                self.wal.rotate()
+            
+            def write_metadata(path):
+                with open(path, 'wb') as f:
+                    pickle.dump(metadata, f)
+            
+            atomic_write(self.metadata_path, write_metadata)
+            atomic_write(self.index_path, lambda path: faiss.write_index(index, path))
+            self.wal.discard_rotated()
+    
+    def save(self):
+        """立即快照，不等待后台线程"""
+        self._snapshots.flush(force=True)
     
-    def import_translation_memory(self, file_path: str, format_type: str = 'tmx') -> Dict[str, Any]:
-        """导入翻译记忆库（TMX格式）"""
+    def close(self):
+        """停止后台快照并保存未快照的新增条目"""
+        self._snapshots.stop()
+        self.wal.close()
+    
+    def import_translation_memory(self, file_path: str, format_type: str = 'tmx',
+                                  progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """导入翻译记忆库（TMX格式），逐个读取翻译单元并批量编码入库
+        
+        progress 原样传给 add_translation_pairs，由调用方决定如何报告导入进度
+        """
         try:
             if format_type == 'tmx':
-                # 这里简化处理，实际应该使用专门的TMX解析库
-                # 可以使用translate-toolkit或其他TMX处理库
-                import xml.etree.ElementTree as ET
-                
-                tree = ET.parse(file_path)
-                root = tree.getroot()
-                
-                count = 0
-                for tu in root.findall('.//tu'):
-                    source_text = None
-                    translations = {}
-                    
-                    for tuv in tu.findall('tuv'):
-                        lang = tuv.get('lang') or tuv.get('xml:lang')
-                        seg = tuv.find('seg')
-                        if seg is not None and seg.text:
-                            if source_text is None:
-                                source_text = seg.text
-                            else:
-                                translations[lang] = seg.text
-                    
-                    if source_text and translations:
-                        self.add_translation_pair(source_text, translations)
-                        count += 1
-                
-                return {
-                    'success': True,
-                    'imported': count,
-                    'message': f'Successfully imported {count} translation pairs'
-                }
+                result = self.add_translation_pairs(self._iter_tmx_pairs(file_path), progress=progress)
+                result['imported'] = result['added']
+                if result['success']:
+                    result['message'] = f"Successfully imported {result['added']} translation pairs"
+                return result
             
             return {
                 'success': False,
@@ -152,6 +263,33 @@ class VectorDBService:
                 'error': str(e)
             }
     
+    @staticmethod
+    def _iter_tmx_pairs(file_path: str) -> Iterator[Tuple[str, Dict[str, str]]]:
+        """逐个解析TMX翻译单元（流式读取，不把整个文件载入内存），第一个tuv视为源文本"""
+        # 这里简化处理，实际应该使用专门的TMX解析库
+        # 可以使用translate-toolkit或其他TMX处理库
+        import xml.etree.ElementTree as ET
+        
+        xml_lang = '{http://www.w3.org/XML/1998/namespace}lang'
+        for _, tu in ET.iterparse(file_path):
+            if tu.tag != 'tu':
+                continue
+            source_text = None
+            translations = {}
+            
+            for tuv in tu.findall('tuv'):
+                lang = tuv.get('lang') or tuv.get(xml_lang)
+                seg = tuv.find('seg')
+                if seg is not None and seg.text:
+                    if source_text is None:
+                        source_text = seg.text
+                    else:
+                        translations[lang] = seg.text
+            tu.clear()
+            
+            if source_text and translations:
+                yield source_text, translations
+    
     def export_translation_memory(self, format_type: str = 'tmx') -> str:
         """导出翻译记忆库"""
         try:
@@ -243,11 +381,10 @@ class VectorDBService:
         """删除翻译记忆条目"""
         try:
             if 0 <= index < len(self.metadata):
-                # 删除元数据
-                removed_item = self.metadata.pop(index)
-                
-                # 重建索引（这是一个简化的方法，实际中可能需要更复杂的索引管理）
-                self._rebuild_index()
+                # 删除元数据并重建索引（这是一个简化的方法，实际中可能需要更复杂的索引管理）
+                with self._lock:
+                    removed_item = self.metadata.pop(index)
+                    self._rebuild_index()
                 
                 return {
                     'success': True,
@@ -270,12 +407,13 @@ class VectorDBService:
         """重建FAISS索引"""
         try:
             # 创建新索引
-            self.index = faiss.IndexFlatL2(self.dimension)
-            
-            # 重新添加所有向量
-            if self.metadata:
-                embeddings = np.array([item['embedding'] for item in self.metadata])
-                self.index.add(embeddings)
+            with self._lock:
+                self.index = faiss.IndexFlatL2(self.dimension)
+                
+                # 重新添加所有向量
+                if self.metadata:
+                    embeddings = np.array([item['embedding'] for item in self.metadata], dtype=np.float32)
+                    self.index.add(embeddings)
             
             # 保存索引
             self._save_index()
@@ -315,8 +453,9 @@ class VectorDBService:
     def clear_all(self) -> Dict[str, Any]:
         """清空所有翻译记忆"""
         try:
-            self.metadata = []
-            self.index = faiss.IndexFlatL2(self.dimension)
+            with self._lock:
+                self.metadata = []
+                self.index = faiss.IndexFlatL2(self.dimension)
             self._save_index()
             
             return {
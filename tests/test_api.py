@@ -2,9 +2,12 @@
 Tests for TransCoder API
 """
 
+import asyncio
+
 import pytest
-from transcoder.api import TransCoderAPI
-from transcoder.core import ToolResult
+from transcoder.api import AsyncTransCoderAPI, TransCoderAPI
+from transcoder.core import ToolResult, TranslationService
+from transcoder.providers import AsyncLLMProvider, LLMProvider
 
 
 class TestTransCoderAPI:
@@ -62,6 +65,93 @@ class TestTranslationModes:
         pass
 
 
+class FakeAsyncProvider(LLMProvider, AsyncLLMProvider):
+    """Async provider whose generations can be held open to observe cancellation."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.started = 0
+        self.cancelled = 0
+
+    @property
+    def parallelism(self):
+        return 4
+
+    def generate(self, prompt, model=None, options=None):
+        return "sync"
+
+    async def agenerate(self, prompt, model=None, options=None):
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return "async"
+
+    async def astream(self, prompt, model=None, options=None):
+        yield await self.agenerate(prompt, model)
+
+    async def aget_available_models(self):
+        return ["fake"]
+
+    def get_available_models(self):
+        return ["fake"]
+
+    def is_available(self):
+        return True
+
+
+class TestAsyncTransCoderAPI:
+    """Test the asyncio API surface."""
+
+    @pytest.fixture
+    def provider(self):
+        return FakeAsyncProvider()
+
+    @pytest.fixture
+    def api(self, provider):
+        api = AsyncTransCoderAPI(model="fake")
+        api.translation_service = TranslationService(model="fake", provider=provider)
+        return api
+
+    def test_translate_modes(self, api):
+        """Simple and reflect modes return per-language results."""
+        simple = asyncio.run(api.translate("Hello", "en", ["zh-cn", "ja"]))
+        reflect = asyncio.run(api.translate("Hello", "en", ["zh-cn", "ja"], mode="reflect"))
+
+        assert simple.data["translations"]["ja"]["text"] == "async"
+        assert reflect.data["translations"]["zh-cn"]["iterations"] == 1
+
+    def test_languages_scheduled_concurrently(self, api, provider):
+        """Reflect mode across languages overlaps in time."""
+        provider.delay = 0.1
+
+        async def timed():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            await api.translate("Hello", "en", ["zh-cn", "ja", "ko"], mode="reflect")
+            return loop.time() - start
+
+        # three sequential stages per language; sequential languages would take ~0.9s
+        assert asyncio.run(timed()) < 0.6
+
+    def test_cancellation_propagates_to_provider(self, api, provider):
+        """Cancelling the caller cancels outstanding provider calls."""
+        provider.delay = 10
+
+        async def cancel_midway():
+            task = asyncio.ensure_future(api.translate("Hello", "en", ["zh-cn", "ja"]))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_midway())
+        assert provider.started == 2
+        assert provider.cancelled == 2
+
+
 class TestVectorDB:
     """Test vector database functionality."""
     
@@ -79,6 +169,125 @@ class TestVectorDB:
         pass
 
 
+class FakeMemory:
+    """Translation memory with exact entries and canned fuzzy matches."""
+
+    version = "1"
+
+    def __init__(self, entries, fuzzy=None):
+        from transcoder.memory import ExactMatchIndex
+
+        self.index = ExactMatchIndex()
+        for source, translations in entries.items():
+            self.index.add(source, translations)
+        self.fuzzy = fuzzy or {}
+        self.searches = 0
+
+    def lookup_exact(self, source_text, target_langs=None):
+        return self.index.lookup(source_text, target_langs)
+
+    def search_similar(self, query_text, k=5, tiers=None):
+        self.searches += 1
+        results = {
+            lang: [{**match, "score": tiers.score(match["cosine"], match["edit_ratio"])} for match in matches]
+            for lang, matches in self.fuzzy.items()
+        }
+        return ToolResult(success=True, data={"results": results})
+
+
+class CountingProvider(FakeAsyncProvider):
+    """Records the prompts sent to the model."""
+
+    def __init__(self):
+        super().__init__()
+        self.prompts = []
+
+    def generate(self, prompt, model=None, options=None):
+        self.prompts.append(prompt)
+        return "llm"
+
+
+class TestTranslationMemory:
+    """Exact and fuzzy translation memory leverage."""
+
+    FUZZY = {
+        "de": [{"source": "Hello there", "translation": "Hallo zusammen", "cosine": 0.99, "edit_ratio": 0.96}],
+        "fr": [{"source": "Hello friend", "translation": "Bonjour l'ami", "cosine": 0.9, "edit_ratio": 0.7}],
+        "es": [{"source": "Goodbye", "translation": "Adiós", "cosine": 0.3, "edit_ratio": 0.2}],
+    }
+
+    @pytest.fixture
+    def provider(self):
+        return CountingProvider()
+
+    def make_api(self, api_class, provider, **kwargs):
+        api = api_class(model="fake")
+        api.translation_service = TranslationService(model="fake", provider=provider, **kwargs)
+        api._vector_db = FakeMemory({"Hello": {"ja": "こんにちは", "ko": "안녕하세요"}}, self.FUZZY)
+        return api
+
+    def test_only_missing_languages_sent_to_model(self, provider):
+        api = self.make_api(TransCoderAPI, provider)
+
+        result = api.translate("Hello ", "en", ["ja", "it"], use_vector_db=True)
+
+        assert result.data["translations"]["ja"]["text"] == "こんにちは"
+        assert result.data["translations"]["it"]["text"] == "llm"
+        assert result.metadata["tm"] == {"ja": "exact", "it": "none"}
+        assert len(provider.prompts) == 1
+
+    def test_full_exact_hit_skips_search_and_model(self, provider):
+        api = self.make_api(AsyncTransCoderAPI, provider)
+
+        result = asyncio.run(api.translate("Hello", "en", ["ja", "ko"], use_vector_db=True))
+
+        assert list(result.data["translations"]) == ["ja", "ko"]
+        assert result.data["source_lang"] == "en"
+        assert api._vector_db.searches == 0
+        assert provider.started == 0 and provider.prompts == []
+
+    def test_fuzzy_tiers(self, provider):
+        api = self.make_api(TransCoderAPI, provider)
+
+        result = api.translate("Hello there!", "en", ["de", "fr", "es"], use_vector_db=True)
+
+        translations = result.data["translations"]
+        assert result.metadata["tm"] == {"de": "high", "fr": "mid", "es": "low"}
+        assert translations["de"]["text"] == "Hallo zusammen"
+        assert translations["fr"]["text"] == "llm"
+        assert len(provider.prompts) == 2
+        assert any("Bonjour l'ami" in prompt for prompt in provider.prompts)
+        assert not any("Adiós" in prompt for prompt in provider.prompts)
+
+    def test_high_tier_minimal_edit(self, provider):
+        from transcoder.memory import LeverageTiers
+
+        api = self.make_api(TransCoderAPI, provider, tm_tiers=LeverageTiers(minimal_edit=True))
+
+        result = api.translate("Hello there!", "en", ["de"], use_vector_db=True)
+
+        assert result.data["translations"]["de"]["text"] == "llm"
+        assert result.data["translations"]["de"]["tm_match"] == "high"
+        assert "Hallo zusammen" in provider.prompts[0]
+
+    def test_reflect_mode_reuses_exact_matches(self, provider):
+        api = self.make_api(TransCoderAPI, provider)
+
+        result = api.translate("Hello", "en", ["ja", "it"], mode="reflect", use_vector_db=True)
+
+        assert result.data["translations"]["ja"]["tm_match"] == "exact"
+        assert result.data["translations"]["it"]["iterations"] == 1
+        assert result.metadata["tm"] == {"ja": "exact", "it": "none"}
+
+    def test_ignored_without_vector_db(self, provider):
+        api = self.make_api(TransCoderAPI, provider)
+
+        result = api.translate("Hello", "en", ["ja"])
+
+        assert result.data["translations"]["ja"]["text"] == "llm"
+        assert "tm" not in result.metadata
+
+
 class TestTerminology:
     """Test terminology management."""
     
@@ -0,0 +1,118 @@
+"""
+Tests for the TransCoder translation result cache
+"""
+
+import asyncio
+
+from transcoder.api import AsyncTransCoderAPI, TransCoderAPI
+from transcoder.cache import TranslationCache
+from transcoder.core import TranslationService
+
+from tests.test_core import FakeProvider
+
+
+class TestTranslationCache:
+    """Test the memory and SQLite cache tiers."""
+
+    def test_key_normalizes_source_text(self):
+        """Whitespace and newline variants map to the same key."""
+        key = TranslationCache.make_key("Hello\r\nworld  ", target_lang="ja")
+        assert key == TranslationCache.make_key("  Hello\nworld", target_lang="ja")
+        assert key != TranslationCache.make_key("Hello\nworld", target_lang="ko")
+
+    def test_lru_bound(self):
+        """The memory tier evicts least recently used entries."""
+        cache = TranslationCache(db_path=None, max_entries=2)
+        cache.set("a", {"text": "A"})
+        cache.set("b", {"text": "B"})
+        cache.get("a")
+        cache.set("c", {"text": "C"})
+
+        assert cache.get("b") is None
+        assert cache.get("a") == {"text": "A"}
+
+    def test_sqlite_tier_survives_restart(self, tmp_path):
+        """Results persist across cache instances."""
+        db_path = str(tmp_path / "cache.db")
+        TranslationCache(db_path=db_path).set("k", {"text": "你好"})
+
+        assert TranslationCache(db_path=db_path).get("k") == {"text": "你好"}
+
+
+class TestAPICaching:
+    """Test cache integration in TransCoderAPI.translate."""
+
+    def make_api(self, tmp_path, provider):
+        api = TransCoderAPI(
+            model="fake",
+            terminology_path=str(tmp_path / "terminology"),
+            cache=TranslationCache(db_path=str(tmp_path / "cache.db")),
+        )
+        api.translation_service = TranslationService(model="fake", provider=provider)
+        return api
+
+    def test_repeat_request_is_served_from_cache(self, tmp_path):
+        """Identical requests do not reach the provider twice."""
+        provider = FakeProvider()
+        api = self.make_api(tmp_path, provider)
+
+        first = api.translate("Hello", "en", ["zh-cn", "ja"])
+        second = api.translate("Hello", "en", ["ja", "zh-cn", "ko"])
+
+        assert first.metadata["cache"] == {"zh-cn": "miss", "ja": "miss"}
+        assert second.metadata["cache"] == {"ja": "hit", "zh-cn": "hit", "ko": "miss"}
+        assert list(second.data["translations"]) == ["ja", "zh-cn", "ko"]
+        assert provider.calls == 3
+
+    def test_mode_is_part_of_key(self, tmp_path):
+        """Different modes never share cached results."""
+        provider = FakeProvider()
+        api = self.make_api(tmp_path, provider)
+
+        api.translate("Hello", "en", ["ja"])
+        result = api.translate("Hello", "en", ["ja"], mode="reflect")
+
+        assert result.metadata["cache"] == {"ja": "miss"}
+
+    def test_glossary_change_invalidates(self, tmp_path):
+        """Adding a term changes the key of terminology-aware requests."""
+        provider = FakeProvider()
+        api = self.make_api(tmp_path, provider)
+
+        api.translate("Hello AI", "en", ["ja"], use_terminology=True)
+        assert api.translate("Hello AI", "en", ["ja"], use_terminology=True).metadata["cache"] == {"ja": "hit"}
+
+        api.add_terminology("AI", {"ja": "人工知能"})
+        assert api.translate("Hello AI", "en", ["ja"], use_terminology=True).metadata["cache"] == {"ja": "miss"}
+
+    def test_context_budget_is_part_of_key(self, tmp_path):
+        """Changing the reference and glossary budget changes the key of context-aware requests."""
+        provider = FakeProvider()
+        api = self.make_api(tmp_path, provider)
+
+        api.translate("Hello", "en", ["ja"], use_terminology=True)
+        api.translate("Hello", "en", ["ja"])
+        api.translation_service.context_budget_tokens = 128
+
+        assert api.translate("Hello", "en", ["ja"], use_terminology=True).metadata["cache"] == {"ja": "miss"}
+        assert api.translate("Hello", "en", ["ja"]).metadata["cache"] == {"ja": "hit"}
+
+    def test_errors_are_not_cached(self, tmp_path):
+        """Failed languages are retried on the next request."""
+        provider = FakeProvider(fail_on=["日本語"])
+        api = self.make_api(tmp_path, provider)
+
+        api.translate("Hello", "en", ["ja"])
+        assert api.translate("Hello", "en", ["ja"]).metadata["cache"] == {"ja": "miss"}
+
+    def test_no_target_languages(self, tmp_path):
+        """An empty language list returns no translations instead of raising."""
+        api = self.make_api(tmp_path, FakeProvider())
+        async_api = AsyncTransCoderAPI(model="fake", cache=TranslationCache(db_path=None))
+        async_api.translation_service = api.translation_service
+
+        result = api.translate("Hello", "en", [])
+        async_result = asyncio.run(async_api.translate("Hello", "en", []))
+
+        assert result.success and result.data["translations"] == {}
+        assert async_result.success and async_result.data["translations"] == {}
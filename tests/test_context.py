@@ -0,0 +1,27 @@
+"""
+Tests for TransCoder translation context
+"""
+
+from transcoder.context import TranslationContext, fit_to_budget
+
+
+class TestFitToBudget:
+    """Test trimming of references and terms to a token budget."""
+
+    def test_terms_first_then_references_that_fit(self):
+        references = [
+            {"source": "x" * 200, "translation": "y" * 200},
+            {"source": "Save", "translation": "保存"},
+        ]
+
+        kept_references, kept_terms = fit_to_budget(references, {"file": "ファイル"}, budget_tokens=20)
+
+        assert kept_terms == {"file": "ファイル"}
+        assert kept_references == [references[1]]
+
+    def test_summary_counts_per_language(self):
+        context = TranslationContext(
+            source_lang="en", references={"ja": [{"source": "a", "translation": "b"}]}, terms={"ko": {"a": "b"}}
+        )
+
+        assert context.summary() == {"ja": {"references": 1, "terms": 0}, "ko": {"references": 0, "terms": 1}}
@@ -0,0 +1,673 @@
+"""
+Tests for TransCoder core translation service
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from transcoder.core import TranslationService
+from transcoder.providers import LLMProvider
+from transcoder.thinking import parse_no_think
+
+NO_THINK = parse_no_think("all")
+
+
+class FakeProvider(LLMProvider):
+    """In-process provider that echoes the target language back."""
+
+    def __init__(self, delay: float = 0.0, fail_on=None, parallelism: int = 4):
+        self.delay = delay
+        self.fail_on = fail_on or []
+        self.calls = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._parallelism = parallelism
+        self._lock = threading.Lock()
+
+    @property
+    def parallelism(self) -> int:
+        return self._parallelism
+
+    def generate(self, prompt, model=None, options=None):
+        with self._lock:
+            self.calls += 1
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            time.sleep(self.delay)
+            for marker in self.fail_on:
+                if marker in prompt:
+                    raise RuntimeError(f"backend failed for {marker}")
+            return f"translated:{prompt.splitlines()[0]}"
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def get_available_models(self):
+        return ["fake"]
+
+    def is_available(self):
+        return True
+
+
+class TestConcurrentFanOut:
+    """Test concurrent target-language fan-out."""
+
+    def test_translate_runs_languages_concurrently(self):
+        """Wall time tracks the slowest language, not the sum."""
+        provider = FakeProvider(delay=0.2)
+        service = TranslationService(model="fake", provider=provider)
+
+        start = time.time()
+        result = service.translate("Hello", "en", ["zh-cn", "ja", "ko", "fr"])
+        elapsed = time.time() - start
+
+        assert result.success is True
+        assert elapsed < 0.6
+        assert provider.max_in_flight == 4
+
+    def test_translate_preserves_order_and_errors(self):
+        """Per-language failures are reported without losing ordering."""
+        provider = FakeProvider(fail_on=["日本語"])
+        service = TranslationService(model="fake", provider=provider)
+
+        result = service.translate("Hello", "en", ["zh-cn", "ja", "ko"])
+        translations = result.data["translations"]
+
+        assert list(translations) == ["zh-cn", "ja", "ko"]
+        assert "error" in translations["ja"]
+        assert translations["ko"]["target_lang"] == "ko"
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_max_workers_bounds_pool(self, max_workers):
+        """The worker pool never exceeds max_workers."""
+        provider = FakeProvider(delay=0.05)
+        service = TranslationService(model="fake", provider=provider, max_workers=max_workers)
+
+        service.translate("Hello", "en", ["zh-cn", "ja", "ko", "fr"])
+
+        assert provider.max_in_flight <= max_workers
+
+
+class StreamingProvider(FakeProvider):
+    """Fake provider that streams its answer in fixed pieces."""
+
+    def generate_stream(self, prompt, model=None, options=None):
+        for piece in ("翻译", "：", "你好"):
+            yield piece
+
+
+class TestTranslateStream:
+    """Test token streaming in the core service."""
+
+    def test_stream_event_sequence(self):
+        """Deltas are emitted before the cleaned final text."""
+        service = TranslationService(model="fake", provider=StreamingProvider())
+
+        events = list(service.translate_stream("Hello", "en", ["zh-cn"]))
+
+        assert [e["type"] for e in events] == ["start", "content", "content", "content", "complete"]
+        assert "".join(e["content"] for e in events if e["type"] == "content") == "翻译：你好"
+        assert events[-1]["final_content"] == "你好"
+
+    def test_framed_stream_completes_with_checksum(self):
+        """The complete event carries the checksum of everything framed, even after an exact flush."""
+        import zlib
+
+        service = TranslationService(model="fake", provider=StreamingProvider())
+
+        events = list(service.translate_stream("Hello", "en", ["zh-cn"], frame_size=1))
+
+        content = "".join(e["content"] for e in events if e["type"] == "content")
+        assert events[-1]["checksum"] == f"{zlib.crc32(content.encode('utf-8')):08x}"
+
+    def test_stream_reports_errors_per_language(self):
+        """A failing language yields an error event and the stream continues."""
+        service = TranslationService(model="fake", provider=FakeProvider(fail_on=["日本語"]))
+
+        events = list(service.translate_stream("Hello", "en", ["ja", "ko"]))
+        types = [(e["type"], e["target_lang"]) for e in events]
+
+        assert ("error", "ja") in types
+        assert ("complete", "ko") in types
+
+    def test_multiplexed_stream_interleaves_languages(self):
+        """All languages start streaming before any of them completes."""
+        service = TranslationService(model="fake", provider=FakeProvider(delay=0.1))
+
+        start = time.time()
+        events = list(service.translate_stream("Hello", "en", ["zh-cn", "ja", "ko"], multiplex=True))
+
+        first_complete = next(i for i, e in enumerate(events) if e["type"] == "complete")
+        assert sum(1 for e in events[:first_complete] if e["type"] == "start") == 3
+        assert time.time() - start < 0.25
+
+
+class UsageProvider(FakeProvider):
+    """Fake provider that reports token usage like Ollama."""
+
+    def generate(self, prompt, model=None, options=None):
+        from transcoder.providers import GenerationResult
+
+        return GenerationResult(
+            text=super().generate(prompt, model),
+            prompt_tokens=50,
+            completion_tokens=20,
+            prompt_duration=0.1,
+            completion_duration=0.5,
+            load_duration=2.0,
+            time_to_first_token=2.1,
+        )
+
+
+class TestTokenAccounting:
+    """Test that metadata reports backend token usage."""
+
+    def test_single_translation_metadata(self):
+        """Per-language metadata carries prefill/decode rates and load time."""
+        service = TranslationService(model="fake", provider=UsageProvider())
+
+        result = service.translate_single("Hello", "en", "ja")
+
+        assert result.metadata["prompt_tokens"] == 50
+        assert result.metadata["prefill_tokens_per_second"] == 500.0
+        assert result.metadata["decode_tokens_per_second"] == 40.0
+        assert result.metadata["tokens_per_second"] == 40.0
+        assert result.metadata["time_to_first_token"] == 2.1
+        assert result.metadata["load_time"] == 2.0
+
+    def test_multi_language_totals(self):
+        """translate() keeps per-language metrics and sums token counts."""
+        service = TranslationService(model="fake", provider=UsageProvider())
+
+        result = service.translate("Hello", "en", ["ja", "ko"])
+
+        assert result.data["translations"]["ja"]["metrics"]["completion_tokens"] == 20
+        assert result.metadata["prompt_tokens"] == 100
+        assert result.metadata["completion_tokens"] == 40
+
+    def test_reflection_totals(self):
+        """Reflection mode sums usage over every generation."""
+        service = TranslationService(model="fake", provider=UsageProvider())
+
+        result = service.translate_with_reflection("Hello", "en", "ja", iterations=2)
+
+        assert result.metadata["completion_tokens"] == 20 * 5
+
+    def test_plain_string_providers_fall_back_to_estimate(self):
+        """Providers returning strings still produce a tokens/s figure."""
+        service = TranslationService(model="fake", provider=FakeProvider())
+
+        result = service.translate_single("Hello", "en", "ja")
+
+        assert result.metadata["prompt_tokens"] is None
+        assert result.metadata["tokens_per_second"] >= 0
+
+
+class OptionsProvider(FakeProvider):
+    """Fake provider that records options and stops at ``max_tokens`` like a real backend."""
+
+    def __init__(self, output_tokens: int = 10, **kwargs):
+        super().__init__(**kwargs)
+        self.output_tokens = output_tokens
+        self.options = []
+
+    def generate(self, prompt, model=None, options=None):
+        from transcoder.providers import GenerationResult
+
+        self.options.append(options)
+        limit = options.max_tokens if options and options.max_tokens else self.output_tokens
+        tokens = min(self.output_tokens, limit)
+        return GenerationResult(
+            text="x " * tokens,
+            completion_tokens=tokens,
+            finish_reason="length" if tokens < self.output_tokens else "stop",
+        )
+
+    def generate_stream(self, prompt, model=None, options=None):
+        self.options.append(options)
+        for _ in range(self.output_tokens):
+            yield "x "
+
+
+class TestGenerationOptions:
+    """Test option threading and the source-proportional output cap."""
+
+    def test_cap_scales_with_source_and_language_pair(self):
+        """Longer sources and denser pairs get a larger max_tokens."""
+        from transcoder.options import output_token_cap
+
+        provider = OptionsProvider()
+        service = TranslationService(model="fake", provider=provider, think=NO_THINK)
+
+        service.translate_single("word " * 400, "en", "ja")
+
+        assert provider.options[0].max_tokens == output_token_cap("word " * 400, "en", "ja")
+        assert output_token_cap("word " * 400, "en", "ja") > output_token_cap("word " * 100, "en", "ja")
+        assert output_token_cap("字" * 400, "zh-cn", "en") > output_token_cap("字" * 400, "zh-cn", "zh-classical-cn")
+
+    def test_request_options_merge_with_defaults(self):
+        """Per-call options override service defaults; the cap bounds explicit max_tokens."""
+        from transcoder.options import GenerationOptions
+
+        provider = OptionsProvider()
+        service = TranslationService(
+            model="fake", provider=provider, options=GenerationOptions(temperature=0.2, num_ctx=8192), think=NO_THINK
+        )
+
+        service.translate_single("Hello", "en", "fr", options=GenerationOptions(temperature=0.0, max_tokens=10**6))
+
+        sent = provider.options[0]
+        assert sent.temperature == 0.0
+        assert sent.num_ctx == 8192
+        assert sent.max_tokens == 256
+
+    def test_cap_can_be_disabled(self):
+        """Without a cap factor and options, providers receive no options."""
+        provider = OptionsProvider()
+        service = TranslationService(model="fake", provider=provider, output_cap_factor=None, think={})
+
+        service.translate_single("Hello", "en", "fr")
+
+        assert provider.options == [None]
+
+    def test_reasoning_headroom_unless_thinking_is_off(self):
+        """Models allowed to think get room for reasoning on top of the answer cap."""
+        from transcoder.options import REASONING_TOKENS
+
+        provider = OptionsProvider()
+        TranslationService(model="fake", provider=provider, think={}).translate_single("Hello", "en", "fr")
+        TranslationService(model="fake", provider=provider, think=NO_THINK).translate_single("Hello", "en", "fr")
+
+        assert [o.max_tokens for o in provider.options] == [256 + REASONING_TOKENS, 256]
+
+    def test_truncated_reasoning_fails_the_language(self):
+        """A generation cut off while still thinking is an error, not an empty translation."""
+        from transcoder.providers import GenerationResult
+
+        class EndlessThinker(OptionsProvider):
+            def generate(self, prompt, model=None, options=None):
+                return GenerationResult(text="<think>" + "step " * 50, finish_reason="length")
+
+            def generate_stream(self, prompt, model=None, options=None):
+                yield from ["<think>"] + ["step "] * 5000
+
+        service = TranslationService(model="fake", provider=EndlessThinker(), think={})
+
+        result = service.translate("Hello", "en", ["ja"])
+        events = list(service.translate_stream("Hello", "en", ["ja"]))
+
+        assert "output limit" in result.data["translations"]["ja"]["error"]
+        assert events[-1]["type"] == "error"
+
+    def test_truncated_improvement_keeps_the_translation(self):
+        """An improve call cut off while thinking fails instead of replacing the translation with nothing."""
+        from transcoder.providers import GenerationResult
+
+        class ThinkingImprover(OptionsProvider):
+            def generate(self, prompt, model=None, options=None):
+                if "改进翻译" in prompt:
+                    return GenerationResult(text="<think>" + "step " * 50, finish_reason="length")
+                return GenerationResult(text="Bonjour")
+
+        service = TranslationService(model="fake", provider=ThinkingImprover(), think={})
+
+        improved = service.improve_translation("Hello", "Bonjour", "ok", "en", "fr")
+        aimproved = asyncio.run(service.aimprove_translation("Hello", "Bonjour", "ok", "en", "fr"))
+        result = service.translate_with_reflection("Hello", "en", "fr")
+
+        assert improved.success is False and "output limit" in improved.error
+        assert aimproved.success is False
+        assert result.data["text"] == "Bonjour"
+
+    def test_provider_without_options_argument(self):
+        """Providers written to the original generate(prompt, model) contract keep working."""
+
+        class LegacyProvider(FakeProvider):
+            def generate(self, prompt, model=None):
+                return "Bonjour"
+
+        service = TranslationService(model="fake", provider=LegacyProvider())
+
+        result = service.translate("Hello", "en", ["fr"])
+        events = list(service.translate_stream("Hello", "en", ["fr"]))
+
+        assert result.data["translations"]["fr"]["text"] == "Bonjour"
+        assert events[-1]["final_content"] == "Bonjour"
+
+    def test_truncation_reported_in_metadata(self):
+        """A generation stopped by the cap is flagged per language and in the totals."""
+        provider = OptionsProvider(output_tokens=5000)
+        service = TranslationService(model="fake", provider=provider, think=NO_THINK)
+
+        result = service.translate("Hello", "en", ["fr", "de"])
+
+        metrics = result.data["translations"]["fr"]["metrics"]
+        assert metrics["truncated"] is True
+        assert metrics["finish_reason"] == "length"
+        assert metrics["max_tokens"] == 256
+        assert result.metadata["truncated"] is True
+
+    def test_runaway_stream_is_cut_off(self):
+        """Streams are closed once they exceed the cap, even if the backend ignores it."""
+        provider = OptionsProvider(output_tokens=5000)
+        service = TranslationService(model="fake", provider=provider, think=NO_THINK)
+
+        events = list(service.translate_stream("Hello", "en", ["fr"]))
+        complete = events[-1]
+
+        assert complete["type"] == "complete"
+        assert complete["truncated"] is True
+        assert complete["total_tokens"] == 256
+
+
+class ThinkingProvider(OptionsProvider):
+    """Fake reasoning model that thinks unless told not to."""
+
+    def generate(self, prompt, model=None, options=None):
+        from transcoder.providers import GenerationResult
+
+        self.options.append(options)
+        if options is not None and options.think is False:
+            return GenerationResult(text="<think>\n\n</think>\n\nBonjour")
+        return GenerationResult(text="<think>" + "step " * 100 + "</think>\nBonjour")
+
+    def generate_stream(self, prompt, model=None, options=None):
+        self.options.append(options)
+        yield from ["<thi", "nk>", "step " * 50, "</think>", "\n\nBon", "jour"]
+
+
+class TestThinkingSuppression:
+    """Test per-stage thinking control and think-block removal."""
+
+    def test_think_blocks_stripped_and_counted(self):
+        """Reasoning never reaches the translation; its token cost is reported."""
+        service = TranslationService(model="fake", provider=ThinkingProvider(), think={})
+
+        result = service.translate_single("Hello", "en", "fr")
+
+        assert result.data["text"] == "Bonjour"
+        assert result.metadata["thinking_tokens"] > 100
+
+    def test_thinking_savings_reported(self):
+        """The model's default is kept unless configured; suppressed calls are credited the observed reasoning cost."""
+        from transcoder.options import GenerationOptions
+
+        assert TranslationService(model="fake", provider=ThinkingProvider()).think == {}
+        provider = ThinkingProvider()
+        service = TranslationService(model="fake", provider=provider, think=NO_THINK)
+
+        unknown = service.translate_single("Hello", "en", "fr")
+        thought = service.translate_single("Hello", "en", "fr", options=GenerationOptions(think=True))
+        result = service.translate("Hello", "en", ["fr", "de"])
+
+        assert provider.options[0].think is False
+        assert unknown.metadata["thinking_tokens_saved"] is None
+        saved = thought.metadata["thinking_tokens"]
+        assert result.data["translations"]["fr"]["metrics"]["thinking_tokens_saved"] == saved
+        assert result.metadata["thinking_tokens_saved"] == 2 * saved
+        assert service.thinking_savings.saved == 2 * saved
+
+    def test_per_stage_flags(self):
+        """Only the configured stages are sent think=False."""
+        provider = ThinkingProvider()
+        service = TranslationService(model="fake", provider=provider, think={"translate": False, "improve": False})
+
+        result = service.translate_with_reflection("Hello", "en", "fr")
+
+        assert [o.think for o in provider.options] == [False, None, False]
+        assert result.data["text"] == "Bonjour"
+        assert result.data["reflection_history"][0]["reflection"] == "Bonjour"
+
+    def test_stream_content_excludes_thinking(self):
+        """Think blocks are filtered from content events as they stream."""
+        service = TranslationService(model="fake", provider=ThinkingProvider())
+
+        events = list(service.translate_stream("Hello", "en", ["fr"]))
+
+        content = "".join(e["content"] for e in events if e["type"] == "content")
+        assert content == "Bonjour"
+        assert events[-1]["final_content"] == "Bonjour"
+        assert events[-1]["thinking_tokens"] > 0
+
+
+class JSONProvider(FakeProvider):
+    """Fake provider answering single-call prompts with a JSON object."""
+
+    def __init__(self, answer, **kwargs):
+        super().__init__(**kwargs)
+        self.answer = answer
+        self.schemas = []
+        self.prompts = []
+
+    def generate(self, prompt, model=None, options=None):
+        if options is not None and options.json_schema is not None:
+            with self._lock:
+                self.calls += 1
+            self.schemas.append(options.json_schema)
+            self.prompts.append(prompt)
+            return self.answer
+        return super().generate(prompt, model)
+
+
+class TestSingleCallTranslation:
+    """Test multi-target translation in one JSON-constrained generation."""
+
+    def test_all_languages_from_one_call(self):
+        provider = JSONProvider('{"fr": "Bonjour", "de": "Hallo"}')
+        service = TranslationService(model="fake", provider=provider)
+
+        result = service.translate("Hello", "en", ["fr", "de"], single_call=True)
+
+        assert provider.calls == 1
+        assert provider.schemas[0]["required"] == ["fr", "de"]
+        assert result.data["translations"]["fr"]["text"] == "Bonjour"
+        assert result.data["translations"]["de"]["target_lang"] == "de"
+        assert result.metadata["single_call"] == {"translated": ["fr", "de"], "fallback": []}
+
+    def test_invalid_languages_fall_back(self):
+        """Missing or empty values are translated with separate calls."""
+        provider = JSONProvider('<think></think>{"fr": "Bonjour", "de": ""}')
+        service = TranslationService(model="fake", provider=provider)
+
+        result = service.translate("Hello", "en", ["fr", "de", "ja"], single_call=True)
+
+        assert result.metadata["single_call"]["fallback"] == ["de", "ja"]
+        assert result.data["translations"]["de"]["text"].startswith("translated:")
+        assert list(result.data["translations"]) == ["fr", "de", "ja"]
+
+    def test_unparseable_answer_falls_back_entirely(self):
+        provider = JSONProvider("Sorry, I cannot do that")
+        service = TranslationService(model="fake", provider=provider)
+
+        result = asyncio.run(service.atranslate("Hello", "en", ["fr", "de"], single_call=True))
+
+        assert result.metadata["single_call"]["fallback"] == ["fr", "de"]
+        assert result.data["translations"]["fr"]["text"].startswith("translated:")
+
+
+class BatchProvider(FakeProvider):
+    """Fake provider that translates packed prompts, optionally dropping a segment."""
+
+    def __init__(self, drop=None, **kwargs):
+        super().__init__(**kwargs)
+        self.drop = drop
+        self.prompts = []
+
+    def generate(self, prompt, model=None, options=None):
+        import re
+
+        with self._lock:
+            self.calls += 1
+            self.prompts.append(prompt)
+        segments = re.findall(r'<seg id="(\d+)">(.*?)</seg>', prompt)
+        if not segments:
+            return f"single:{prompt.split('原文:')[-1].split()[0]}"
+        return "\n".join(f'<seg id="{i}">T({text})</seg>' for i, text in segments if text != self.drop)
+
+
+class TestSegmentPacking:
+    """Test batched translation of short strings."""
+
+    def test_segments_share_generations(self):
+        provider = BatchProvider()
+        service = TranslationService(model="fake", provider=provider)
+        segments = [f"Label {i}" for i in range(20)] + [""]
+
+        result = service.translate_segments(segments, "en", ["fr", "de"])
+
+        assert provider.calls == 2
+        assert result.data["translations"]["fr"][3] == "T(Label 3)"
+        assert result.data["translations"]["de"][-1] == ""
+        assert result.metadata["batches"] == 1
+        assert result.metadata["retried"] == 0
+
+    def test_broken_segment_retried_individually(self):
+        provider = BatchProvider(drop="Cancel")
+        service = TranslationService(model="fake", provider=provider)
+
+        result = service.translate_segments(["Save", "Cancel", "Open"], "en", ["fr"])
+
+        assert result.data["translations"]["fr"] == ["T(Save)", "single:Cancel", "T(Open)"]
+        assert result.metadata["retried"] == 1
+        assert result.metadata["failed"] == 0
+
+
+class TestTranslateDocument:
+    """Test segmented document translation."""
+
+    def test_segments_translated_and_reassembled(self):
+        provider = BatchProvider()
+        service = TranslationService(model="fake", provider=provider)
+
+        result = service.translate_document("Alpha one. Beta two.\n\nGamma three.", "en", ["fr"], max_segment_tokens=1)
+
+        assert result.success
+        assert result.data["translations"]["fr"]["text"] == "single:Alpha single:Beta\n\nsingle:Gamma"
+        assert result.metadata["segments"] == 3
+        assert provider.calls == 3
+
+    def test_failed_segment_keeps_source(self):
+        service = TranslationService(model="fake", provider=FakeProvider(fail_on=["Beta"]))
+
+        result = service.translate_document("Alpha one. Beta two.", "en", ["fr"], max_segment_tokens=1)
+
+        translation = result.data["translations"]["fr"]
+        assert translation["text"].endswith(" Beta two.")
+        assert [failure["index"] for failure in translation["failed_segments"]] == [1]
+
+    def test_context_window_passes_neighbours(self):
+        provider = BatchProvider()
+        service = TranslationService(model="fake", provider=provider)
+
+        text = "Alpha one. Beta two. Gamma three."
+        service.translate_document(text, "en", ["fr"], max_segment_tokens=1, context_window=1)
+
+        middle = next(prompt for prompt in provider.prompts if prompt.split("原文:")[-1].strip().startswith("Beta"))
+        assert "Alpha one." in middle and "Gamma three." in middle
+
+
+class SlowMemory:
+    """Translation memory with one mid-tier match per language and a lookup delay."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def lookup_exact(self, source_text, target_langs=None):
+        time.sleep(self.delay)
+        return {}
+
+    def search_similar(self, query_text, k=5, tiers=None):
+        from transcoder.core import ToolResult
+
+        match = {"source": "Open file", "translation": "Ouvrir le fichier", "score": 0.8}
+        return ToolResult(success=True, data={"results": {"fr": [match]}})
+
+
+class ExactMemory(SlowMemory):
+    """Translation memory holding an exact French repeat."""
+
+    def lookup_exact(self, source_text, target_langs=None):
+        return {"fr": "Ouvrir le fichier"} if "fr" in (target_langs or []) else {}
+
+
+class SlowGlossary:
+    """Glossary with a lookup delay."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def get_relevant_terms(self, text):
+        from transcoder.core import ToolResult
+
+        time.sleep(self.delay)
+        return ToolResult(success=True, data={"terms": {"file": {"fr": "fichier", "de": "Datei"}}})
+
+
+class TestTranslationContext:
+    """Test TM and glossary context in the core pipeline."""
+
+    def test_context_injected_per_language(self):
+        provider = BatchProvider()
+        service = TranslationService(model="fake", provider=provider)
+
+        result = service.translate(
+            "Open the file",
+            "en",
+            ["fr", "de"],
+            use_vector_db=True,
+            use_terminology=True,
+            vector_db_service=SlowMemory(),
+            terminology_service=SlowGlossary(),
+        )
+
+        fr_prompt = next(prompt for prompt in provider.prompts if "Français" in prompt)
+        de_prompt = next(prompt for prompt in provider.prompts if "Deutsch" in prompt)
+        assert "Ouvrir le fichier" in fr_prompt and "file → fichier" in fr_prompt
+        assert "Ouvrir le fichier" not in de_prompt and "file → Datei" in de_prompt
+        assert result.metadata["tm"] == {"fr": "mid", "de": "none"}
+        assert result.metadata["context"]["fr"] == {"references": 1, "terms": 1}
+        assert set(result.metadata["timings"]) == {"tm", "terminology", "context", "translate"}
+
+    def test_lookups_run_concurrently_with_detection(self, monkeypatch):
+        service = TranslationService(model="fake", provider=FakeProvider())
+        monkeypatch.setattr(service, "detect_language", lambda text: time.sleep(0.1) or "en")
+
+        context = service.gather_context("Open the file", "auto", ["fr"], SlowMemory(0.1), SlowGlossary(0.1))
+
+        assert context.source_lang == "en"
+        assert context.timings["context"] < 0.25
+
+    def test_context_trimmed_to_budget(self):
+        service = TranslationService(model="fake", provider=FakeProvider(), context_budget_tokens=6)
+
+        context = service.gather_context("Open the file", "en", ["fr"], SlowMemory(), SlowGlossary())
+
+        assert context.terms == {"fr": {"file": "fichier"}}
+        assert context.references == {}
+
+    def test_single_call_reuses_memory_first(self):
+        """Exact repeats are served before the single generation, which only covers the other languages."""
+        provider = JSONProvider('{"de": "Datei öffnen"}')
+        service = TranslationService(model="fake", provider=provider)
+        kwargs = dict(
+            use_vector_db=True,
+            use_terminology=True,
+            vector_db_service=ExactMemory(),
+            terminology_service=SlowGlossary(),
+            single_call=True,
+        )
+
+        result = service.translate("Open the file", "en", ["fr", "de"], **kwargs)
+        async_result = asyncio.run(service.atranslate("Open the file", "en", ["fr", "de"], **kwargs))
+
+        assert provider.calls == 2
+        assert [schema["required"] for schema in provider.schemas] == [["de"], ["de"]]
+        assert "file → Datei" in provider.prompts[0] and "fichier" not in provider.prompts[0]
+        for outcome in (result, async_result):
+            assert outcome.data["translations"]["fr"]["text"] == "Ouvrir le fichier"
+            assert outcome.data["translations"]["de"]["text"] == "Datei öffnen"
+            assert outcome.metadata["tm"] == {"fr": "exact", "de": "none"}
+            assert outcome.metadata["single_call"] == {"translated": ["de"], "fallback": []}
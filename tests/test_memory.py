@@ -0,0 +1,103 @@
+"""
+Tests for TransCoder translation memory matching
+"""
+
+import pytest
+
+from transcoder.memory import (
+    ExactMatchIndex,
+    IngestProgress,
+    LeverageTiers,
+    cosine_similarity,
+    edit_ratio,
+    iter_pair_batches,
+)
+
+
+class TestExactMatchIndex:
+    """Test the normalized exact-match index."""
+
+    def test_lookup_ignores_surrounding_whitespace(self):
+        index = ExactMatchIndex()
+        index.add("Hello world", {"ja": "こんにちは世界", "ko": ""})
+
+        assert index.lookup("  Hello world\r\n", ["ja", "ko", "fr"]) == {"ja": "こんにちは世界"}
+        assert index.lookup("hello world") == {}
+
+    def test_later_entries_merge_and_replace(self):
+        index = ExactMatchIndex()
+        index.rebuild(
+            [
+                {"source": "Save", "translations": {"ja": "保存", "fr": "Sauver"}},
+                {"source": "Save", "translations": {"fr": "Enregistrer"}},
+            ]
+        )
+
+        assert index.lookup("Save") == {"ja": "保存", "fr": "Enregistrer"}
+        assert len(index) == 1
+
+
+class TestLeverageTiers:
+    """Test fuzzy match scoring and tiering."""
+
+    def test_scores_combine_meaning_and_surface(self):
+        tiers = LeverageTiers(semantic_weight=0.5)
+
+        assert edit_ratio("Open the file", " Open the file\n") == 1.0
+        assert cosine_similarity([1, 0], [0, 0]) == 0.0
+        assert tiers.score(cosine=0.9, edit=0.5) == 0.7
+        assert tiers.score(cosine=-0.2, edit=0.4) == 0.2
+
+    def test_classify_picks_best_and_mid_references(self):
+        tiers = LeverageTiers(high=0.9, mid=0.6, max_references=2)
+        matches = [{"score": 0.65}, {"score": 0.3}, {"score": 0.8}, {"score": 0.7}]
+
+        tier, best, references = tiers.classify(matches)
+
+        assert tier == "mid"
+        assert best["score"] == 0.8
+        assert [ref["score"] for ref in references] == [0.8, 0.7]
+        assert tiers.classify([]) == ("none", None, [])
+
+    def test_changed_numbers_are_not_reused(self):
+        """A near-identical match with different numbers or placeholders drops to a reference."""
+        tiers = LeverageTiers(high=0.9, mid=0.6)
+        match = {"score": 0.97, "source": "Delete 5 files", "translation": "删除 5 个文件"}
+
+        assert tiers.classify([match], "Delete 3 files") == ("mid", match, [match])
+        assert tiers.classify([match], "Delete  5 files")[0] == "high"
+        renamed = {**match, "source": "Delete {count} files"}
+        assert tiers.classify([renamed], "Delete {n} files")[0] == "mid"
+
+
+class TestBulkIngestion:
+    """Test batching and progress reporting for bulk TM imports."""
+
+    def test_batches_mixed_pairs_and_skips_empty(self):
+        pairs = iter(
+            [
+                ("Open", {"ja": "開く"}),
+                {"source": "Save", "translations": {"ja": "保存", "ko": ""}},
+                ("", {"ja": "空"}),
+                ("Close", {"ja": ""}),
+                ("Quit", {"ja": "終了"}),
+            ]
+        )
+
+        batches = list(iter_pair_batches(pairs, batch_size=2))
+
+        assert batches == [[("Open", {"ja": "開く"}), ("Save", {"ja": "保存"})], [("Quit", {"ja": "終了"})]]
+        with pytest.raises(ValueError):
+            list(iter_pair_batches([], batch_size=0))
+
+    def test_progress_reports_counts_and_throughput(self):
+        progress = IngestProgress()
+        progress.add_batch(256)
+        progress.add_batch(44)
+        progress.checkpoints += 1
+
+        report = progress.report()
+
+        assert (report["added"], report["batches"], report["checkpoints"]) == (300, 2, 1)
+        assert report["elapsed"] >= 0
+        assert report["pairs_per_second"] >= 0
@@ -0,0 +1,44 @@
+"""
+Tests for TransCoder segment packing
+"""
+
+from transcoder.packing import format_batch, pack_segments, parse_batch
+
+
+class TestPackSegments:
+    """Test grouping of short segments under a token budget."""
+
+    def test_groups_in_order_within_budget(self):
+        segments = ["Save", "Cancel", "Open file", "x" * 400, "Close"]
+
+        batches = pack_segments(segments, budget_tokens=40)
+
+        assert sorted(i for batch in batches for i in batch) == [0, 1, 2, 3, 4]
+        assert [3] in batches
+        assert all(batch == sorted(batch) for batch in batches)
+
+    def test_empty_and_markup_segments_not_packed(self):
+        segments = ["OK", "", 'Use <seg id="1"> tags', "Help"]
+
+        batches = pack_segments(segments)
+
+        assert [2] in batches
+        assert all(1 not in batch for batch in batches)
+
+    def test_max_batch(self):
+        assert [len(batch) for batch in pack_segments(["a"] * 5, max_batch=2)] == [2, 2, 1]
+
+
+class TestParseBatch:
+    """Test recovery of numbered answers."""
+
+    def test_round_trip(self):
+        answer = format_batch(["保存", "取消"])
+
+        assert parse_batch(answer, 2) == {0: "保存", 1: "取消"}
+
+    def test_broken_boundaries_are_dropped(self):
+        """Missing, duplicated, out-of-range and unterminated segments are not returned."""
+        answer = '<seg id="1">保存</seg><seg id="2">取消<seg id="3">打开</seg><seg id="3">x</seg><seg id="9">y</seg>'
+
+        assert parse_batch(answer, 4) == {0: "保存"}
@@ -0,0 +1,101 @@
+"""
+Tests for TransCoder append-only persistence
+"""
+
+import os
+import threading
+
+from transcoder.persistence import PeriodicSnapshot, WriteAheadLog, atomic_write
+
+
+class TestAtomicWrite:
+    """Test temp-file-and-rename replacement."""
+
+    def test_replaces_file(self, tmp_path):
+        path = str(tmp_path / "data.bin")
+        atomic_write(path, lambda tmp: open(tmp, "w").write("new"))
+
+        assert open(path).read() == "new"
+        assert os.listdir(tmp_path) == ["data.bin"]
+
+    def test_failed_write_keeps_old_file(self, tmp_path):
+        path = tmp_path / "data.bin"
+        path.write_text("old")
+
+        def fail(tmp):
+            open(tmp, "w").write("partial")
+            raise RuntimeError("disk full")
+
+        try:
+            atomic_write(str(path), fail)
+        except RuntimeError:
+            pass
+
+        assert path.read_text() == "old"
+        assert os.listdir(tmp_path) == ["data.bin"]
+
+
+class TestWriteAheadLog:
+    """Test appending, replay and rotation."""
+
+    def test_replay_skips_torn_record(self, tmp_path):
+        path = tmp_path / "tm.wal"
+        wal = WriteAheadLog(str(path))
+        wal.append({"seq": 0})
+        wal.close()
+        with open(path, "a") as f:
+            f.write('{"seq": 1, "sou')
+
+        wal = WriteAheadLog(str(path))
+        wal.append({"seq": 2})
+
+        assert [record["seq"] for record in wal.replay()] == [0, 2]
+
+    def test_rotated_records_replayed_until_discarded(self, tmp_path):
+        wal = WriteAheadLog(str(tmp_path / "tm.wal"))
+        wal.append({"seq": 0})
+        wal.rotate()
+        wal.append({"seq": 1})
+        wal.rotate()  # an earlier snapshot failed; both records stay rotated
+        wal.append({"seq": 2})
+
+        assert [record["seq"] for record in wal.replay()] == [0, 1, 2]
+
+        wal.discard_rotated()
+
+        assert [record["seq"] for record in wal.replay()] == [2]
+
+
+class TestPeriodicSnapshot:
+    """Test background snapshot triggering."""
+
+    def test_snapshot_after_max_pending(self):
+        taken = threading.Event()
+        snapshots = PeriodicSnapshot(taken.set, interval=60, max_pending=3)
+
+        snapshots.mark(2)
+        assert not taken.wait(0.1)
+        snapshots.mark()
+
+        assert taken.wait(2)
+        snapshots.stop()
+        assert snapshots.snapshots == 1
+
+    def test_stop_flushes_pending_and_failures_are_retried(self):
+        calls = []
+
+        def snapshot():
+            calls.append(1)
+            if len(calls) == 1:
+                raise OSError("disk full")
+
+        snapshots = PeriodicSnapshot(snapshot, interval=60, max_pending=100)
+        snapshots.mark()
+        snapshots.flush()
+
+        assert snapshots.last_error == "disk full"
+        assert snapshots.pending == 1
+
+        snapshots.stop()
+
+        assert len(calls) == 2 and snapshots.pending == 0
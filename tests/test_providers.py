@@ -0,0 +1,512 @@
+"""
+Tests for TransCoder LLM providers
+"""
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+ollama = pytest.importorskip("ollama")
+
+from transcoder.providers import (  # noqa: E402
+    AsyncLLMProvider,
+    LLMProvider,
+    OllamaProvider,
+    SingleFlightProvider,
+    _LoopBoundClient,
+)
+
+
+USAGE = {
+    "prompt_eval_count": 40,
+    "prompt_eval_duration": 200_000_000,
+    "eval_count": 2,
+    "eval_duration": 100_000_000,
+    "load_duration": 1_500_000_000,
+}
+
+
+def ollama_handler(request):
+    """Minimal stand-in for the Ollama HTTP API."""
+    if request.url.path == "/api/tags":
+        return httpx.Response(200, json={"models": [{"model": "qwen3:0.6b"}]})
+
+    body = json.loads(request.content)
+    if body.get("stream"):
+        lines = [
+            json.dumps({"model": body["model"], "response": part, "done": False}) for part in ("你", "好")
+        ] + [json.dumps({"model": body["model"], "response": "", "done": True, **USAGE})]
+        return httpx.Response(200, content="\n".join(lines).encode())
+    return httpx.Response(200, json={"model": body["model"], "response": " 你好 ", "done": True, **USAGE})
+
+
+@pytest.fixture
+def provider():
+    provider = OllamaProvider(host="http://ollama.test")
+    provider._client = ollama.Client(host=provider.host, transport=httpx.MockTransport(ollama_handler))
+    provider._async_client = _LoopBoundClient(
+        lambda: ollama.AsyncClient(host=provider.host, transport=httpx.MockTransport(ollama_handler))
+    )
+    return provider
+
+
+class TestAsyncOllamaProvider:
+    """Test the asyncio provider contract against a mocked Ollama host."""
+
+    def test_implements_async_contract(self, provider):
+        """Ollama provider is usable as an AsyncLLMProvider."""
+        assert isinstance(provider, AsyncLLMProvider)
+
+    def test_agenerate(self, provider):
+        """agenerate returns the stripped response text."""
+        assert asyncio.run(provider.agenerate("Hello")).text == "你好"
+
+    def test_astream(self, provider):
+        """astream yields deltas in order."""
+
+        async def collect():
+            return [delta async for delta in provider.astream("Hello")]
+
+        assert asyncio.run(collect()) == ["你", "好"]
+
+    def test_aget_available_models(self, provider):
+        """Model listing goes through the async client."""
+        assert asyncio.run(provider.aget_available_models()) == ["qwen3:0.6b"]
+
+    def test_client_rebound_per_event_loop(self, provider):
+        """A fresh pooled client is created for each event loop."""
+
+        async def current_client():
+            return provider.async_client
+
+        first = asyncio.run(current_client())
+        second = asyncio.run(current_client())
+        assert first is not second
+
+
+class TestOllamaClientPool:
+    """Test per-provider pooled Ollama clients."""
+
+    def test_generate_uses_instance_client(self, provider):
+        """Sync generation goes through the provider's own client."""
+        assert provider.generate("Hello").text == "你好"
+        assert provider.get_available_models() == ["qwen3:0.6b"]
+
+    def test_providers_do_not_share_hosts(self):
+        """Two providers keep independent clients and hosts."""
+        first = OllamaProvider(host="http://first.test:11434")
+        second = OllamaProvider(host="http://second.test:11434")
+
+        assert first.client is not second.client
+        assert first.client._client.base_url.host == "first.test"
+        assert second.client._client.base_url.host == "second.test"
+
+    def test_client_timeouts(self):
+        """Connect and read timeouts are applied to the pooled client."""
+        provider = OllamaProvider(host="http://ollama.test", connect_timeout=2.0, read_timeout=30.0)
+        timeout = provider.client._client.timeout
+
+        assert timeout.connect == 2.0
+        assert timeout.read == 30.0
+        assert provider.client is provider.client
+
+
+class TestGenerationUsage:
+    """Test token accounting from provider responses."""
+
+    def test_generate_reports_ollama_usage(self, provider):
+        """Counts and durations come from the Ollama response."""
+        result = provider.generate("Hello")
+
+        assert result.prompt_tokens == 40
+        assert result.completion_tokens == 2
+        assert result.prefill_tokens_per_second == 200.0
+        assert result.decode_tokens_per_second == 20.0
+        assert result.metrics()["load_time"] == 1.5
+        assert result.metrics()["time_to_first_token"] == 1.7
+
+    def test_stream_exposes_usage_when_exhausted(self, provider):
+        """The final ``done`` chunk's usage is available after iteration."""
+        stream = provider.generate_stream("Hello")
+
+        assert list(stream) == ["你", "好"]
+        assert stream.result.text == "你好"
+        assert stream.result.completion_tokens == 2
+        assert stream.result.time_to_first_token is not None
+
+    def test_openai_usage(self):
+        """OpenAI usage objects map onto prompt and completion tokens."""
+        from types import SimpleNamespace
+
+        from transcoder.providers import GenerationResult
+
+        usage = SimpleNamespace(prompt_tokens=12, completion_tokens=30)
+        result = GenerationResult.from_openai(usage, " Bonjour ", model="gpt-4o-mini")
+
+        assert result.text == "Bonjour"
+        assert result.metrics(elapsed=2.0)["decode_tokens_per_second"] == 15.0
+
+
+class TestGenerationOptions:
+    """Test that typed options reach the backend and truncation is reported."""
+
+    def test_options_sent_as_ollama_options(self):
+        """max_tokens maps to num_predict; done_reason "length" marks truncation."""
+        from transcoder.options import GenerationOptions
+
+        requests = []
+
+        def handler(request):
+            body = json.loads(request.content)
+            requests.append(body)
+            return httpx.Response(
+                200, json={"model": body["model"], "response": "你", "done": True, "done_reason": "length", **USAGE}
+            )
+
+        provider = OllamaProvider(host="http://ollama.test", keep_alive="5m")
+        provider._client = ollama.Client(host=provider.host, transport=httpx.MockTransport(handler))
+
+        result = provider.generate(
+            "Hello", options=GenerationOptions(max_tokens=64, seed=7, stop=["\n\n"], think=False)
+        )
+
+        assert requests[0]["options"] == {"num_predict": 64, "seed": 7, "stop": ["\n\n"]}
+        assert requests[0]["keep_alive"] == "5m"
+        assert requests[0]["think"] is False
+        assert result.truncated is True
+        assert result.metrics()["finish_reason"] == "length"
+
+    def test_from_dict_accepts_num_predict(self):
+        """Request payloads may use Ollama's name for the output limit."""
+        from transcoder.options import GenerationOptions
+
+        options = GenerationOptions.from_dict({"num_predict": 32, "temperature": 0.1, "unknown": 1})
+
+        assert options == GenerationOptions(max_tokens=32, temperature=0.1)
+        assert options.to_openai() == {"max_tokens": 32, "temperature": 0.1}
+
+    def test_openai_no_think_prompt_switch(self):
+        """Qwen3 models behind OpenAI-compatible backends get the /no_think switch appended to the prompt."""
+        from transcoder.options import GenerationOptions
+        from transcoder.providers import OpenAIProvider
+
+        messages = OpenAIProvider._messages("Translate", GenerationOptions(think=False), "qwen3:8b")
+
+        assert messages == [{"role": "user", "content": "Translate\n/no_think"}]
+        assert OpenAIProvider._messages("Translate", None, "qwen3:8b")[0]["content"] == "Translate"
+        assert OpenAIProvider._messages("Translate", GenerationOptions(think=False), "gpt-4o-mini")[0]["content"] == (
+            "Translate"
+        )
+
+
+class TestSingleFlightProvider:
+    """Test coalescing of identical in-flight requests."""
+
+    def make_provider(self, delay=0.1):
+        class SlowProvider(LLMProvider):
+            default_model = "fake"
+
+            def __init__(self):
+                self.calls = 0
+                self.lock = threading.Lock()
+
+            def generate(self, prompt, model=None, options=None):
+                with self.lock:
+                    self.calls += 1
+                time.sleep(delay)
+                return f"{model}:{prompt}"
+
+            def generate_stream(self, prompt, model=None, options=None):
+                with self.lock:
+                    self.calls += 1
+                for piece in ("a", "b", "c"):
+                    time.sleep(delay / 3)
+                    yield piece
+
+            def get_available_models(self):
+                return ["fake"]
+
+            def is_available(self):
+                return True
+
+        return SlowProvider()
+
+    def test_concurrent_identical_prompts_share_generation(self):
+        """Identical overlapping calls reach the backend once."""
+        inner = self.make_provider()
+        provider = SingleFlightProvider(inner)
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            results = list(executor.map(lambda _: provider.generate("Hello", model="fake"), range(5)))
+
+        assert results == ["fake:Hello"] * 5
+        assert inner.calls == 1
+        assert provider.coalesced == 4
+
+    def test_different_options_are_not_coalesced(self):
+        """Overlapping calls with different generation options each reach the backend."""
+        from transcoder.options import GenerationOptions
+
+        inner = self.make_provider()
+        provider = SingleFlightProvider(inner)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda seed: provider.generate("Hello", options=GenerationOptions(seed=seed)), [1, 2]))
+
+        assert inner.calls == 2
+
+    def test_different_models_are_not_coalesced(self):
+        """The model is part of the coalescing key."""
+        inner = self.make_provider()
+        provider = SingleFlightProvider(inner)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda model: provider.generate("Hello", model=model), ["a", "b"]))
+
+        assert inner.calls == 2
+
+    def test_stream_attaches_to_in_progress_stream(self):
+        """A late streaming caller replays buffered chunks and follows live output."""
+        inner = self.make_provider(delay=0.3)
+        provider = SingleFlightProvider(inner)
+
+        first = provider.generate_stream("Hello")
+        assert next(first) == "a"
+        second = provider.generate_stream("Hello")
+
+        assert list(second) == ["a", "b", "c"]
+        assert list(first) == ["b", "c"]
+        assert inner.calls == 1
+
+    def test_upstream_stops_when_every_caller_closes(self):
+        """Closing the last attached stream closes the upstream stream."""
+        produced = []
+        closed = threading.Event()
+        inner = self.make_provider()
+
+        def endless(prompt, model=None, options=None):
+            try:
+                for i in range(100):
+                    produced.append(i)
+                    time.sleep(0.01)
+                    yield str(i)
+            finally:
+                closed.set()
+
+        inner.generate_stream = endless
+        provider = SingleFlightProvider(inner)
+
+        stream = provider.generate_stream("Hello")
+        assert next(stream) == "0"
+        stream.close()
+
+        assert closed.wait(1)
+        assert len(produced) < 10
+        assert provider._streams == {}
+
+    def test_unread_stream_does_not_keep_upstream_alive(self):
+        """A stream closed before its first chunk still releases the upstream stream."""
+        closed = threading.Event()
+        inner = self.make_provider()
+
+        def endless(prompt, model=None, options=None):
+            try:
+                for i in range(100):
+                    time.sleep(0.01)
+                    yield str(i)
+            finally:
+                closed.set()
+
+        inner.generate_stream = endless
+        provider = SingleFlightProvider(inner)
+
+        provider.generate_stream("Hello").close()
+
+        assert closed.wait(1)
+        assert provider._streams == {}
+
+    def test_errors_reach_every_waiter(self):
+        """A failed flight raises in every coalesced caller."""
+        inner = self.make_provider()
+        inner.generate = lambda prompt, model=None, options=None: (_ for _ in ()).throw(RuntimeError("down"))
+        provider = SingleFlightProvider(inner)
+
+        with pytest.raises(RuntimeError):
+            provider.generate("Hello")
+        assert provider._flights == {}
+
+
+class AsyncFakeProvider(LLMProvider, AsyncLLMProvider):
+    """Asyncio-native provider that records started and cancelled generations."""
+
+    default_model = "fake"
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def generate(self, prompt, model=None, options=None):
+        raise AssertionError("blocking path used")
+
+    def get_available_models(self):
+        raise AssertionError("blocking path used")
+
+    def is_available(self):
+        return True
+
+    async def agenerate(self, prompt, model=None, options=None):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        return f"{model}:{prompt}"
+
+    async def astream(self, prompt, model=None, options=None):
+        for piece in ("a", "b"):
+            await asyncio.sleep(self.delay / 2)
+            yield piece
+
+    async def aget_available_models(self):
+        return ["fake"]
+
+
+class TestAsyncProviderWrappers:
+    """Test the asyncio path through provider wrappers."""
+
+    def test_service_chain_stays_async(self):
+        """Every default wrapper passes agenerate through, so cancelling reaches the backend."""
+        from transcoder.core import TranslationService
+        from transcoder.providers import is_async_provider
+
+        inner = AsyncFakeProvider(delay=10)
+        service = TranslationService(model="fake", provider=inner)
+
+        async def cancel_midway():
+            task = asyncio.ensure_future(service._agenerate("Hello", "fake"))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        assert is_async_provider(service.provider)
+        asyncio.run(cancel_midway())
+        assert inner.calls == 1
+        assert inner.cancelled == 1
+
+    def test_async_models_and_stream_pass_through(self):
+        """Model listing and streaming reach the async methods of the wrapped provider."""
+
+        async def run():
+            provider = SingleFlightProvider(AsyncFakeProvider())
+            return await provider.aget_available_models(), [delta async for delta in provider.astream("Hello")]
+
+        assert asyncio.run(run()) == (["fake"], ["a", "b"])
+
+    def test_concurrent_identical_agenerate_share_generation(self):
+        """Identical overlapping awaits reach the backend once."""
+        inner = AsyncFakeProvider()
+        provider = SingleFlightProvider(inner)
+
+        async def run():
+            return await asyncio.gather(*(provider.agenerate("Hello", model="fake") for _ in range(3)))
+
+        assert asyncio.run(run()) == ["fake:Hello"] * 3
+        assert inner.calls == 1
+        assert provider._aflights == {}
+
+    def test_blocking_provider_runs_in_executor(self):
+        """Wrappers around a blocking provider still offer agenerate and astream."""
+        provider = SingleFlightProvider(TestSingleFlightProvider().make_provider(delay=0.03))
+
+        async def run():
+            return await provider.agenerate("Hello", model="fake"), [d async for d in provider.astream("Hello")]
+
+        assert asyncio.run(run()) == ("fake:Hello", ["a", "b", "c"])
+
+
+def make_pool(resident_by_host, delay=0.0, down=()):
+    """OllamaPoolProvider over mocked hosts; records which host served each request."""
+    from transcoder.providers import OllamaPoolProvider
+
+    served = []
+
+    def handler_for(host):
+        def handler(request):
+            if host in down:
+                raise httpx.ConnectError("connection refused", request=request)
+            if request.url.path == "/api/ps":
+                return httpx.Response(200, json={"models": [{"model": m} for m in resident_by_host.get(host, [])]})
+            served.append(host)
+            time.sleep(delay)
+            return ollama_handler(request)
+
+        return handler
+
+    hosts = list(resident_by_host)
+    pool = OllamaPoolProvider(hosts, health_interval=None, parallelism=2)
+    for pooled in pool.hosts:
+        pooled.provider._client = ollama.Client(
+            host=pooled.provider.host, transport=httpx.MockTransport(handler_for(pooled.provider.host))
+        )
+    pool.refresh()
+    return pool, served
+
+
+class TestOllamaPoolProvider:
+    """Test least-outstanding routing across several Ollama hosts."""
+
+    def test_prefers_host_with_model_resident(self):
+        """Requests go to the host that already has the model loaded."""
+        pool, served = make_pool({"http://a.test": [], "http://b.test": ["qwen3:0.6b"]})
+
+        pool.generate("Hello", model="qwen3:0.6b")
+
+        assert served == ["http://b.test"]
+
+    def test_spreads_concurrent_load(self):
+        """Once the resident host is saturated, requests spill to the others."""
+        pool, served = make_pool({"http://a.test": ["qwen3:0.6b"], "http://b.test": []}, delay=0.2)
+
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: pool.generate("Hello"), range(4)))
+
+        assert sorted(served) == ["http://a.test"] * 2 + ["http://b.test"] * 2
+        assert time.time() - start < 0.35
+        assert pool.parallelism == 4
+
+    def test_unhealthy_hosts_are_skipped(self):
+        """Hosts failing the health check receive no traffic."""
+        pool, served = make_pool({"http://a.test": [], "http://b.test": []}, down={"http://a.test"})
+
+        for _ in range(3):
+            pool.generate("Hello")
+
+        assert served == ["http://b.test"] * 3
+        status = {s["host"]: s for s in pool.host_status()}
+        assert status["http://a.test"]["healthy"] is False
+        assert status["http://b.test"]["resident_models"] == ["qwen3:0.6b"]
+
+    def test_create_provider_accepts_host_list(self):
+        """A comma-separated host string yields a pool; callers need no changes."""
+        from transcoder.providers import OllamaPoolProvider, create_provider
+
+        provider = create_provider("ollama", host="http://a.test, http://b.test", health_interval=None)
+
+        assert isinstance(provider, OllamaPoolProvider)
+        assert [h.provider.host for h in provider.hosts] == ["http://a.test", "http://b.test"]
+        assert isinstance(create_provider("ollama", host="http://a.test"), OllamaProvider)
@@ -0,0 +1,87 @@
+"""
+Tests for TransCoder model residency
+"""
+
+import json
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+ollama = pytest.importorskip("ollama")
+
+from transcoder.providers import OllamaProvider, SingleFlightProvider  # noqa: E402
+from transcoder.residency import ResidencyManager, parse_keep_alive_policy  # noqa: E402
+
+
+class FakeOllamaHost:
+    """Mocked Ollama host that loads models on demand and records request bodies."""
+
+    def __init__(self, resident=()):
+        self.resident = set(resident)
+        self.requests = []
+
+    def __call__(self, request):
+        if request.url.path == "/api/ps":
+            return httpx.Response(200, json={"models": [{"model": m} for m in sorted(self.resident)]})
+
+        body = json.loads(request.content)
+        self.requests.append(body)
+        load_duration = 0 if body["model"] in self.resident else 3_000_000_000
+        self.resident.add(body["model"])
+        return httpx.Response(
+            200, json={"model": body["model"], "response": "ok", "done": True, "load_duration": load_duration}
+        )
+
+
+@pytest.fixture
+def host():
+    return FakeOllamaHost(resident=["qwen3:0.6b"])
+
+
+@pytest.fixture
+def provider(host):
+    provider = OllamaProvider(host="http://ollama.test")
+    provider._client = ollama.Client(host=provider.host, transport=httpx.MockTransport(host))
+    return provider
+
+
+class TestResidencyManager:
+    """Test residency tracking, preloading and keep_alive policies."""
+
+    def test_tracks_resident_models_through_wrappers(self, provider):
+        """Residency is read from /api/ps of the provider behind any wrappers."""
+        residency = ResidencyManager(SingleFlightProvider(provider))
+
+        assert residency.is_resident("qwen3:0.6b")
+        assert not residency.is_resident("qwen3:4b")
+        assert residency.get_status()["resident"]["qwen3:0.6b"]["hosts"] == ["http://ollama.test"]
+
+    def test_preload_records_load_time(self, provider):
+        """Preloading loads the model and remembers its cold-load cost."""
+        residency = ResidencyManager(provider)
+
+        assert residency.preload("qwen3:4b")["load_time"] == 3.0
+        assert residency.is_resident("qwen3:4b")
+        assert residency.expected_load_time("qwen3:4b") == 3.0
+
+    def test_cold_start_warning(self, provider):
+        """Requests for a model that is not loaded get a warning with the expected cost."""
+        residency = ResidencyManager(provider)
+        residency.observe("llama3.2:1b", 4.2)
+
+        assert residency.cold_start_warning("qwen3:0.6b") is None
+        assert "about 4.2s" in residency.cold_start_warning("llama3.2:1b")
+        assert "several seconds" in residency.cold_start_warning("mistral")
+
+    def test_keep_alive_sent_per_model(self, provider, host):
+        """Each request carries its model's keep_alive policy."""
+        ResidencyManager(provider, keep_alive={"qwen3:4b": "5m"}, default_keep_alive="30m")
+
+        provider.generate("Hello", model="qwen3:4b")
+        provider.generate("Hello", model="qwen3:0.6b")
+
+        assert [r["keep_alive"] for r in host.requests] == ["5m", "30m"]
+
+    def test_parse_keep_alive_policy(self):
+        """Policies parse from an env-style string; numbers become numbers."""
+        assert parse_keep_alive_policy("qwen3:4b=5m, qwen3:0.6b=-1") == {"qwen3:4b": "5m", "qwen3:0.6b": -1.0}
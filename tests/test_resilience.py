@@ -0,0 +1,296 @@
+"""
+Tests for TransCoder provider resilience
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from transcoder.core import TranslationService
+from transcoder.providers import LLMProvider
+from transcoder.resilience import DeadlineExceededError, ResilientProvider, is_transient_error
+
+
+class ScriptedProvider(LLMProvider):
+    """Provider whose successive calls follow a script of delays and errors."""
+
+    default_model = "fake"
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def parallelism(self):
+        return 4
+
+    def _next_step(self):
+        with self._lock:
+            step = self.script[min(self.calls, len(self.script) - 1)]
+            self.calls += 1
+            return self.calls, step
+
+    def generate(self, prompt, model=None, options=None):
+        call, (delay, error) = self._next_step()
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return f"answer-{call}"
+
+    def generate_stream(self, prompt, model=None, options=None):
+        call, (delay, error) = self._next_step()
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        yield "a"
+        yield "b"
+
+    def get_available_models(self):
+        return ["fake"]
+
+    def is_available(self):
+        return True
+
+
+class TestRetries:
+    """Test retries on transient errors."""
+
+    def test_transient_errors_are_retried(self):
+        """Connection failures are retried with backoff until success."""
+        inner = ScriptedProvider([(0, ConnectionError("reset")), (0, ConnectionError("reset")), (0, None)])
+        provider = ResilientProvider(inner, max_retries=2, backoff_base=0.01)
+
+        assert provider.generate("Hello") == "answer-3"
+        assert provider.stats["retries"] == 2
+
+    def test_permanent_errors_are_not_retried(self):
+        """Errors reported by the backend surface immediately."""
+        inner = ScriptedProvider([(0, ValueError("model not found"))])
+        provider = ResilientProvider(inner, max_retries=3, backoff_base=0.01)
+
+        with pytest.raises(ValueError):
+            provider.generate("Hello")
+        assert inner.calls == 1
+
+    def test_status_codes_classify_errors(self):
+        """Throttling and 5xx responses are transient; 4xx are not."""
+
+        class StatusError(Exception):
+            def __init__(self, status_code):
+                self.status_code = status_code
+
+        assert is_transient_error(StatusError(503))
+        assert is_transient_error(StatusError(429))
+        assert not is_transient_error(StatusError(404))
+
+
+class TestDeadline:
+    """Test per-call deadlines."""
+
+    def test_stalled_generation_hits_deadline(self):
+        """A stalled call fails at the deadline instead of blocking."""
+        provider = ResilientProvider(ScriptedProvider([(1.0, None)]), deadline=0.1)
+
+        start = time.time()
+        with pytest.raises(DeadlineExceededError):
+            provider.generate("Hello")
+        assert time.time() - start < 0.5
+        assert provider.stats["timeouts"] == 1
+
+    def test_translate_single_reports_timeout(self):
+        """The service surfaces the timeout as a failed ToolResult."""
+        service = TranslationService(
+            model="fake", provider=ScriptedProvider([(1.0, None)]), resilience={"deadline": 0.1}
+        )
+
+        result = service.translate_single("Hello", "en", "ja")
+
+        assert result.success is False
+        assert "deadline" in result.error
+
+    def test_stalled_stream_hits_deadline(self):
+        """A stream with no output for the deadline fails."""
+        provider = ResilientProvider(ScriptedProvider([(1.0, None)]), deadline=0.1)
+
+        with pytest.raises(DeadlineExceededError):
+            list(provider.generate_stream("Hello"))
+
+    def test_stalled_stream_is_closed_upstream(self):
+        """The upstream stream is closed once the stall deadline abandons it."""
+        closed = threading.Event()
+        streams = []
+
+        class StallingProvider(ScriptedProvider):
+            def generate_stream(self, prompt, model=None, options=None):
+                def deltas():
+                    try:
+                        yield "a"
+                        time.sleep(0.3)
+                        yield "b"
+                        time.sleep(10)
+                    finally:
+                        closed.set()
+
+                streams.append(deltas())
+                return streams[-1]
+
+        provider = ResilientProvider(StallingProvider([(0, None)]), deadline=0.1)
+
+        with pytest.raises(DeadlineExceededError):
+            list(provider.generate_stream("Hello"))
+        assert closed.wait(1)
+
+    def test_stream_retries_before_first_delta(self):
+        """Streams are retried while nothing has been delivered."""
+        inner = ScriptedProvider([(0, ConnectionError("reset")), (0, None)])
+        provider = ResilientProvider(inner, backoff_base=0.01)
+
+        assert list(provider.generate_stream("Hello")) == ["a", "b"]
+        assert inner.calls == 2
+
+
+class TestAsyncResilience:
+    """Test the asyncio path of the resilience wrappers."""
+
+    def test_transient_errors_are_retried(self):
+        """agenerate retries connection failures with backoff."""
+        inner = ScriptedProvider([(0, ConnectionError("reset")), (0, None)])
+        provider = ResilientProvider(inner, backoff_base=0.01)
+
+        assert asyncio.run(provider.agenerate("Hello")) == "answer-2"
+        assert provider.stats["retries"] == 1
+
+    def test_stalled_generation_hits_deadline(self):
+        """A stalled await fails at the deadline."""
+        provider = ResilientProvider(ScriptedProvider([(1.0, None)]), deadline=0.1)
+
+        with pytest.raises(DeadlineExceededError):
+            asyncio.run(provider.agenerate("Hello"))
+        assert provider.stats["timeouts"] == 1
+
+    def test_stream_fails_over_before_first_delta(self):
+        """An async stream that cannot start is served by the fallback."""
+        from transcoder.resilience import CircuitBreakerProvider
+
+        fallback = ScriptedProvider([(0, None)])
+        breaker = CircuitBreakerProvider(ScriptedProvider([(0, ConnectionError("refused"))]), fallback=fallback)
+
+        async def collect():
+            return [delta async for delta in breaker.astream("Hello")]
+
+        assert asyncio.run(collect()) == ["a", "b"]
+        assert fallback.calls == 1
+
+
+class TestHedging:
+    """Test hedged requests."""
+
+    def test_slow_call_is_hedged(self):
+        """A duplicate request wins when the primary is slow."""
+        inner = ScriptedProvider([(1.0, None), (0.01, None)])
+        provider = ResilientProvider(inner, hedge=True, hedge_provider=inner, hedge_delay=0.05)
+
+        start = time.time()
+        assert provider.generate("Hello") == "answer-2"
+        assert time.time() - start < 0.5
+        assert provider.stats["hedges"] == 1
+        assert provider.stats["hedge_wins"] == 1
+
+    def test_hedge_delay_tracks_p95(self):
+        """Without a fixed delay, hedging waits for enough samples and uses their p95."""
+        inner = ScriptedProvider([(0, None)])
+        provider = ResilientProvider(inner, hedge=True, hedge_provider=inner, hedge_min_samples=5)
+
+        assert provider._current_hedge_delay() is None
+        provider._latencies.extend([0.1] * 19 + [2.0])
+        assert provider._current_hedge_delay() == 2.0
+        provider._latencies.extend([0.1] * 20)
+        assert provider._current_hedge_delay() == 0.1
+
+
+    def test_single_backend_is_not_hedged(self):
+        """Without another backend to duplicate onto, hedging stays off."""
+        provider = ResilientProvider(ScriptedProvider([(0, None)]), hedge=True, hedge_delay=0.05)
+
+        assert provider.hedge_provider is None
+        assert provider._current_hedge_delay() is None
+
+
+class TestCircuitBreaker:
+    """Test fail-fast and failover."""
+
+    def make_breaker(self, primary_script, **kwargs):
+        from transcoder.resilience import CircuitBreakerProvider
+
+        primary = ScriptedProvider(primary_script)
+        fallback = ScriptedProvider([(0, None)])
+        breaker = CircuitBreakerProvider(primary, fallback=fallback, failure_threshold=2, **kwargs)
+        return breaker, primary, fallback
+
+    def test_trips_after_consecutive_failures(self):
+        """Once open, calls skip the dead primary and go to the fallback."""
+        breaker, primary, fallback = self.make_breaker([(0, ConnectionError("refused"))], recovery_timeout=60)
+
+        for _ in range(4):
+            breaker.generate("Hello")
+
+        assert primary.calls == 2
+        assert fallback.calls == 4
+        assert breaker.state == "open"
+        assert breaker.get_statistics()["trips"] == 1
+
+    def test_latency_breaches_count_as_failures(self):
+        """Slow successes trip the circuit too."""
+        breaker, primary, _ = self.make_breaker([(0.05, None)], latency_threshold=0.01, recovery_timeout=60)
+
+        breaker.generate("Hello")
+        breaker.generate("Hello")
+
+        assert breaker.state == "open"
+
+    def test_half_open_probe_recovers(self):
+        """After the recovery timeout one probe reaches the primary and closes the circuit."""
+        breaker, primary, _ = self.make_breaker(
+            [(0, ConnectionError("refused")), (0, ConnectionError("refused")), (0, None)], recovery_timeout=0.05
+        )
+        breaker.generate("Hello")
+        breaker.generate("Hello")
+        assert breaker.state == "open"
+
+        time.sleep(0.06)
+        assert breaker.state == "half_open"
+        assert breaker.generate("Hello") == "answer-3"
+        assert breaker.state == "closed"
+
+    def test_fails_fast_without_fallback(self):
+        """With no fallback an open circuit raises immediately."""
+        from transcoder.resilience import CircuitBreakerProvider, CircuitOpenError
+
+        primary = ScriptedProvider([(0, ConnectionError("refused"))])
+        breaker = CircuitBreakerProvider(primary, failure_threshold=1, recovery_timeout=60)
+
+        with pytest.raises(ConnectionError):
+            breaker.generate("Hello")
+        with pytest.raises(CircuitOpenError):
+            breaker.generate("Hello")
+        assert primary.calls == 1
+
+    def test_backend_errors_do_not_trip(self):
+        """Errors reported by a healthy backend leave the circuit closed."""
+        breaker, primary, fallback = self.make_breaker([(0, ValueError("bad request"))])
+
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                breaker.generate("Hello")
+
+        assert breaker.state == "closed"
+        assert fallback.calls == 0
+
+    def test_stream_fails_over_before_first_delta(self):
+        """A stream that cannot start is served by the fallback."""
+        breaker, _, fallback = self.make_breaker([(0, ConnectionError("refused"))])
+
+        assert list(breaker.generate_stream("Hello")) == ["a", "b"]
+        assert fallback.calls == 1
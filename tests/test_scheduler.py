@@ -0,0 +1,124 @@
+"""
+Tests for TransCoder model-affinity scheduling
+"""
+
+import threading
+import time
+
+from transcoder.core import TranslationService
+from transcoder.scheduler import ModelAffinityScheduler, ScheduledProvider
+from tests.test_core import FakeProvider
+
+
+def run_in_background(scheduler, model, order, hold=0.02):
+    """Acquire a slot for ``model`` on a thread and record the admission order."""
+
+    def work():
+        with scheduler.slot(model):
+            order.append(model)
+            time.sleep(hold)
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    return thread
+
+
+def wait_for_depth(scheduler, total):
+    deadline = time.time() + 2
+    while sum(scheduler.queue_depth().values()) < total and time.time() < deadline:
+        time.sleep(0.005)
+
+
+class TestModelAffinityScheduler:
+    """Test grouping, fairness and queue reporting."""
+
+    def test_drains_one_model_before_switching(self):
+        """Interleaved arrivals are served grouped by model."""
+        scheduler = ModelAffinityScheduler(capacity=1, max_wait=5)
+        order = []
+        threads = [run_in_background(scheduler, "a", order, hold=0.1)]
+        time.sleep(0.02)
+        for model in ["b", "a", "b", "a"]:
+            threads.append(run_in_background(scheduler, model, order))
+            time.sleep(0.005)
+        wait_for_depth(scheduler, 4)
+
+        assert scheduler.queue_depth() == {"a:latest": 2, "b:latest": 2}
+        for thread in threads:
+            thread.join()
+
+        assert order == ["a", "a", "a", "b", "b"]
+        assert scheduler.switches == 2
+
+    def test_fairness_bound(self):
+        """A waiting model gets its turn after max_batch requests of the active one."""
+        scheduler = ModelAffinityScheduler(capacity=1, max_batch=2, max_wait=5)
+        order = []
+        threads = [run_in_background(scheduler, "a", order, hold=0.1)]
+        time.sleep(0.02)
+        threads.append(run_in_background(scheduler, "b", order))
+        time.sleep(0.005)
+        for _ in range(3):
+            threads.append(run_in_background(scheduler, "a", order))
+            time.sleep(0.005)
+        wait_for_depth(scheduler, 4)
+        for thread in threads:
+            thread.join()
+
+        assert order[:3] == ["a", "a", "b"]
+
+    def test_max_wait_forces_switch(self):
+        """A request that has waited max_wait preempts the active model's queue."""
+        scheduler = ModelAffinityScheduler(capacity=1, max_batch=100, max_wait=0.05)
+        order = []
+        threads = [run_in_background(scheduler, "a", order, hold=0.1)]
+        time.sleep(0.02)
+        threads.append(run_in_background(scheduler, "b", order))
+        time.sleep(0.005)
+        for _ in range(3):
+            threads.append(run_in_background(scheduler, "a", order))
+            time.sleep(0.005)
+        for thread in threads:
+            thread.join()
+
+        assert order[:2] == ["a", "b"]
+
+    def test_same_model_uses_full_capacity(self):
+        """Requests for the active model run concurrently up to capacity."""
+        provider = FakeProvider(delay=0.1)
+        service = TranslationService(model="fake", provider=provider, scheduler={"max_wait": 1})
+
+        service.translate("Hello", "en", ["zh-cn", "ja", "ko", "fr"])
+
+        assert isinstance(service.provider, ScheduledProvider)
+        assert provider.max_in_flight == 4
+
+    def test_async_generations_wait_for_a_slot(self):
+        """agenerate holds a scheduler slot without blocking the event loop."""
+        import asyncio
+
+        from tests.test_providers import AsyncFakeProvider
+
+        inner = AsyncFakeProvider()
+        provider = ScheduledProvider(inner, scheduler=ModelAffinityScheduler(capacity=1))
+
+        async def run():
+            return await asyncio.gather(*(provider.agenerate(f"p{i}", model="fake") for i in range(3)))
+
+        assert asyncio.run(run()) == ["fake:p0", "fake:p1", "fake:p2"]
+        assert inner.max_in_flight == 1
+        assert provider.scheduler.get_statistics()["in_flight"] == 0
+
+    def test_queueing_does_not_count_against_the_deadline(self):
+        """The scheduler wraps the resilience layer, so the deadline starts once a slot is granted."""
+        from transcoder.resilience import ResilientProvider
+
+        provider = FakeProvider(delay=0.1, parallelism=1)
+        service = TranslationService(
+            model="fake", provider=provider, scheduler={"max_wait": 1}, resilience={"deadline": 0.15}
+        )
+
+        result = service.translate("Hello", "en", ["zh-cn", "ja"])
+
+        assert isinstance(service.provider.provider, ResilientProvider)
+        assert all("error" not in entry for entry in result.data["translations"].values())
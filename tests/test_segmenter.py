@@ -0,0 +1,46 @@
+"""
+Tests for TransCoder document segmentation
+"""
+
+from transcoder.segmenter import segment_document, split_sentences
+
+
+class TestSplitSentences:
+    """Test sentence splitting across scripts."""
+
+    def test_cjk_terminators_need_no_space(self):
+        assert split_sentences("今天很好。明天呢？好！") == ["今天很好。", "明天呢？", "好！"]
+
+    def test_latin_terminators_need_whitespace(self):
+        assert split_sentences("Version 1.5 is out. Try it!") == ["Version 1.5 is out. ", "Try it!"]
+
+    def test_closing_quotes_stay_with_sentence(self):
+        assert split_sentences("他说：“走吧。”然后走了。") == ["他说：“走吧。”", "然后走了。"]
+
+
+class TestSegmentDocument:
+    """Test segmenting and reassembling documents."""
+
+    TEXT = "  第一句。第二句。\n\n第三句很长。\n第四句。\n\n\n Last one. Really.\n"
+
+    def test_round_trip_keeps_whitespace(self):
+        document = segment_document(self.TEXT, max_tokens=1)
+
+        assert document.assemble([None] * len(document.segments)) == self.TEXT
+        assert document.leading == "  "
+        assert [segment.paragraph for segment in document.segments] == [0, 0, 1, 1, 2, 2]
+
+    def test_sentences_merged_within_budget(self):
+        document = segment_document(self.TEXT, max_tokens=300)
+
+        assert [segment.text for segment in document.segments] == [
+            "第一句。第二句。",
+            "第三句很长。\n第四句。",
+            "Last one. Really.",
+        ]
+
+    def test_spacing_follows_target_language(self):
+        document = segment_document("第一句。第二句。\n\n第三句。", max_tokens=1)
+
+        assert document.assemble(["One.", "Two.", "Three."], "en") == "One. Two.\n\nThree."
+        assert document.assemble(["一。", "二。", "三。"], "ja") == "一。二。\n\n三。"
@@ -0,0 +1,104 @@
+"""
+Tests for TransCoder streaming helpers
+"""
+
+import threading
+import time
+
+import pytest
+from transcoder.streaming import multiplex
+
+
+def ticker(name, count, delay):
+    def produce():
+        for i in range(count):
+            time.sleep(delay)
+            yield (name, i)
+
+    return produce
+
+
+class TestMultiplex:
+    """Test concurrent interleaving of generators."""
+
+    def test_sources_stream_concurrently(self):
+        """Items from every source arrive interleaved, not source by source."""
+        start = time.time()
+        items = list(multiplex([ticker("a", 3, 0.05), ticker("b", 3, 0.05)]))
+
+        assert sorted(items) == [("a", 0), ("a", 1), ("a", 2), ("b", 0), ("b", 1), ("b", 2)]
+        assert {items[0][0], items[1][0]} == {"a", "b"}
+        assert time.time() - start < 0.25
+
+    def test_errors_are_mapped(self):
+        """A failing source is reported through on_error."""
+
+        def broken():
+            yield "ok"
+            raise RuntimeError("boom")
+
+        items = list(multiplex([broken], on_error=lambda index, e: f"error:{index}:{e}"))
+        assert items == ["ok", "error:0:boom"]
+
+    def test_errors_raise_without_handler(self):
+        """Without on_error the producer exception propagates."""
+
+        def broken():
+            raise RuntimeError("boom")
+            yield  # pragma: no cover
+
+        with pytest.raises(RuntimeError):
+            list(multiplex([broken]))
+
+    def test_close_stops_producers(self):
+        """Closing the consumer stops producers at their next item."""
+        produced = []
+        finished = threading.Event()
+
+        def endless():
+            try:
+                for i in range(1000):
+                    produced.append(i)
+                    time.sleep(0.01)
+                    yield i
+            finally:
+                finished.set()
+
+        stream = multiplex([endless])
+        next(stream)
+        stream.close()
+
+        assert finished.wait(1.0)
+        assert len(produced) < 1000
+
+
+class TestDeltaFramer:
+    """Test delta-only frame coalescing."""
+
+    def test_frames_carry_only_new_text(self):
+        """Frames concatenate to the full text and offsets are contiguous."""
+        import zlib
+
+        from transcoder.streaming import DeltaFramer
+
+        framer = DeltaFramer(frame_size=8, frame_age=60, checksum_every=2)
+        deltas = ["你", "好", "，", "世界", "！", "Hello", " world", "."]
+        frames = [f for f in (framer.push(d) for d in deltas) if f]
+        frames.append(framer.flush(final=True))
+
+        text = "".join(deltas)
+        assert "".join(f["content"] for f in frames) == text
+        assert frames[0]["content"] == "你"
+        assert len(frames) < len(deltas)
+        assert [f["offset"] for f in frames] == [sum(len(g["content"]) for g in frames[:i]) for i in range(len(frames))]
+        assert frames[-1]["checksum"] == f"{zlib.crc32(text.encode('utf-8')):08x}"
+
+    def test_frame_age_bounds_latency(self):
+        """Buffered text is released once it is older than frame_age."""
+        from transcoder.streaming import DeltaFramer
+
+        framer = DeltaFramer(frame_size=1000, frame_age=0.01)
+        framer.push("a")
+        assert framer.push("b") is None
+        time.sleep(0.02)
+        assert framer.push("c")["content"] == "bc"
@@ -0,0 +1,52 @@
+"""
+Tests for TransCoder reasoning control
+"""
+
+from transcoder.thinking import ThinkingFilter, parse_no_think, strip_thinking
+
+
+class TestStripThinking:
+    """Test removal of think blocks from complete output."""
+
+    def test_block_removed(self):
+        visible, reasoning = strip_thinking("<think>\nThe user wants French.\n</think>\n\nBonjour")
+
+        assert visible == "Bonjour"
+        assert reasoning.strip() == "The user wants French."
+
+    def test_empty_block_from_suppressed_thinking(self):
+        """Qwen3 still emits an empty block when thinking is turned off."""
+        assert strip_thinking("<think>\n\n</think>\n\n你好") == ("你好", "\n\n")
+
+    def test_unterminated_block_dropped(self):
+        """A generation cut off mid-thought has no visible answer."""
+        assert strip_thinking("<think>still reasoning")[0] == ""
+
+    def test_plain_text_untouched(self):
+        assert strip_thinking("Hello <b>world</b>") == ("Hello <b>world</b>", "")
+
+
+class TestThinkingFilter:
+    """Test incremental removal of think blocks from streamed deltas."""
+
+    def test_tags_split_across_deltas(self):
+        thinking = ThinkingFilter()
+        deltas = ["<th", "ink>hmm", "</th", "ink>", "\n", "Bon", "jour <", "3"]
+
+        visible = "".join(thinking.feed(delta) for delta in deltas) + thinking.flush()
+
+        assert visible == "Bonjour <3"
+        assert thinking.reasoning == "hmm"
+
+    def test_visible_text_released_promptly(self):
+        """Text outside a block is emitted as soon as it cannot be part of a tag."""
+        thinking = ThinkingFilter()
+
+        assert thinking.feed("Hello <") == "Hello "
+        assert thinking.feed("3 world") == "<3 world"
+
+
+def test_parse_no_think():
+    assert parse_no_think("all") == {"translate": False, "reflect": False, "improve": False}
+    assert parse_no_think("translate, improve,bogus") == {"translate": False, "improve": False}
+    assert parse_no_think("") == {}
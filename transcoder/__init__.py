@@ -11,14 +11,17 @@ __author__ = "TransCoder Team"
 __email__ = "transcoder@example.com"
 __license__ = "MIT"
 
-from transcoder.api import TransCoderAPI
+from transcoder.api import AsyncTransCoderAPI, TransCoderAPI
+from transcoder.cache import TranslationCache
 from transcoder.core import EvaluationService, TerminologyService, TranslationService, VectorDBService
 
 __all__ = [
     "TransCoderAPI",
+    "AsyncTransCoderAPI",
     "TranslationService",
     "VectorDBService",
     "TerminologyService",
     "EvaluationService",
+    "TranslationCache",
     "__version__",
 ]
@@ -4,31 +4,19 @@ TransCoder Unified API
 Provides a unified Python API for all TransCoder functionality.
 """
 
-from typing import Dict, List, Optional
+import asyncio
+import functools
+from dataclasses import asdict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
+from transcoder.cache import TranslationCache
 from transcoder.core import EvaluationService, TerminologyService, ToolResult, TranslationService, VectorDBService
+from transcoder.memory import LeverageTiers, TranslationPair
+from transcoder.options import GenerationOptions
 
 
-class TransCoderAPI:
-    """
-    Unified API for TransCoder translation platform.
-
-    Usage:
-        # Using Ollama (default)
-        api = TransCoderAPI(model="qwen3:0.6b")
-
-        # Using OpenAI
-        api = TransCoderAPI(provider_type="openai", model="gpt-4o-mini")
-
-        # Simple translation
-        result = api.translate("Hello", "en", ["zh-cn", "ja"])
-
-        # Reflection translation (三省吾身)
-        result = api.translate_with_reflection("Hello", "en", "zh-cn")
-
-        # Iterative refinement (千锤百炼)
-        result = api.translate_iterative("Hello", "en", "zh-cn", iterations=3)
-    """
+class _TransCoderAPIBase:
+    """Shared configuration and lazily loaded services for the sync and async APIs."""
 
     def __init__(
         self,
@@ -39,18 +27,46 @@ class TransCoderAPI:
         terminology_path: str = "data/terminology",
         use_proxy: bool = False,
         proxy_url: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        cache: Optional[TranslationCache] = None,
+        coalesce_requests: bool = False,
+        resilience: Optional[Dict[str, Any]] = None,
+        circuit_breaker: Optional[Dict[str, Any]] = None,
+        scheduler: Optional[Dict[str, Any]] = None,
+        options: Optional[GenerationOptions] = None,
+        output_cap_factor: Optional[float] = 4.0,
+        think: Optional[Dict[str, bool]] = None,
+        tm_tiers: Optional[LeverageTiers] = None,
+        context_budget_tokens: int = 512,
     ):
         """
         Initialize TransCoder API.
 
         Args:
             model: Default model to use (e.g., "qwen3:0.6b" for Ollama, "gpt-4o-mini" for OpenAI)
-            ollama_host: Ollama server address (only for Ollama provider)
+            ollama_host: Ollama server address (only for Ollama provider); comma-separate several
+                addresses to load-balance across hosts
             provider_type: LLM provider type ("ollama" or "openai"). Default is "ollama".
             vector_db_path: Path for translation memory storage
             terminology_path: Path for terminology database
             use_proxy: Whether to use proxy for API calls
             proxy_url: Proxy URL (e.g., socks5://127.0.0.1:7897)
+            max_workers: Target languages translated concurrently (defaults to provider parallelism)
+            cache: Translation result cache; identical requests are served from it when set
+            coalesce_requests: Share one LLM generation between concurrent identical prompts
+            resilience: Per-call deadline, retry and hedging settings, e.g.
+                ``{"deadline": 60, "max_retries": 2, "hedge": True}``
+            circuit_breaker: Fail-fast and failover settings, e.g.
+                ``{"fallback": create_provider("openai", base_url=...), "failure_threshold": 5}``
+            scheduler: Group queued generations by model to avoid model swaps, e.g.
+                ``{"max_batch": 32, "max_wait": 10.0}``
+            options: Default generation options, e.g. ``GenerationOptions(temperature=0.2, num_ctx=8192)``
+            output_cap_factor: Output token cap per estimated target token; None disables the cap
+            think: Per-stage thinking switch for reasoning models, e.g. ``{"translate": False}``
+                skips Qwen3's ``<think>`` phase when translating; stages not listed keep the
+                model's default
+            tm_tiers: Fuzzy translation memory thresholds, e.g. ``LeverageTiers(high=0.95, mid=0.75)``
+            context_budget_tokens: Estimated prompt tokens per language for TM references and glossary terms
         """
         self.model = model
         self.ollama_host = ollama_host
@@ -59,7 +75,21 @@ class TransCoderAPI:
         self.proxy_url = proxy_url
 
         self.translation_service = TranslationService(
-            model=model, ollama_host=ollama_host, provider_type=provider_type, use_proxy=use_proxy, proxy_url=proxy_url
+            model=model,
+            ollama_host=ollama_host,
+            provider_type=provider_type,
+            use_proxy=use_proxy,
+            proxy_url=proxy_url,
+            max_workers=max_workers,
+            coalesce_requests=coalesce_requests,
+            resilience=resilience,
+            circuit_breaker=circuit_breaker,
+            scheduler=scheduler,
+            options=options,
+            output_cap_factor=output_cap_factor,
+            think=think,
+            tm_tiers=tm_tiers,
+            context_budget_tokens=context_budget_tokens,
         )
 
         self._vector_db: Optional[VectorDBService] = None
@@ -69,6 +99,8 @@ class TransCoderAPI:
         self._vector_db_path = vector_db_path
         self._terminology_path = terminology_path
 
+        self.cache = cache
+
     @property
     def vector_db(self) -> VectorDBService:
         """Lazy-loaded vector database service."""
@@ -90,6 +122,112 @@ class TransCoderAPI:
             self._evaluation = EvaluationService()
         return self._evaluation
 
+    def get_supported_languages(self) -> Dict[str, str]:
+        """Get dictionary of supported languages."""
+        return TranslationService.SUPPORTED_LANGUAGES
+
+    def _cache_lookup(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_langs: List[str],
+        mode: str,
+        model: str,
+        use_vector_db: bool,
+        use_terminology: bool,
+        iterations: int,
+        options: Optional[GenerationOptions] = None,
+        single_call: bool = False,
+    ) -> Tuple[Dict[str, dict], Dict[str, str]]:
+        """Return cached per-language results and the cache key of every target language."""
+        if self.cache is None:
+            return {}, {}
+
+        service = self.translation_service
+        context = {
+            "source_lang": source_lang,
+            "model": model,
+            "provider": self.provider_type,
+            "mode": mode,
+            "iterations": iterations if mode == "iterate" else 1 if mode == "reflect" else 0,
+            "prompt_version": TranslationService.PROMPT_VERSION,
+            "terminology_version": self.terminology.version if use_terminology else None,
+            "tm_version": self.vector_db.version if use_vector_db else None,
+            "tm_tiers": asdict(service.tm_tiers) if use_vector_db else None,
+            "context_budget_tokens": service.context_budget_tokens if use_vector_db or use_terminology else None,
+            "options": options.to_dict() if options else None,
+            "default_options": service.options.to_dict() if service.options else None,
+            "think": service.think or None,
+            "single_call": single_call if mode == "simple" else False,
+        }
+
+        hits, keys = {}, {}
+        for target_lang in dict.fromkeys(target_langs):
+            keys[target_lang] = self.cache.make_key(source_text, target_lang=target_lang, **context)
+            cached = self.cache.get(keys[target_lang])
+            if cached is not None:
+                hits[target_lang] = cached
+        return hits, keys
+
+    def _cache_merge(
+        self,
+        target_langs: List[str],
+        mode: str,
+        hits: Dict[str, dict],
+        keys: Dict[str, str],
+        result: Optional[ToolResult],
+    ) -> ToolResult:
+        """Combine cache hits with freshly translated languages and store the new results."""
+        if self.cache is None or (result is not None and not result.success):
+            return result
+
+        fresh = result.data.get("translations", {}) if result is not None else {}
+        translations, status = {}, {}
+        for target_lang in dict.fromkeys(target_langs):
+            if target_lang in hits:
+                translations[target_lang] = hits[target_lang]
+                status[target_lang] = "hit"
+            else:
+                translations[target_lang] = fresh.get(target_lang, {})
+                status[target_lang] = "miss"
+                # Results cut off at the output cap are not worth reusing.
+                cacheable = "error" not in translations[target_lang] and not translations[target_lang].get(
+                    "metrics", {}
+                ).get("truncated")
+                if cacheable:
+                    self.cache.set(keys[target_lang], translations[target_lang])
+
+        data = dict(result.data) if result is not None else {}
+        data["translations"] = translations
+        if mode == "simple" and "source_lang" not in data and hits:
+            data["source_lang"] = next(iter(hits.values())).get("source_lang")
+
+        metadata = dict(result.metadata) if result is not None else {}
+        metadata["cache"] = status
+        return ToolResult(success=True, data=data, metadata=metadata)
+
+
+class TransCoderAPI(_TransCoderAPIBase):
+    """
+    Unified API for TransCoder translation platform.
+
+    Usage:
+        # Using Ollama (default)
+        api = TransCoderAPI(model="qwen3:0.6b")
+
+        # Using OpenAI
+        api = TransCoderAPI(provider_type="openai", model="gpt-4o-mini")
+
+        # Simple translation
+        result = api.translate("Hello", "en", ["zh-cn", "ja"])
+
+        # Reflection translation (三省吾身)
+        result = api.translate_with_reflection("Hello", "en", "zh-cn")
+
+        # Iterative refinement (千锤百炼)
+        result = api.translate_iterative("Hello", "en", "zh-cn", iterations=3)
+    """
+
     def get_available_models(self) -> ToolResult:
         """Get list of available Ollama models."""
         models = self.translation_service.get_available_models()
@@ -110,6 +248,9 @@ class TransCoderAPI:
         use_vector_db: bool = False,
         use_terminology: bool = False,
         iterations: int = 1,
+        max_workers: Optional[int] = None,
+        options: Optional[GenerationOptions] = None,
+        single_call: bool = False,
     ) -> ToolResult:
         """
         Translate text with various modes.
@@ -126,12 +267,68 @@ class TransCoderAPI:
             use_vector_db: Use translation memory
             use_terminology: Use terminology database
             iterations: Number of iterations for "iterate" mode (1-10)
+            max_workers: Target languages translated concurrently (defaults to provider parallelism)
+            options: Generation options for this request (max_tokens, num_ctx, temperature, seed, stop)
+            single_call: In "simple" mode, request every target language in one JSON-constrained
+                generation (faster for short strings); invalid languages fall back to separate calls
 
         Returns:
-            ToolResult with translations and metadata
+            ToolResult with translations and metadata; when a cache is
+            configured, ``metadata["cache"]`` maps each language to "hit" or "miss".
+            With ``use_vector_db``, exact and high-tier translation memory matches are
+            returned without a translation call and ``metadata["tm"]`` maps each language
+            to its leverage tier; see :meth:`TranslationService.translate_with_context`
         """
         model = model or self.model
 
+        if mode not in ("simple", "reflect", "iterate"):
+            return ToolResult(success=False, error=f"Unknown mode: {mode}. Use 'simple', 'reflect', or 'iterate'.")
+
+        hits, keys = self._cache_lookup(
+            source_text,
+            source_lang,
+            target_langs,
+            mode,
+            model,
+            use_vector_db,
+            use_terminology,
+            iterations,
+            options,
+            single_call,
+        )
+        misses = [target_lang for target_lang in target_langs if target_lang not in hits]
+        result = None
+        if misses:
+            result = self._translate_uncached(
+                source_text,
+                source_lang,
+                misses,
+                mode,
+                model,
+                use_vector_db,
+                use_terminology,
+                iterations,
+                max_workers,
+                options,
+                single_call,
+            )
+        return self._cache_merge(target_langs, mode, hits, keys, result)
+
+    def _translate_uncached(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_langs: List[str],
+        mode: str,
+        model: str,
+        use_vector_db: bool,
+        use_terminology: bool,
+        iterations: int,
+        max_workers: Optional[int],
+        options: Optional[GenerationOptions] = None,
+        single_call: bool = False,
+    ) -> ToolResult:
+        """Translate without consulting the result cache."""
         vector_db_svc = self.vector_db if use_vector_db else None
         terminology_svc = self.terminology if use_terminology else None
 
@@ -145,29 +342,151 @@ class TransCoderAPI:
                 use_terminology=use_terminology,
                 vector_db_service=vector_db_svc,
                 terminology_service=terminology_svc,
+                max_workers=max_workers,
+                options=options,
+                single_call=single_call,
             )
 
-        elif mode in ("reflect", "iterate"):
-            results = {}
-
-            for target_lang in target_langs:
-                iters = iterations if mode == "iterate" else 1
-                result = self.translation_service.translate_with_reflection(
-                    source_text=source_text,
-                    source_lang=source_lang,
-                    target_lang=target_lang,
-                    model=model,
-                    iterations=iters,
-                )
-                if result.success:
-                    results[target_lang] = result.data
-                else:
-                    results[target_lang] = {"error": result.error}
-
-            return ToolResult(success=True, data={"translations": results})
+        iters = iterations if mode == "iterate" else 1
+        if vector_db_svc is not None or terminology_svc is not None:
+            return self.translation_service.translate_with_context(
+                source_text,
+                source_lang,
+                target_langs,
+                lambda target_lang, context: self.translation_service.translate_with_reflection(
+                    source_text,
+                    context.source_lang,
+                    target_lang,
+                    model,
+                    iters,
+                    options,
+                    references=context.references.get(target_lang),
+                    terms=context.terms.get(target_lang),
+                ),
+                vector_db_svc,
+                terminology_svc,
+                model,
+                options,
+                max_workers,
+            )
 
-        else:
-            return ToolResult(success=False, error=f"Unknown mode: {mode}. Use 'simple', 'reflect', or 'iterate'.")
+        results = self.translation_service.fan_out(
+            lambda target_lang: self.translation_service.translate_with_reflection(
+                source_text=source_text,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                model=model,
+                iterations=iters,
+                options=options,
+            ),
+            target_langs,
+            max_workers=max_workers,
+        )
+
+        return ToolResult(success=True, data={"translations": results})
+
+    def translate_segments(
+        self,
+        segments: List[str],
+        source_lang: str,
+        target_langs: List[str],
+        model: Optional[str] = None,
+        budget_tokens: int = 1024,
+        max_workers: Optional[int] = None,
+        options: Optional[GenerationOptions] = None,
+    ) -> ToolResult:
+        """
+        Translate many short strings (UI labels, messages) in packed batches.
+
+        Args:
+            segments: Strings to translate; results keep their order
+            source_lang: Source language code (use "auto" for auto-detection)
+            target_langs: List of target language codes
+            model: Model to use (defaults to instance model)
+            budget_tokens: Estimated source tokens packed into one prompt
+            max_workers: Batches translated concurrently (defaults to provider parallelism)
+            options: Generation options for this request
+
+        Returns:
+            ToolResult whose ``data["translations"]`` maps each language to a list aligned with ``segments``
+        """
+        return self.translation_service.translate_segments(
+            segments=segments,
+            source_lang=source_lang,
+            target_langs=target_langs,
+            model=model or self.model,
+            budget_tokens=budget_tokens,
+            max_workers=max_workers,
+            options=options,
+        )
+
+    def translate_document(
+        self,
+        text: str,
+        source_lang: str,
+        target_langs: List[str],
+        model: Optional[str] = None,
+        max_segment_tokens: int = 300,
+        context_window: int = 0,
+        max_workers: Optional[int] = None,
+        options: Optional[GenerationOptions] = None,
+    ) -> ToolResult:
+        """
+        Translate a long document in sentence-aligned segments, concurrently.
+
+        Args:
+            text: Document to translate
+            source_lang: Source language code (use "auto" for auto-detection)
+            target_langs: List of target language codes
+            model: Model to use (defaults to instance model)
+            max_segment_tokens: Estimated source tokens per segment
+            context_window: Neighbouring segments on each side passed as context
+            max_workers: Segments translated concurrently (defaults to provider parallelism)
+            options: Generation options for this request
+
+        Returns:
+            ToolResult whose ``data["translations"]`` maps each language to the reassembled document
+        """
+        return self.translation_service.translate_document(
+            text=text,
+            source_lang=source_lang,
+            target_langs=target_langs,
+            model=model or self.model,
+            max_segment_tokens=max_segment_tokens,
+            context_window=context_window,
+            max_workers=max_workers,
+            options=options,
+        )
+
+    def translate_stream(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_langs: List[str],
+        model: Optional[str] = None,
+        multiplex: bool = False,
+        frame_size: Optional[int] = None,
+        frame_age: float = 0.05,
+        options: Optional[GenerationOptions] = None,
+    ) -> Iterator[dict]:
+        """
+        Stream a translation token by token.
+
+        Yields ``start``, ``content``, ``complete`` and ``error`` events per
+        target language; see :meth:`TranslationService.translate_stream`.
+        With ``multiplex`` every language streams concurrently; ``frame_size``
+        coalesces deltas into delta-only frames.
+        """
+        return self.translation_service.translate_stream(
+            source_text=source_text,
+            source_lang=source_lang,
+            target_langs=target_langs,
+            model=model or self.model,
+            multiplex=multiplex,
+            frame_size=frame_size,
+            frame_age=frame_age,
+            options=options,
+        )
 
     def translate_with_reflection(
         self, source_text: str, source_lang: str, target_lang: str, model: Optional[str] = None, iterations: int = 1
@@ -268,6 +587,18 @@ class TransCoderAPI:
         """Add translation to memory database."""
         return self.vector_db.add_translation_pair(source_text=source_text, translations=translations)
 
+    def add_translation_memories(
+        self,
+        pairs: Iterable[Union[TranslationPair, Dict[str, Any]]],
+        batch_size: int = 256,
+        checkpoint_every: Optional[int] = 10000,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> ToolResult:
+        """Bulk-add translations to memory, encoding and indexing them in batches."""
+        return self.vector_db.add_translation_pairs(
+            pairs, batch_size=batch_size, checkpoint_every=checkpoint_every, progress=progress
+        )
+
     def search_similar_translations(self, query_text: str, k: int = 5) -> ToolResult:
         """Search for similar translations in memory."""
         return self.vector_db.search_similar(query_text=query_text, k=k)
@@ -292,6 +623,319 @@ class TransCoderAPI:
             source_text=source_text, translated_text=translated_text, reference_text=reference_text, metrics=metrics
         )
 
-    def get_supported_languages(self) -> Dict[str, str]:
-        """Get dictionary of supported languages."""
-        return TranslationService.SUPPORTED_LANGUAGES
+
+class AsyncTransCoderAPI(_TransCoderAPIBase):
+    """
+    Asyncio mirror of :class:`TransCoderAPI`.
+
+    Every method is a coroutine. Target languages are scheduled as
+    concurrent tasks in all modes, and cancelling the awaiting task
+    cancels the outstanding provider calls.
+
+    Usage:
+        api = AsyncTransCoderAPI(model="qwen3:0.6b")
+
+        result = await api.translate("Hello", "en", ["zh-cn", "ja"], mode="reflect")
+    """
+
+    async def _run_sync(self, func, *args, **kwargs):
+        """Run a blocking service call in the default executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    async def get_available_models(self) -> ToolResult:
+        """Get list of available models."""
+        from transcoder.providers import is_async_provider
+
+        provider = self.translation_service.provider
+        if is_async_provider(provider):
+            models = await provider.aget_available_models()
+        else:
+            models = await self._run_sync(provider.get_available_models)
+        return ToolResult(success=True, data={"models": models, "default": self.model})
+
+    async def detect_language(self, text: str) -> ToolResult:
+        """Detect language of text."""
+        lang = await self.translation_service.adetect_language(text)
+        return ToolResult(success=True, data={"language": lang})
+
+    async def translate(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_langs: List[str],
+        mode: str = "simple",
+        model: Optional[str] = None,
+        use_vector_db: bool = False,
+        use_terminology: bool = False,
+        iterations: int = 1,
+        max_workers: Optional[int] = None,
+        options: Optional[GenerationOptions] = None,
+        single_call: bool = False,
+    ) -> ToolResult:
+        """
+        Translate text with various modes.
+
+        Accepts the same arguments as :meth:`TransCoderAPI.translate`.
+        """
+        model = model or self.model
+
+        if mode not in ("simple", "reflect", "iterate"):
+            return ToolResult(success=False, error=f"Unknown mode: {mode}. Use 'simple', 'reflect', or 'iterate'.")
+
+        hits, keys = self._cache_lookup(
+            source_text,
+            source_lang,
+            target_langs,
+            mode,
+            model,
+            use_vector_db,
+            use_terminology,
+            iterations,
+            options,
+            single_call,
+        )
+        misses = [target_lang for target_lang in target_langs if target_lang not in hits]
+        result = None
+        if misses:
+            result = await self._translate_uncached(
+                source_text,
+                source_lang,
+                misses,
+                mode,
+                model,
+                use_vector_db,
+                use_terminology,
+                iterations,
+                max_workers,
+                options,
+                single_call,
+            )
+        return self._cache_merge(target_langs, mode, hits, keys, result)
+
+    async def _translate_uncached(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_langs: List[str],
+        mode: str,
+        model: str,
+        use_vector_db: bool,
+        use_terminology: bool,
+        iterations: int,
+        max_workers: Optional[int],
+        options: Optional[GenerationOptions] = None,
+        single_call: bool = False,
+    ) -> ToolResult:
+        """Translate without consulting the result cache."""
+        # Loading the services reads from disk; keep it off the event loop.
+        vector_db_svc = await self._run_sync(lambda: self.vector_db) if use_vector_db else None
+        terminology_svc = await self._run_sync(lambda: self.terminology) if use_terminology else None
+
+        if mode == "simple":
+            return await self.translation_service.atranslate(
+                source_text=source_text,
+                source_lang=source_lang,
+                target_langs=target_langs,
+                model=model,
+                max_workers=max_workers,
+                options=options,
+                single_call=single_call,
+                use_vector_db=use_vector_db,
+                use_terminology=use_terminology,
+                vector_db_service=vector_db_svc,
+                terminology_service=terminology_svc,
+            )
+
+        iters = iterations if mode == "iterate" else 1
+        if vector_db_svc is not None or terminology_svc is not None:
+            return await self.translation_service.atranslate_with_context(
+                source_text,
+                source_lang,
+                target_langs,
+                lambda target_lang, context: self.translation_service.atranslate_with_reflection(
+                    source_text,
+                    context.source_lang,
+                    target_lang,
+                    model,
+                    iters,
+                    options,
+                    context.references.get(target_lang),
+                    context.terms.get(target_lang),
+                ),
+                vector_db_svc,
+                terminology_svc,
+                model,
+                options,
+                max_workers,
+            )
+
+        results = await self.translation_service.afan_out(
+            lambda target_lang: self.translation_service.atranslate_with_reflection(
+                source_text=source_text,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                model=model,
+                iterations=iters,
+                options=options,
+            ),
+            target_langs,
+            max_workers=max_workers,
+        )
+
+        return ToolResult(success=True, data={"translations": results})
+
+    async def translate_segments(
+        self,
+        segments: List[str],
+        source_lang: str,
+        target_langs: List[str],
+        model: Optional[str] = None,
+        budget_tokens: int = 1024,
+        max_workers: Optional[int] = None,
+        options: Optional[GenerationOptions] = None,
+    ) -> ToolResult:
+        """Translate many short strings in packed batches; see :meth:`TransCoderAPI.translate_segments`."""
+        return await self._run_sync(
+            self.translation_service.translate_segments,
+            segments=segments,
+            source_lang=source_lang,
+            target_langs=target_langs,
+            model=model or self.model,
+            budget_tokens=budget_tokens,
+            max_workers=max_workers,
+            options=options,
+        )
+
+    async def translate_document(
+        self,
+        text: str,
+        source_lang: str,
+        target_langs: List[str],
+        model: Optional[str] = None,
+        max_segment_tokens: int = 300,
+        context_window: int = 0,
+        max_workers: Optional[int] = None,
+        options: Optional[GenerationOptions] = None,
+    ) -> ToolResult:
+        """Translate a long document in segments; see :meth:`TransCoderAPI.translate_document`."""
+        return await self._run_sync(
+            self.translation_service.translate_document,
+            text=text,
+            source_lang=source_lang,
+            target_langs=target_langs,
+            model=model or self.model,
+            max_segment_tokens=max_segment_tokens,
+            context_window=context_window,
+            max_workers=max_workers,
+            options=options,
+        )
+
+    async def translate_with_reflection(
+        self, source_text: str, source_lang: str, target_lang: str, model: Optional[str] = None, iterations: int = 1
+    ) -> ToolResult:
+        """Translate with reflection-based improvement (三省吾身模式)."""
+        return await self.translation_service.atranslate_with_reflection(
+            source_text=source_text,
+            source_lang=source_lang,
+            target_lang=target_lang,
+            model=model or self.model,
+            iterations=iterations,
+        )
+
+    async def translate_iterative(
+        self, source_text: str, source_lang: str, target_lang: str, model: Optional[str] = None, iterations: int = 3
+    ) -> ToolResult:
+        """Iterative refinement translation (千锤百炼模式)."""
+        return await self.translate_with_reflection(
+            source_text=source_text,
+            source_lang=source_lang,
+            target_lang=target_lang,
+            model=model,
+            iterations=min(max(1, iterations), 10),
+        )
+
+    async def reflect_translation(
+        self, source_text: str, translation: str, source_lang: str, target_lang: str, model: Optional[str] = None
+    ) -> ToolResult:
+        """Analyze translation quality (反思翻译)."""
+        return await self.translation_service.areflect_translation(
+            source_text=source_text,
+            translation=translation,
+            source_lang=source_lang,
+            target_lang=target_lang,
+            model=model or self.model,
+        )
+
+    async def improve_translation(
+        self,
+        source_text: str,
+        current_translation: str,
+        reflection: str,
+        source_lang: str,
+        target_lang: str,
+        model: Optional[str] = None,
+    ) -> ToolResult:
+        """Improve translation based on reflection analysis."""
+        return await self.translation_service.aimprove_translation(
+            source_text=source_text,
+            current_translation=current_translation,
+            reflection=reflection,
+            source_lang=source_lang,
+            target_lang=target_lang,
+            model=model or self.model,
+        )
+
+    async def add_translation_memory(self, source_text: str, translations: Dict[str, str]) -> ToolResult:
+        """Add translation to memory database."""
+        return await self._run_sync(lambda: self.vector_db.add_translation_pair(source_text, translations))
+
+    async def add_translation_memories(
+        self,
+        pairs: Iterable[Union[TranslationPair, Dict[str, Any]]],
+        batch_size: int = 256,
+        checkpoint_every: Optional[int] = 10000,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> ToolResult:
+        """Bulk-add translations to memory, encoding and indexing them in batches."""
+        return await self._run_sync(
+            lambda: self.vector_db.add_translation_pairs(
+                pairs, batch_size=batch_size, checkpoint_every=checkpoint_every, progress=progress
+            )
+        )
+
+    async def search_similar_translations(self, query_text: str, k: int = 5) -> ToolResult:
+        """Search for similar translations in memory."""
+        return await self._run_sync(lambda: self.vector_db.search_similar(query_text=query_text, k=k))
+
+    async def add_terminology(self, term: str, translations: Dict[str, str]) -> ToolResult:
+        """Add terminology entry."""
+        return await self._run_sync(lambda: self.terminology.add_term(term=term, translations=translations))
+
+    async def get_relevant_terminology(self, text: str) -> ToolResult:
+        """Get terminology relevant to text."""
+        return await self._run_sync(lambda: self.terminology.get_relevant_terms(text=text))
+
+    async def evaluate_translation(
+        self,
+        source_text: str,
+        translated_text: str,
+        reference_text: Optional[str] = None,
+        metrics: Optional[List[str]] = None,
+    ) -> ToolResult:
+        """Evaluate translation quality."""
+        return await self._run_sync(
+            self.evaluation.evaluate,
+            source_text=source_text,
+            translated_text=translated_text,
+            reference_text=reference_text,
+            metrics=metrics,
+        )
+
+    async def aclose(self) -> None:
+        """Release pooled provider connections."""
+        from transcoder.providers import AsyncLLMProvider
+
+        provider = self.translation_service.provider
+        if isinstance(provider, AsyncLLMProvider):
+            await provider.aclose()
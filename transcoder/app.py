@@ -12,6 +12,13 @@ from flask import Flask, Response, jsonify, render_template, request
 from flask_cors import CORS
 
 from transcoder.api import TransCoderAPI
+from transcoder.cache import TranslationCache
+from transcoder.memory import LeverageTiers
+from transcoder.options import GenerationOptions
+from transcoder.providers import create_provider, find_wrapper
+from transcoder.residency import ResidencyManager, parse_keep_alive, parse_keep_alive_policy
+from transcoder.scheduler import ScheduledProvider
+from transcoder.thinking import parse_no_think
 
 CONFIG_FILE = "data/config.json"
 
@@ -48,14 +55,87 @@ def create_app(config: Optional[dict] = None) -> Flask:
     model = os.getenv("OLLAMA_MODEL", "qwen3:0.6b" if provider_type == "ollama" else "gpt-4o-mini")
     ollama_host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
 
+    cache = None
+    if os.getenv("TRANSCODER_CACHE", "1") != "0":
+        cache = TranslationCache(
+            db_path=os.getenv("TRANSCODER_CACHE_PATH", "data/cache/translations.db"),
+            max_entries=int(os.getenv("TRANSCODER_CACHE_SIZE", "1024")),
+        )
+
+    resilience = None
+    if os.getenv("TRANSCODER_DEADLINE", "120") != "0":
+        resilience = {
+            "deadline": float(os.getenv("TRANSCODER_DEADLINE", "120")),
+            "max_retries": int(os.getenv("TRANSCODER_RETRIES", "2")),
+            "hedge": os.getenv("TRANSCODER_HEDGE", "0") == "1",
+        }
+
+    circuit_breaker = None
+    if os.getenv("TRANSCODER_BREAKER", "1") != "0":
+        circuit_breaker = {
+            "failure_threshold": int(os.getenv("TRANSCODER_BREAKER_FAILURES", "5")),
+            "recovery_timeout": float(os.getenv("TRANSCODER_BREAKER_RECOVERY", "30")),
+        }
+        fallback_url = os.getenv("TRANSCODER_FALLBACK_BASE_URL")
+        if fallback_url:
+            circuit_breaker["fallback"] = create_provider(
+                "openai",
+                model=os.getenv("TRANSCODER_FALLBACK_MODEL"),
+                base_url=fallback_url,
+                api_key=os.getenv("TRANSCODER_FALLBACK_API_KEY", "none"),
+            )
+            circuit_breaker["fallback_model"] = os.getenv("TRANSCODER_FALLBACK_MODEL")
+
+    scheduler = None
+    if os.getenv("TRANSCODER_SCHEDULER", "1") != "0":
+        scheduler = {
+            "max_batch": int(os.getenv("TRANSCODER_SCHEDULER_MAX_BATCH", "32")),
+            "max_wait": float(os.getenv("TRANSCODER_SCHEDULER_MAX_WAIT", "10")),
+        }
+
+    default_options = GenerationOptions.from_dict(
+        {
+            "num_ctx": int(os.getenv("TRANSCODER_NUM_CTX", "0")) or None,
+            "seed": int(os.getenv("TRANSCODER_SEED")) if os.getenv("TRANSCODER_SEED") else None,
+        }
+    )
+    output_cap_factor = float(os.getenv("TRANSCODER_OUTPUT_CAP", "4")) or None
+    tm_tiers = LeverageTiers(
+        high=float(os.getenv("TRANSCODER_TM_HIGH", "0.95")),
+        mid=float(os.getenv("TRANSCODER_TM_MID", "0.75")),
+        minimal_edit=os.getenv("TRANSCODER_TM_MINIMAL_EDIT", "0") == "1",
+    )
+
     api = TransCoderAPI(
         model=model,
         ollama_host=ollama_host,
         provider_type=provider_type,
         use_proxy=app_config.get("use_proxy", False),
         proxy_url=app_config.get("proxy_url"),
+        cache=cache,
+        coalesce_requests=os.getenv("TRANSCODER_COALESCE", "1") != "0",
+        resilience=resilience,
+        circuit_breaker=circuit_breaker,
+        scheduler=scheduler,
+        options=default_options,
+        output_cap_factor=output_cap_factor,
+        think=parse_no_think(os.getenv("TRANSCODER_NO_THINK", "all")),
+        tm_tiers=tm_tiers,
+        context_budget_tokens=int(os.getenv("TRANSCODER_CONTEXT_BUDGET", "512")),
     )
 
+    residency = ResidencyManager(
+        api.translation_service.provider,
+        keep_alive=parse_keep_alive_policy(os.getenv("TRANSCODER_KEEP_ALIVE", "")),
+        default_keep_alive=parse_keep_alive(os.getenv("OLLAMA_KEEP_ALIVE")) if os.getenv("OLLAMA_KEEP_ALIVE") else None,
+    )
+    if residency.enabled and os.getenv("TRANSCODER_PRELOAD", "1") != "0":
+        residency.preload_async(model)
+
+    def residency_warnings(requested_model: Optional[str]) -> list:
+        warning = residency.cold_start_warning(requested_model) if requested_model else None
+        return [warning] if warning else []
+
     # Ensure directories exist
     os.makedirs("data/vector_db", exist_ok=True)
     os.makedirs("data/terminology", exist_ok=True)
@@ -83,8 +163,19 @@ def create_app(config: Optional[dict] = None) -> Flask:
     @app.route("/api/models", methods=["GET"])
     def get_models():
         result = api.get_available_models()
+        result.data["residency"] = residency.get_status()
+        scheduled = find_wrapper(api.translation_service.provider, ScheduledProvider)
+        if scheduled is not None:
+            result.data["queue_depth"] = scheduled.scheduler.queue_depth()
         return jsonify(result.to_dict())
 
+    @app.route("/api/queue", methods=["GET"])
+    def get_queue():
+        scheduled = find_wrapper(api.translation_service.provider, ScheduledProvider)
+        if scheduled is None:
+            return jsonify({"enabled": False, "queue_depth": {}})
+        return jsonify({"enabled": True, **scheduled.scheduler.get_statistics()})
+
     @app.route("/api/languages", methods=["GET"])
     def get_languages():
         return jsonify(api.get_supported_languages())
@@ -98,12 +189,15 @@ def create_app(config: Optional[dict] = None) -> Flask:
         model = data.get("model")
         use_vector_db = data.get("use_vector_db", False)
         use_terminology = data.get("use_terminology", False)
+        options = GenerationOptions.from_dict(data.get("options"))
+        single_call = data.get("single_call", False)
 
         if not source_text:
             return jsonify({"error": "请输入要翻译的文本"}), 400
         if not target_langs:
             return jsonify({"error": "请选择至少一种目标语言"}), 400
 
+        warnings = residency_warnings(model)
         result = api.translate(
             source_text=source_text,
             source_lang=source_lang,
@@ -111,7 +205,20 @@ def create_app(config: Optional[dict] = None) -> Flask:
             model=model,
             use_vector_db=use_vector_db,
             use_terminology=use_terminology,
+            options=options,
+            single_call=single_call,
         )
+        if result.success:
+            truncated = [
+                lang for lang, t in result.data["translations"].items() if t.get("metrics", {}).get("truncated")
+            ]
+            if truncated:
+                warnings.append(f"Output reached the token limit and was cut off for: {', '.join(truncated)}")
+        if warnings:
+            result.metadata["warnings"] = warnings
+        if result.success:
+            load_times = [t.get("metrics", {}).get("load_time") or 0 for t in result.data["translations"].values()]
+            residency.observe(model or api.model, max(load_times, default=0))
         return jsonify(result.to_dict())
 
     @app.route("/api/translate/reflect", methods=["POST"])
@@ -146,6 +253,11 @@ def create_app(config: Optional[dict] = None) -> Flask:
         source_lang = data.get("source_lang", "auto")
         target_langs = data.get("target_langs", [])
         model = data.get("model")
+        multiplex = data.get("multiplex", True)
+        frame_size = int(data.get("frame_size", 32))
+        frame_age = float(data.get("frame_age", 0.05))
+        options = GenerationOptions.from_dict(data.get("options"))
+        warnings = residency_warnings(model)
 
         def generate():
             init_data = {
@@ -155,24 +267,24 @@ def create_app(config: Optional[dict] = None) -> Flask:
                 "target_langs": target_langs,
                 "model": model or api.model,
             }
+            if warnings:
+                init_data["warnings"] = warnings
             yield f"data: {json.dumps(init_data, ensure_ascii=False)}\n\n"
 
-            for target_lang in target_langs:
-                start_data = {"type": "start", "target_lang": target_lang}
-                yield f"data: {json.dumps(start_data, ensure_ascii=False)}\n\n"
-
-                result = api.translate(
-                    source_text=source_text, source_lang=source_lang, target_langs=[target_lang], model=model
-                )
-
-                if result.success:
-                    trans_data = result.data.get("translations", {}).get(target_lang, {})
-                    complete_data = {
-                        "type": "complete",
-                        "target_lang": target_lang,
-                        "final_content": trans_data.get("text", ""),
-                    }
-                    yield f"data: {json.dumps(complete_data, ensure_ascii=False)}\n\n"
+            try:
+                for event in api.translate_stream(
+                    source_text=source_text,
+                    source_lang=source_lang,
+                    target_langs=target_langs,
+                    model=model,
+                    multiplex=multiplex,
+                    frame_size=frame_size,
+                    frame_age=frame_age,
+                    options=options,
+                ):
+                    yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+            except Exception as e:
+                yield f"data: {json.dumps({'type': 'error', 'error': str(e)}, ensure_ascii=False)}\n\n"
 
             yield f"data: {json.dumps({'type': 'finished'}, ensure_ascii=False)}\n\n"
 
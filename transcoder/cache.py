@@ -0,0 +1,138 @@
+"""
+TransCoder Translation Result Cache
+
+Content-addressed cache for translation results with an in-memory LRU tier
+and an optional persistent SQLite tier.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def normalize_source_text(text: str) -> str:
+    """Normalize source text for cache keys (NFC, unified newlines, trimmed)."""
+    text = unicodedata.normalize("NFC", text)
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return "\n".join(line.rstrip() for line in text.strip().split("\n"))
+
+
+class TranslationCache:
+    """
+    Two-tier translation result cache.
+
+    Keys are SHA-256 digests of every input that can change the output
+    (see :meth:`make_key`). Lookups hit the in-memory LRU first and fall
+    back to SQLite, promoting persistent hits into memory.
+
+    Usage:
+        cache = TranslationCache(db_path="data/cache/translations.db", max_entries=1024)
+        key = cache.make_key(source_text="Hello", source_lang="en", target_lang="ja", model="qwen3:0.6b")
+        if cache.get(key) is None:
+            cache.set(key, {"text": "こんにちは"})
+    """
+
+    def __init__(self, db_path: Optional[str] = "data/cache/translations.db", max_entries: int = 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            db_path: SQLite file for the persistent tier (None for memory only)
+            max_entries: Size bound of the in-memory LRU tier
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(source_text: str, **parts: Any) -> str:
+        """
+        Build a cache key from the normalized source text and request parameters.
+
+        Args:
+            source_text: Text to translate (normalized before hashing)
+            **parts: Languages, model, mode, iterations, prompt version,
+                terminology/TM versions and any other output-affecting input
+        """
+        payload = {"source_text": normalize_source_text(source_text), **parts}
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached result."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute("SELECT value FROM translations WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a result in both tiers."""
+        with self._lock:
+            self._remember(key, value)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO translations (key, value, created) VALUES (?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), time.time()),
+                )
+                self._conn.commit()
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        """Insert into the LRU tier, evicting the oldest entries beyond the bound."""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM translations")
+                self._conn.commit()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get hit/miss counters and tier sizes."""
+        with self._lock:
+            persistent = 0
+            if self._conn is not None:
+                persistent = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "persistent_entries": persistent,
+            }
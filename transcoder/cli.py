@@ -24,6 +24,8 @@ Examples:
     transcoder                    Launch GUI (default)
     transcoder web --port 8080    Launch web server on port 8080
     transcoder cli -i input.txt -o output.txt -t en,ja,ko
+    transcoder cli -i strings.txt -t ja,ko --lines
+    transcoder cli -i book.txt -t en --segment-tokens 300 --context 1
     python -m transcoder web      Module invocation
         """,
     )
@@ -71,6 +73,27 @@ Examples:
     cli_parser.add_argument("--iterations", type=int, default=3, help="Iterations for iterate mode")
     cli_parser.add_argument("--use-vector-db", action="store_true", help="Use translation memory")
     cli_parser.add_argument("--use-terminology", action="store_true", help="Use terminology database")
+    cli_parser.add_argument(
+        "--lines",
+        action="store_true",
+        help="Translate each line as a separate string, packing short lines into batched prompts",
+    )
+    cli_parser.add_argument(
+        "--segment-tokens",
+        type=int,
+        default=0,
+        help="Split long input into sentence-aligned segments of about N tokens, translated concurrently "
+        "(simple mode; default: 0, translate the whole file at once)",
+    )
+    cli_parser.add_argument(
+        "--context", type=int, default=0, help="Neighbouring segments passed as context with --segment-tokens"
+    )
+    cli_parser.add_argument(
+        "--no-think",
+        default="all",
+        help="Stages run without the model's reasoning phase: 'all', a comma-separated list of "
+        "translate,reflect,improve, or '' to let the model think (default: all)",
+    )
 
     return parser
 
@@ -115,6 +138,7 @@ def run_cli(args) -> int:
     from pathlib import Path
 
     from transcoder.api import TransCoderAPI
+    from transcoder.thinking import parse_no_think
 
     # Read input file
     input_path = Path(args.input)
@@ -131,22 +155,34 @@ def run_cli(args) -> int:
         model = "qwen3:0.6b" if args.provider == "ollama" else "gpt-4o-mini"
 
     # Initialize API with provider
-    api = TransCoderAPI(model=model, provider_type=args.provider)
+    api = TransCoderAPI(model=model, provider_type=args.provider, think=parse_no_think(args.no_think))
 
     # Run translation
     if not args.quiet:
         provider_name = "Ollama" if args.provider == "ollama" else "OpenAI"
         print(f"Translating with {provider_name} ({model}) from {args.source_lang} to {target_langs}...")
 
-    result = api.translate(
-        source_text=source_text,
-        source_lang=args.source_lang,
-        target_langs=target_langs,
-        mode=args.mode_type,
-        use_vector_db=args.use_vector_db,
-        use_terminology=args.use_terminology,
-        iterations=args.iterations,
-    )
+    if args.lines:
+        return run_lines(api, args, source_text.splitlines(), target_langs)
+
+    if args.segment_tokens > 0 and args.mode_type == "simple":
+        result = api.translate_document(
+            text=source_text,
+            source_lang=args.source_lang,
+            target_langs=target_langs,
+            max_segment_tokens=args.segment_tokens,
+            context_window=args.context,
+        )
+    else:
+        result = api.translate(
+            source_text=source_text,
+            source_lang=args.source_lang,
+            target_langs=target_langs,
+            mode=args.mode_type,
+            use_vector_db=args.use_vector_db,
+            use_terminology=args.use_terminology,
+            iterations=args.iterations,
+        )
 
     if not result.success:
         print(f"Error: {result.error}", file=sys.stderr)
@@ -177,6 +213,38 @@ def run_cli(args) -> int:
     return 0
 
 
+def run_lines(api, args, lines, target_langs) -> int:
+    """Translate a file line by line with segment packing; output keeps the line structure."""
+    import json
+    from pathlib import Path
+
+    result = api.translate_segments(segments=lines, source_lang=args.source_lang, target_langs=target_langs)
+
+    if args.json_output:
+        output = json.dumps(result.to_dict(), ensure_ascii=False, indent=2)
+    else:
+        blocks = []
+        for lang, texts in result.data["translations"].items():
+            blocks.append(f"=== {lang} ===")
+            blocks.extend(text if text is not None else "" for text in texts)
+            blocks.append("")
+        output = "\n".join(blocks)
+
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+    else:
+        print(output)
+
+    if not args.quiet:
+        meta = result.metadata
+        print(
+            f"{meta['segments']} lines in {meta['batches']} batches, {meta['retried']} retried, "
+            f"{meta['failed']} failed ({meta['segments_per_second']} segments/s)",
+            file=sys.stderr,
+        )
+    return 0
+
+
 def main() -> int:
     """Main entry point."""
     parser = create_parser()
@@ -0,0 +1,66 @@
+"""
+TransCoder Translation Context
+
+Per-language translation memory references and glossary terms gathered
+for one source text before it is translated, trimmed to a prompt budget.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from transcoder.options import estimate_tokens
+
+
+@dataclass
+class TranslationContext:
+    """
+    Translation memory and glossary context for one source text.
+
+    ``tiers`` holds the TM leverage tier of every target language
+    ("exact", "high", "mid", "low" or "none"); ``matches`` the exact or
+    high-tier match to reuse instead of translating; ``references`` and
+    ``terms`` what goes into each language's prompt. ``timings`` records
+    the seconds spent per gathering stage.
+    """
+
+    source_lang: str
+    tiers: Dict[str, str] = field(default_factory=dict)
+    matches: Dict[str, dict] = field(default_factory=dict)
+    references: Dict[str, List[dict]] = field(default_factory=dict)
+    terms: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Number of references and terms injected per language."""
+        langs = dict.fromkeys([*self.references, *self.terms])
+        return {
+            lang: {"references": len(self.references.get(lang, [])), "terms": len(self.terms.get(lang, {}))}
+            for lang in langs
+        }
+
+
+def fit_to_budget(
+    references: List[dict], terms: Dict[str, str], budget_tokens: int
+) -> Tuple[List[dict], Dict[str, str]]:
+    """
+    Keep the terms and references that fit in ``budget_tokens`` estimated tokens.
+
+    Terms go first: they are short and their use is mandatory. References
+    follow best first; one that does not fit is skipped so a shorter one
+    further down can still be used.
+    """
+    used = 0
+    kept_terms = {}
+    for term, translation in terms.items():
+        cost = estimate_tokens(term) + estimate_tokens(translation) + 2
+        if used + cost <= budget_tokens:
+            kept_terms[term] = translation
+            used += cost
+
+    kept_references = []
+    for reference in references:
+        cost = estimate_tokens(reference["source"]) + estimate_tokens(reference["translation"]) + 4
+        if used + cost <= budget_tokens:
+            kept_references.append(reference)
+            used += cost
+    return kept_references, kept_terms
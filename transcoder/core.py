@@ -4,16 +4,35 @@ TransCoder Core Module
 Core services for translation, vector database, terminology, and evaluation.
 """
 
+import asyncio
+import functools
+import hashlib
 import json
 import os
+import threading
 import time
-from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 
+from transcoder.context import TranslationContext, fit_to_budget
+from transcoder.memory import (
+    ExactMatchIndex,
+    IngestProgress,
+    LeverageTiers,
+    TranslationPair,
+    cosine_similarity,
+    edit_ratio,
+    iter_pair_batches,
+)
+from transcoder.options import REASONING_TOKENS, GenerationOptions, estimate_tokens, output_token_cap
+from transcoder.persistence import PeriodicSnapshot, WriteAheadLog, atomic_write
+from transcoder.thinking import ThinkingFilter, ThinkingSavings, strip_thinking
+
 if TYPE_CHECKING:
-    from transcoder.providers import LLMProvider
+    from transcoder.providers import GenerationResult, LLMProvider
 
 try:
     from langdetect import detect
@@ -46,9 +65,31 @@ class ToolResult:
         }
 
 
+def _total_usage(metrics) -> Dict[str, Any]:
+    """Sum token counts and load time over several generations' metrics, flagging any truncation."""
+    totals: Dict[str, Any] = {}
+    for metric in metrics:
+        for key in ("prompt_tokens", "completion_tokens", "thinking_tokens", "thinking_tokens_saved", "load_time"):
+            if metric.get(key):
+                totals[key] = totals.get(key, 0) + metric[key]
+        if metric.get("truncated"):
+            totals["truncated"] = True
+    if "load_time" in totals:
+        totals["load_time"] = round(totals["load_time"], 3)
+    return totals
+
+
+def _truncated_error(options: Optional[GenerationOptions]) -> str:
+    limit = options.max_tokens if options else None
+    return f"Generation reached the output limit ({limit} tokens) before producing a translation"
+
+
 class TranslationService:
     """Translation service with reflection-based improvement."""
 
+    # Bump whenever prompt templates change so cached results are not reused.
+    PROMPT_VERSION = "2"
+
     SUPPORTED_LANGUAGES = {
         "zh-cn": "中文大陆地区现代文简体",
         "zh-tw": "中文港澳台地区现代文繁体",
@@ -73,6 +114,16 @@ class TranslationService:
         provider_type: str = "ollama",
         use_proxy: bool = False,
         proxy_url: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        coalesce_requests: bool = False,
+        resilience: Optional[Dict[str, Any]] = None,
+        circuit_breaker: Optional[Dict[str, Any]] = None,
+        scheduler: Optional[Dict[str, Any]] = None,
+        options: Optional[GenerationOptions] = None,
+        output_cap_factor: Optional[float] = 4.0,
+        think: Optional[Dict[str, bool]] = None,
+        tm_tiers: Optional[LeverageTiers] = None,
+        context_budget_tokens: int = 512,
     ):
         """
         Initialize translation service.
@@ -80,16 +131,42 @@ class TranslationService:
         Args:
             model: Default model name
             ollama_host: Ollama server host (deprecated, use provider_type)
-            provider: LLMProvider instance (if provided, overrides other settings)
+            provider: LLMProvider instance (if provided, overrides other settings); providers whose
+                ``generate`` predates generation options are called without them
             provider_type: "ollama" or "openai"
             use_proxy: Whether to use proxy for API calls
             proxy_url: Proxy URL (e.g., socks5://127.0.0.1:7897)
+            max_workers: Concurrent target languages per request (defaults to provider parallelism)
+            coalesce_requests: Share one generation between concurrent identical prompts
+            resilience: Deadline/retry/hedging settings passed to
+                :class:`transcoder.resilience.ResilientProvider` (None to disable)
+            circuit_breaker: Circuit breaker/failover settings passed to
+                :class:`transcoder.resilience.CircuitBreakerProvider` (None to disable)
+            scheduler: Model-affinity scheduling settings (``max_batch``, ``max_wait``) passed to
+                :class:`transcoder.scheduler.ScheduledProvider` (None to disable)
+            options: Default generation options (temperature, seed, num_ctx, ...) for every call
+            output_cap_factor: Output tokens allowed per estimated target token; caps every
+                generation in proportion to the source length (None to disable)
+            think: Per-stage reasoning switch for thinking models, e.g.
+                ``{"translate": False, "reflect": False, "improve": False}``; stages not
+                listed keep the model's default (see :func:`transcoder.thinking.parse_no_think`)
+            tm_tiers: Fuzzy translation memory thresholds (see :class:`transcoder.memory.LeverageTiers`)
+            context_budget_tokens: Estimated prompt tokens per language for TM references and terms
         """
         self.model = model
         self.ollama_host = ollama_host
+        self.max_workers = max_workers
+        self.options = options
+        self.output_cap_factor = output_cap_factor
+        self.think = think or {}
+        self.thinking_savings = ThinkingSavings()
+        self.tm_tiers = tm_tiers or LeverageTiers()
+        self.context_budget_tokens = context_budget_tokens
 
         if provider is not None:
-            self._provider = provider
+            from transcoder.providers import LegacyProviderAdapter
+
+            self._provider = LegacyProviderAdapter.wrap(provider)
         else:
             from transcoder.providers import create_provider
 
@@ -97,6 +174,27 @@ class TranslationService:
                 provider_type=provider_type, model=model, host=ollama_host, use_proxy=use_proxy, proxy_url=proxy_url
             )
 
+        if resilience is not None:
+            from transcoder.resilience import ResilientProvider
+
+            self._provider = ResilientProvider(self._provider, **resilience)
+
+        if circuit_breaker is not None:
+            from transcoder.resilience import CircuitBreakerProvider
+
+            self._provider = CircuitBreakerProvider(self._provider, **circuit_breaker)
+
+        if scheduler is not None:
+            from transcoder.scheduler import ScheduledProvider
+
+            # Outside the resilience layer, so time spent queued for a slot does not count against deadlines.
+            self._provider = ScheduledProvider(self._provider, **scheduler)
+
+        if coalesce_requests:
+            from transcoder.providers import SingleFlightProvider
+
+            self._provider = SingleFlightProvider(self._provider)
+
     @property
     def provider(self) -> "LLMProvider":
         """Get the LLM provider."""
@@ -106,6 +204,52 @@ class TranslationService:
         """Get list of available models."""
         return self._provider.get_available_models()
 
+    def fan_out(
+        self, func: Callable[[str], ToolResult], target_langs: List[str], max_workers: Optional[int] = None
+    ) -> Dict[str, dict]:
+        """
+        Run ``func`` once per target language on a bounded worker pool.
+
+        Results keep the order of ``target_langs``; a failing language is
+        reported as ``{"error": ...}`` without affecting the others.
+        """
+        target_langs = list(dict.fromkeys(target_langs))
+        workers = max_workers or self.max_workers or self._provider.parallelism
+        workers = max(1, min(workers, len(target_langs)))
+
+        def run(target_lang: str) -> ToolResult:
+            try:
+                return func(target_lang)
+            except Exception as e:
+                return ToolResult(success=False, error=str(e))
+
+        if workers == 1:
+            outcomes = [run(target_lang) for target_lang in target_langs]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="transcoder-translate") as executor:
+                outcomes = list(executor.map(run, target_langs))
+
+        return self._collect(target_langs, outcomes)
+
+    def _map_jobs(self, func: Callable[[Any], Any], jobs: List[Any], max_workers: Optional[int] = None) -> List[Any]:
+        """Run ``func`` over ``jobs`` on a bounded worker pool, keeping job order."""
+        workers = max(1, min(max_workers or self.max_workers or self._provider.parallelism, len(jobs) or 1))
+        if workers == 1:
+            return [func(job) for job in jobs]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="transcoder-jobs") as executor:
+            return list(executor.map(func, jobs))
+
+    @staticmethod
+    def _collect(target_langs: List[str], outcomes: List[ToolResult]) -> Dict[str, dict]:
+        """Map languages to result data, keeping each result's metrics alongside it."""
+        results = {}
+        for target_lang, result in zip(target_langs, outcomes):
+            if result.success:
+                results[target_lang] = {**result.data, "metrics": result.metadata} if result.metadata else result.data
+            else:
+                results[target_lang] = {"error": result.error}
+        return results
+
     def detect_language(self, text: str) -> str:
         """Detect language of text."""
         if detect is None:
@@ -136,102 +280,1335 @@ class TranslationService:
         }
         return lang_map.get(lang.lower(), lang.lower()[:2] if len(lang) >= 2 else lang)
 
-    def translate_single(
-        self, source_text: str, source_lang: str, target_lang: str, model: Optional[str] = None
+    def translate_single(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_lang: str,
+        model: Optional[str] = None,
+        options: Optional[GenerationOptions] = None,
+        context: Optional[str] = None,
+        references: Optional[List[dict]] = None,
+        terms: Optional[Dict[str, str]] = None,
+    ) -> ToolResult:
+        """
+        Translate text to a single target language.
+
+        ``context`` (e.g. neighbouring sentences) is shown to the model for
+        reference but not translated. ``references`` are translation memory
+        matches (``{"source", "translation"}``) quoted in full as examples;
+        ``terms`` maps glossary terms to their required translation.
+        """
+        start_time = time.time()
+
+        try:
+            model = model or self.model
+            prompt = self._build_translation_prompt(source_text, source_lang, target_lang, context, references, terms)
+            options = self._stage_options(source_text, source_lang, target_lang, options, "translate")
+
+            generation = self._generate(prompt, model, options)
+            return self._translation_result(generation, source_lang, target_lang, model, start_time, options)
+        except Exception as e:
+            return ToolResult(success=False, error=str(e))
+
+    def adapt_match(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_lang: str,
+        match: dict,
+        model: Optional[str] = None,
+        options: Optional[GenerationOptions] = None,
+    ) -> ToolResult:
+        """
+        Minimally edit a near-identical translation memory match to fit ``source_text``.
+
+        Cheaper than a fresh translation: the model only has to change the
+        words where the new source differs from the stored one.
+        """
+        start_time = time.time()
+
+        try:
+            model = model or self.model
+            prompt = self._build_adaptation_prompt(source_text, source_lang, target_lang, match)
+            options = self._stage_options(source_text, source_lang, target_lang, options, "translate")
+
+            generation = self._generate(prompt, model, options)
+            return self._translation_result(generation, source_lang, target_lang, model, start_time, options)
+        except Exception as e:
+            return ToolResult(success=False, error=str(e))
+
+    def _stage_options(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_lang: Union[str, List[str]],
+        options: Optional[GenerationOptions],
+        stage: str,
+        scale: float = 1.0,
+    ) -> Optional[GenerationOptions]:
+        """
+        Service defaults overlaid with per-call ``options``, with ``max_tokens`` capped.
+
+        ``think`` falls back to the service's setting for ``stage``. The cap
+        is :func:`transcoder.options.output_token_cap` for the language pair
+        times ``scale`` (stages whose output is not a translation, such as
+        reflection, get more room). It also bounds an explicit
+        ``max_tokens``, so a runaway generation always stops. For several
+        target languages in one generation the caps add up. Unless thinking
+        is off, :data:`transcoder.options.REASONING_TOKENS` are added so the
+        reasoning phase cannot use up the budget before the answer.
+        """
+        merged = GenerationOptions(think=self.think.get(stage)).merged(self.options).merged(options)
+        if self.output_cap_factor is not None:
+            factor = self.output_cap_factor * scale
+            targets = [target_lang] if isinstance(target_lang, str) else target_lang
+            cap = sum(output_token_cap(source_text, source_lang, target, factor=factor) for target in targets)
+            if merged.think is not False:
+                cap += REASONING_TOKENS
+            merged = merged.with_cap(cap)
+        return merged if merged.to_dict() else None
+
+    def _generate(self, prompt: str, model: str, options: Optional[GenerationOptions] = None) -> "GenerationResult":
+        """Generate with the provider, accepting plain-string results."""
+        from transcoder.providers import as_generation_result
+
+        generation = as_generation_result(self._provider.generate(prompt, model=model, options=options))
+        return self._count_thinking(model, options, generation)
+
+    def _count_thinking(
+        self, model: str, options: Optional[GenerationOptions], generation: "GenerationResult"
+    ) -> "GenerationResult":
+        """Credit the reasoning tokens a generation with thinking off saved (see :class:`ThinkingSavings`)."""
+        think = options.think if options else None
+        saved = self.thinking_savings.record(model, think, generation.thinking_tokens)
+        return replace(generation, thinking_tokens_saved=saved) if saved is not None else generation
+
+    def _translation_result(
+        self,
+        generation: "GenerationResult",
+        source_lang: str,
+        target_lang: str,
+        model: str,
+        start_time: float,
+        options: Optional[GenerationOptions] = None,
+    ) -> ToolResult:
+        """
+        Clean a raw translation and wrap it with timing and token usage metadata.
+
+        A generation cut off by the output limit with nothing left after its
+        think block is removed is reported as a failure, not an empty text.
+        """
+        translation = self._clean_translation(generation.text)
+
+        elapsed = time.time() - start_time
+        word_count = len(translation.split())
+        usage = generation.metrics(elapsed)
+        if generation.truncated and not translation:
+            return ToolResult(
+                success=False,
+                error=_truncated_error(options),
+                metadata={"elapsed_time": round(elapsed, 2), **usage},
+            )
+        # Fall back to a word-count estimate only when the backend reports no usage.
+        tokens_per_second = usage["decode_tokens_per_second"] or (
+            round(word_count / elapsed, 1) if elapsed > 0 else 0
+        )
+
+        return ToolResult(
+            success=True,
+            data={
+                "text": translation,
+                "source_lang": source_lang,
+                "target_lang": target_lang,
+                "model": model,
+            },
+            metadata={
+                "elapsed_time": round(elapsed, 2),
+                "word_count": word_count,
+                "tokens_per_second": tokens_per_second,
+                "max_tokens": options.max_tokens if options else None,
+                "think": options.think if options else None,
+                **usage,
+            },
+        )
+
+    def translate(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_langs: List[str],
+        model: Optional[str] = None,
+        use_vector_db: bool = False,
+        use_terminology: bool = False,
+        vector_db_service: Optional["VectorDBService"] = None,
+        terminology_service: Optional["TerminologyService"] = None,
+        max_workers: Optional[int] = None,
+        options: Optional[GenerationOptions] = None,
+        single_call: bool = False,
+    ) -> ToolResult:
+        """
+        Translate text to multiple target languages.
+
+        Target languages are translated concurrently on a pool of at most
+        ``max_workers`` threads, so wall-clock time tracks the slowest
+        language rather than the sum of all of them. Each language's output
+        is capped in proportion to the source; a language that hit the cap
+        reports ``truncated`` in its metrics. With ``single_call`` every
+        language is requested in one generation, see :meth:`translate_multi`.
+
+        With ``use_vector_db`` / ``use_terminology`` and the matching
+        service, translation memory and glossary context is gathered first
+        and injected per language, see :meth:`translate_with_context`
+        (with ``single_call``, the languages left after TM reuse share one
+        generation that carries their glossary terms).
+        """
+        vector_db_service = vector_db_service if use_vector_db else None
+        terminology_service = terminology_service if use_terminology else None
+        if vector_db_service is not None or terminology_service is not None:
+            return self.translate_with_context(
+                source_text,
+                source_lang,
+                target_langs,
+                lambda target_lang, context: self.translate_single(
+                    source_text,
+                    context.source_lang,
+                    target_lang,
+                    model,
+                    options,
+                    references=context.references.get(target_lang),
+                    terms=context.terms.get(target_lang),
+                ),
+                vector_db_service,
+                terminology_service,
+                model,
+                options,
+                max_workers,
+                translate_all=(
+                    (
+                        lambda langs, context: self.translate_multi(
+                            source_text, context.source_lang, langs, model, max_workers, options, context.terms
+                        )
+                    )
+                    if single_call
+                    else None
+                ),
+            )
+
+        if single_call:
+            return self.translate_multi(source_text, source_lang, target_langs, model, max_workers, options)
+
+        start_time = time.time()
+
+        if source_lang == "auto":
+            source_lang = self.detect_language(source_text)
+
+        results = self.fan_out(
+            lambda target_lang: self.translate_single(source_text, source_lang, target_lang, model, options),
+            target_langs,
+            max_workers=max_workers,
+        )
+
+        return ToolResult(
+            success=True,
+            data={"translations": results, "source_lang": source_lang},
+            metadata={
+                "elapsed_time": round(time.time() - start_time, 2),
+                **_total_usage(r.get("metrics", {}) for r in results.values()),
+            },
+        )
+
+    def gather_context(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_langs: List[str],
+        vector_db_service: Optional["VectorDBService"] = None,
+        terminology_service: Optional["TerminologyService"] = None,
+    ) -> TranslationContext:
+        """
+        Collect translation memory and glossary context for ``target_langs``.
+
+        Language detection (for "auto"), the TM lookup and the glossary
+        lookup run concurrently. Exact TM repeats are found without
+        embedding the source; the remaining languages are tiered by
+        :attr:`tm_tiers`. Each language's references and terms are trimmed
+        to :attr:`context_budget_tokens`. A failing lookup leaves its part
+        of the context empty rather than failing the translation.
+        """
+        start_time = time.time()
+        timings: Dict[str, float] = {}
+
+        def timed(stage: str, func: Callable[[], Any]) -> Callable[[], Any]:
+            def run() -> Any:
+                begin = time.time()
+                try:
+                    return func()
+                finally:
+                    timings[stage] = round(time.time() - begin, 3)
+
+            return run
+
+        jobs = {}
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="transcoder-context") as executor:
+            if source_lang == "auto":
+                jobs["detect"] = executor.submit(timed("detect", lambda: self.detect_language(source_text)))
+            if vector_db_service is not None:
+                jobs["tm"] = executor.submit(
+                    timed("tm", lambda: self._match_memory(source_text, target_langs, vector_db_service))
+                )
+            if terminology_service is not None:
+                jobs["terminology"] = executor.submit(
+                    timed("terminology", lambda: terminology_service.get_relevant_terms(source_text))
+                )
+
+        def outcome(stage: str, default: Any) -> Any:
+            try:
+                return jobs[stage].result() if stage in jobs else default
+            except Exception:
+                return default
+
+        context = TranslationContext(source_lang=outcome("detect", source_lang))
+        context.tiers, context.matches, references = outcome("tm", ({}, {}, {}))
+        glossary = outcome("terminology", ToolResult(success=False))
+        relevant = glossary.data["terms"] if glossary.success else {}
+
+        for target_lang in target_langs:
+            terms = {term: trans[target_lang] for term, trans in relevant.items() if trans.get(target_lang)}
+            refs, terms = fit_to_budget(references.get(target_lang, []), terms, self.context_budget_tokens)
+            if refs:
+                context.references[target_lang] = refs
+            if terms:
+                context.terms[target_lang] = terms
+
+        context.timings = {**timings, "context": round(time.time() - start_time, 3)}
+        return context
+
+    def _match_memory(
+        self, source_text: str, target_langs: List[str], vector_db_service: "VectorDBService"
+    ) -> Tuple[Dict[str, str], Dict[str, dict], Dict[str, List[dict]]]:
+        """TM tier, reusable match and mid-tier references per language."""
+        exact = vector_db_service.lookup_exact(source_text, target_langs)
+        tiers = dict.fromkeys(exact, "exact")
+        matches = {
+            target_lang: {"source": source_text, "translation": text, "score": 1.0}
+            for target_lang, text in exact.items()
+        }
+        references: Dict[str, List[dict]] = {}
+
+        remaining = [target_lang for target_lang in target_langs if target_lang not in exact]
+        if remaining:
+            search = vector_db_service.search_similar(source_text, k=5, tiers=self.tm_tiers)
+            found = search.data["results"] if search.success else {}
+            for target_lang in remaining:
+                tiers[target_lang], best, refs = self.tm_tiers.classify(found.get(target_lang, []), source_text)
+                if tiers[target_lang] == "high":
+                    matches[target_lang] = best
+                elif tiers[target_lang] == "mid":
+                    references[target_lang] = refs
+        return tiers, matches, references
+
+    def reuse_matches(
+        self,
+        source_text: str,
+        context: TranslationContext,
+        model: Optional[str] = None,
+        options: Optional[GenerationOptions] = None,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, dict]:
+        """
+        Turn exact and high-tier TM matches into finished per-language results.
+
+        High-tier matches are minimally edited by the model when
+        ``tm_tiers.minimal_edit`` is set; a failed edit falls back to the
+        stored translation.
+        """
+        source_lang = context.source_lang
+        high = [lang for lang in context.matches if context.tiers.get(lang) == "high"]
+        edited = {}
+        if high and self.tm_tiers.minimal_edit:
+            edited = self.fan_out(
+                lambda target_lang: self.adapt_match(
+                    source_text, source_lang, target_lang, context.matches[target_lang], model, options
+                ),
+                high,
+                max_workers=max_workers,
+            )
+
+        results = {}
+        for target_lang, match in context.matches.items():
+            tier = context.tiers[target_lang]
+            entry = edited.get(target_lang)
+            if entry is None or "error" in entry:
+                entry = {"text": match["translation"], "source_lang": source_lang, "target_lang": target_lang}
+            results[target_lang] = {**entry, "tm_match": tier}
+            if tier == "high":
+                results[target_lang].update(tm_score=match["score"], tm_source=match["source"])
+        return results
+
+    def translate_with_context(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_langs: List[str],
+        translate_one: Callable[[str, TranslationContext], ToolResult],
+        vector_db_service: Optional["VectorDBService"] = None,
+        terminology_service: Optional["TerminologyService"] = None,
+        model: Optional[str] = None,
+        options: Optional[GenerationOptions] = None,
+        max_workers: Optional[int] = None,
+        translate_all: Optional[Callable[[List[str], TranslationContext], ToolResult]] = None,
+    ) -> ToolResult:
+        """
+        Translate with translation memory and glossary context.
+
+        Runs :meth:`gather_context`, reuses exact and high-tier matches
+        (:meth:`reuse_matches`) and calls ``translate_one(target_lang, context)``
+        concurrently for the other languages, or ``translate_all(languages,
+        context)`` once for all of them when given. ``metadata`` adds the TM
+        tier per language (``tm``), the references and terms injected per
+        language (``context``) and per-stage ``timings`` in seconds.
+        """
+        start_time = time.time()
+        target_langs = list(dict.fromkeys(target_langs))
+        model = model or self.model
+
+        context = self.gather_context(source_text, source_lang, target_langs, vector_db_service, terminology_service)
+        translate_start = time.time()
+        reused = self.reuse_matches(source_text, context, model, options, max_workers)
+        remaining = [target_lang for target_lang in target_langs if target_lang not in reused]
+        fresh, combined = {}, None
+        if remaining and translate_all is not None:
+            combined = translate_all(remaining, context)
+            fresh = combined.data["translations"]
+        elif remaining:
+            fresh = self.fan_out(
+                lambda target_lang: translate_one(target_lang, context), remaining, max_workers=max_workers
+            )
+        context.timings["translate"] = round(time.time() - translate_start, 3)
+
+        return self._context_result(context, target_langs, reused, fresh, start_time, combined)
+
+    @staticmethod
+    def _context_result(
+        context: TranslationContext,
+        target_langs: List[str],
+        reused: Dict[str, dict],
+        fresh: Dict[str, dict],
+        start_time: float,
+        combined: Optional[ToolResult] = None,
+    ) -> ToolResult:
+        results = {target_lang: reused.get(target_lang) or fresh.get(target_lang, {}) for target_lang in target_langs}
+        if combined is None:
+            usage = [r.get("metrics", {}) for r in results.values()]
+        else:
+            # The combined result already totals the usage of the languages it translated.
+            usage = [r.get("metrics", {}) for r in reused.values()] + [combined.metadata]
+        metadata = {
+            "elapsed_time": round(time.time() - start_time, 2),
+            **_total_usage(usage),
+            "context": context.summary(),
+            "timings": context.timings,
+        }
+        if combined is not None and "single_call" in combined.metadata:
+            metadata["single_call"] = combined.metadata["single_call"]
+        if context.tiers:
+            metadata["tm"] = {target_lang: context.tiers.get(target_lang, "none") for target_lang in target_langs}
+        return ToolResult(
+            success=True, data={"translations": results, "source_lang": context.source_lang}, metadata=metadata
+        )
+
+    def translate_multi(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_langs: List[str],
+        model: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        options: Optional[GenerationOptions] = None,
+        terms: Optional[Dict[str, Dict[str, str]]] = None,
+    ) -> ToolResult:
+        """
+        Translate into every target language with a single generation.
+
+        The model answers with a JSON object keyed by language code,
+        constrained by a schema (Ollama ``format``) or JSON mode (OpenAI).
+        The source is prefilled once instead of once per language, which
+        pays off for short inputs such as UI strings. Languages missing
+        from the answer, or whose value is not a non-empty string, are
+        translated individually; ``metadata["single_call"]`` lists both groups.
+        ``terms`` maps a language to its required glossary translations.
+        """
+        start_time = time.time()
+        model = model or self.model
+        terms = terms or {}
+
+        if source_lang == "auto":
+            source_lang = self.detect_language(source_text)
+        target_langs = list(dict.fromkeys(target_langs))
+
+        prompt, call_options = self._multi_call_request(source_text, source_lang, target_langs, options, terms)
+        try:
+            generation = self._generate(prompt, model, call_options)
+        except Exception:
+            generation = None
+        results = self._parse_multi_translation(generation, source_lang, target_langs, model)
+
+        fallback = [target_lang for target_lang in target_langs if target_lang not in results]
+        if fallback:
+            results.update(
+                self.fan_out(
+                    lambda target_lang: self.translate_single(
+                        source_text, source_lang, target_lang, model, options, terms=terms.get(target_lang)
+                    ),
+                    fallback,
+                    max_workers=max_workers,
+                )
+            )
+
+        return self._multi_result(results, generation, source_lang, target_langs, fallback, start_time)
+
+    def _multi_call_request(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_langs: List[str],
+        options: Optional[GenerationOptions],
+        terms: Optional[Dict[str, Dict[str, str]]] = None,
+    ) -> Tuple[str, GenerationOptions]:
+        """Prompt and JSON-constrained options for a single-call translation."""
+        schema = {
+            "type": "object",
+            "properties": {target_lang: {"type": "string"} for target_lang in target_langs},
+            "required": target_langs,
+        }
+        call_options = self._stage_options(source_text, source_lang, target_langs, options, "translate")
+        call_options = replace(call_options or GenerationOptions(), json_schema=schema)
+        prompt = self._build_multi_translation_prompt(source_text, source_lang, target_langs, terms)
+        return prompt, call_options
+
+    def _parse_multi_translation(
+        self, generation: Optional["GenerationResult"], source_lang: str, target_langs: List[str], model: str
+    ) -> Dict[str, dict]:
+        """Per-language result data for every language the JSON answer translated validly."""
+        if generation is None:
+            return {}
+        body = strip_thinking(generation.text)[0]
+        start, end = body.find("{"), body.rfind("}")
+        try:
+            answer = json.loads(body[start : end + 1]) if start >= 0 else None
+        except ValueError:
+            answer = None
+        if not isinstance(answer, dict):
+            return {}
+
+        results = {}
+        for target_lang in target_langs:
+            value = answer.get(target_lang)
+            if isinstance(value, str) and value.strip():
+                results[target_lang] = {
+                    "text": self._clean_translation(value),
+                    "source_lang": source_lang,
+                    "target_lang": target_lang,
+                    "model": model,
+                    "metrics": {"single_call": True},
+                }
+        return results
+
+    @staticmethod
+    def _multi_result(
+        results: Dict[str, dict],
+        generation: Optional["GenerationResult"],
+        source_lang: str,
+        target_langs: List[str],
+        fallback: List[str],
+        start_time: float,
+    ) -> ToolResult:
+        """Combine single-call and fallback results in request order."""
+        usage = [r.get("metrics", {}) for r in results.values()]
+        if generation is not None:
+            usage.append(generation.metrics())
+        return ToolResult(
+            success=True,
+            data={"translations": {lang: results[lang] for lang in target_langs}, "source_lang": source_lang},
+            metadata={
+                "elapsed_time": round(time.time() - start_time, 2),
+                **_total_usage(usage),
+                "single_call": {
+                    "translated": [lang for lang in target_langs if lang not in fallback],
+                    "fallback": fallback,
+                },
+            },
+        )
+
+    def translate_segments(
+        self,
+        segments: List[str],
+        source_lang: str,
+        target_langs: List[str],
+        model: Optional[str] = None,
+        budget_tokens: int = 1024,
+        max_workers: Optional[int] = None,
+        options: Optional[GenerationOptions] = None,
+    ) -> ToolResult:
+        """
+        Translate many short strings, packing several into each prompt.
+
+        Segments are grouped up to ``budget_tokens`` estimated source tokens
+        (see :func:`transcoder.packing.pack_segments`) into numbered,
+        delimited blocks; each block and target language is one generation,
+        run concurrently. Segments whose numbered boundary does not come
+        back intact are retried individually with :meth:`translate_single`.
+
+        Returns:
+            ToolResult whose ``data["translations"]`` maps each language to a
+            list aligned with ``segments`` (None where the retry failed too)
+        """
+        from transcoder.packing import format_batch, pack_segments, parse_batch
+
+        start_time = time.time()
+        model = model or self.model
+
+        if source_lang == "auto":
+            source_lang = self.detect_language("\n".join(segments[:50]))
+        target_langs = list(dict.fromkeys(target_langs))
+        batches = pack_segments(segments, budget_tokens)
+
+        def run(job: Tuple[str, List[int]]) -> Tuple[str, Dict[int, str], List[dict], List[int]]:
+            target_lang, batch = job
+            done: Dict[int, str] = {}
+            usage: List[dict] = []
+            if len(batch) > 1:
+                block = format_batch([segments[index] for index in batch])
+                prompt = self._build_batch_translation_prompt(block, source_lang, target_lang)
+                try:
+                    generation = self._generate(
+                        prompt, model, self._stage_options(block, source_lang, target_lang, options, "translate")
+                    )
+                    usage.append(generation.metrics())
+                    parsed = parse_batch(strip_thinking(generation.text)[0], len(batch))
+                    done = {batch[pos]: self._clean_translation(text) for pos, text in parsed.items()}
+                except Exception:
+                    pass
+
+            missing = [index for index in batch if index not in done]
+            for index in missing:
+                result = self.translate_single(segments[index], source_lang, target_lang, model, options)
+                if result.success:
+                    done[index] = result.data["text"]
+                    usage.append(result.metadata)
+            return target_lang, done, usage, missing if len(batch) > 1 else []
+
+        jobs = [(target_lang, batch) for target_lang in target_langs for batch in batches]
+        outcomes = self._map_jobs(run, jobs, max_workers)
+
+        translations: Dict[str, List[Optional[str]]] = {
+            target_lang: [text if not text.strip() else None for text in segments] for target_lang in target_langs
+        }
+        usage, retried = [], 0
+        for target_lang, done, job_usage, missing in outcomes:
+            for index, text in done.items():
+                translations[target_lang][index] = text
+            usage.extend(job_usage)
+            retried += len(missing)
+
+        elapsed = time.time() - start_time
+        translated = sum(1 for texts in translations.values() for text in texts if text)
+        return ToolResult(
+            success=True,
+            data={"translations": translations, "source_lang": source_lang},
+            metadata={
+                "elapsed_time": round(elapsed, 2),
+                "segments": len(segments),
+                "batches": len(batches),
+                "retried": retried,
+                "failed": sum(1 for texts in translations.values() for text in texts if text is None),
+                "segments_per_second": round(translated / elapsed, 1) if elapsed > 0 else 0,
+                **_total_usage(usage),
+            },
+        )
+
+    def translate_document(
+        self,
+        text: str,
+        source_lang: str,
+        target_langs: List[str],
+        model: Optional[str] = None,
+        max_segment_tokens: int = 300,
+        context_window: int = 0,
+        max_workers: Optional[int] = None,
+        options: Optional[GenerationOptions] = None,
+    ) -> ToolResult:
+        """
+        Translate a long document segment by segment.
+
+        The text is split into sentence-aligned segments of at most
+        ``max_segment_tokens`` (see :func:`transcoder.segmenter.segment_document`);
+        every segment and target language is translated concurrently on a
+        pool of at most ``max_workers`` threads, and the translations are
+        reassembled with the original whitespace and paragraph breaks. With
+        ``context_window`` the neighbouring source segments on each side are
+        passed as reference context. A segment that fails keeps its source
+        text and is listed under ``failed_segments``; the rest of the
+        document is still translated.
+        """
+        from transcoder.segmenter import segment_document
+
+        start_time = time.time()
+        model = model or self.model
+
+        if source_lang == "auto":
+            source_lang = self.detect_language(text[:2000])
+        target_langs = list(dict.fromkeys(target_langs))
+        document = segment_document(text, max_segment_tokens)
+        sources = [segment.text for segment in document.segments]
+
+        def run(job: Tuple[str, int]) -> ToolResult:
+            target_lang, index = job
+            context = None
+            if context_window > 0:
+                before = sources[max(0, index - context_window) : index]
+                after = sources[index + 1 : index + 1 + context_window]
+                context = "\n".join(before + ["[...]"] + after) if before or after else None
+            return self.translate_single(sources[index], source_lang, target_lang, model, options, context)
+
+        jobs = [(target_lang, index) for target_lang in target_langs for index in range(len(sources))]
+        outcomes = dict(zip(jobs, self._map_jobs(run, jobs, max_workers)))
+
+        results = {}
+        usage = []
+        for target_lang in target_langs:
+            segment_results = [outcomes[(target_lang, index)] for index in range(len(sources))]
+            texts = [r.data["text"] if r.success else None for r in segment_results]
+            usage.extend(r.metadata for r in segment_results if r.success)
+            results[target_lang] = {
+                "text": document.assemble(texts, target_lang),
+                "source_lang": source_lang,
+                "target_lang": target_lang,
+                "model": model,
+                "segments": len(sources),
+                "failed_segments": [
+                    {"index": index, "error": r.error} for index, r in enumerate(segment_results) if not r.success
+                ],
+            }
+
+        elapsed = time.time() - start_time
+        return ToolResult(
+            success=True,
+            data={"translations": results, "source_lang": source_lang},
+            metadata={
+                "elapsed_time": round(elapsed, 2),
+                "segments": len(sources),
+                "segments_per_second": round(len(jobs) / elapsed, 1) if elapsed > 0 else 0,
+                **_total_usage(usage),
+            },
+        )
+
+    def translate_stream(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_langs: List[str],
+        model: Optional[str] = None,
+        multiplex: bool = False,
+        max_workers: Optional[int] = None,
+        frame_size: Optional[int] = None,
+        frame_age: float = 0.05,
+        options: Optional[GenerationOptions] = None,
+    ) -> Iterator[dict]:
+        """
+        Translate text to multiple target languages, yielding events as tokens arrive.
+
+        Events are dicts with a ``type`` of ``start``, ``content`` (one per
+        generated delta), ``complete`` (cleaned final text) or ``error``,
+        each tagged with ``target_lang``. With ``multiplex`` all languages
+        stream concurrently and their events are interleaved. Setting
+        ``frame_size`` coalesces deltas into frames of that many characters
+        (or ``frame_age`` seconds) with offsets and checksums, see
+        :class:`transcoder.streaming.DeltaFramer`.
+        """
+        if source_lang == "auto":
+            source_lang = self.detect_language(source_text)
+
+        target_langs = list(dict.fromkeys(target_langs))
+
+        if multiplex and len(target_langs) > 1:
+            from transcoder.streaming import multiplex as multiplex_streams
+
+            yield from multiplex_streams(
+                [
+                    functools.partial(
+                        self._translate_single_stream,
+                        source_text,
+                        source_lang,
+                        target_lang,
+                        model,
+                        frame_size=frame_size,
+                        frame_age=frame_age,
+                        options=options,
+                    )
+                    for target_lang in target_langs
+                ],
+                max_workers=max_workers or self.max_workers or len(target_langs),
+            )
+            return
+
+        for target_lang in target_langs:
+            yield from self._translate_single_stream(
+                source_text,
+                source_lang,
+                target_lang,
+                model,
+                frame_size=frame_size,
+                frame_age=frame_age,
+                options=options,
+            )
+
+    def _translate_single_stream(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_lang: str,
+        model: Optional[str] = None,
+        frame_size: Optional[int] = None,
+        frame_age: float = 0.05,
+        options: Optional[GenerationOptions] = None,
+    ) -> Iterator[dict]:
+        """
+        Stream a translation to a single target language.
+
+        Besides the backend's own limit, the stream is closed client-side
+        once it exceeds the output cap, for backends that ignore it. Think
+        blocks are removed from ``content`` events as they arrive; the
+        ``complete`` event reports the tokens they took.
+        """
+        from transcoder.streaming import DeltaFramer
+
+        model = model or self.model
+        framer = DeltaFramer(frame_size=frame_size, frame_age=frame_age) if frame_size else None
+        start_time = time.time()
+        yield {"type": "start", "target_lang": target_lang, "model": model, "start_time": start_time}
+
+        try:
+            prompt = self._build_translation_prompt(source_text, source_lang, target_lang)
+            options = self._stage_options(source_text, source_lang, target_lang, options, "translate")
+            max_tokens = options.max_tokens if options else None
+
+            chunks = []
+            first_token_time = None
+            cut_off = False
+            thinking = ThinkingFilter()
+            stream = self._provider.generate_stream(prompt, model=model, options=options)
+            for delta in stream:
+                chunks.append(delta)
+                visible = thinking.feed(delta)
+                if visible:
+                    if first_token_time is None:
+                        first_token_time = time.time() - start_time
+                    frame = framer.push(visible) if framer else {"content": visible}
+                    if frame:
+                        yield self._content_event(target_lang, frame, len(chunks), start_time)
+                if max_tokens is not None and len(chunks) >= max_tokens:
+                    stream.close()
+                    cut_off = True
+                    break
+
+            visible = thinking.flush()
+            if visible:
+                frame = framer.push(visible) if framer else {"content": visible}
+                if frame:
+                    yield self._content_event(target_lang, frame, len(chunks), start_time)
+            frame = framer.flush(final=True) if framer else None
+            if frame:
+                yield self._content_event(target_lang, frame, len(chunks), start_time)
+
+            raw = "".join(chunks)
+            total_time = time.time() - start_time
+            generation = getattr(stream, "result", None)
+            usage = generation.metrics(total_time) if generation is not None else {}
+            if cut_off:
+                usage.update(finish_reason="length", truncated=True)
+            usage.setdefault("thinking_tokens", estimate_tokens(thinking.reasoning))
+            usage["thinking_tokens_saved"] = self.thinking_savings.record(
+                model, options.think if options else None, usage["thinking_tokens"]
+            )
+            total_tokens = usage.get("completion_tokens") or len(chunks)
+            final_content = self._clean_translation(raw)
+            if usage.get("truncated") and not final_content:
+                yield {"type": "error", "target_lang": target_lang, "error": _truncated_error(options), **usage}
+                return
+            complete = {
+                "type": "complete",
+                "target_lang": target_lang,
+                "final_content": final_content,
+                "raw_content": raw,
+                "max_tokens": max_tokens,
+                "think": options.think if options else None,
+                **usage,
+                "total_tokens": total_tokens,
+                "total_time": round(total_time, 2),
+                "time_to_first_token": round(first_token_time or total_time, 2),
+                "tokens_per_second": usage.get("decode_tokens_per_second")
+                or (round(total_tokens / total_time, 1) if total_time > 0 else 0),
+            }
+            if framer is not None:
+                # The last frame carries no checksum when the stream ended on a flush boundary.
+                complete["checksum"] = f"{framer.checksum:08x}"
+            yield complete
+        except Exception as e:
+            yield {"type": "error", "target_lang": target_lang, "error": str(e)}
+
+    def _content_event(self, target_lang: str, frame: dict, token_count: int, start_time: float) -> dict:
+        """Build a ``content`` stream event from a delta frame."""
+        elapsed = time.time() - start_time
+        return {
+            "type": "content",
+            "target_lang": target_lang,
+            **frame,
+            "token_count": token_count,
+            "elapsed_time": round(elapsed, 2),
+            "tokens_per_second": round(token_count / elapsed, 1) if elapsed > 0 else 0,
+        }
+
+    def translate_with_reflection(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_lang: str,
+        model: Optional[str] = None,
+        iterations: int = 1,
+        options: Optional[GenerationOptions] = None,
+        references: Optional[List[dict]] = None,
+        terms: Optional[Dict[str, str]] = None,
+    ) -> ToolResult:
+        """
+        Translate with reflection-based improvement (三省吾身模式).
+
+        This is the core innovation: AI self-reflection and improvement.
+        - Initial translation -> Reflection -> Improved translation
+        - Can iterate multiple times for better quality
+
+        ``references`` and ``terms`` (see :meth:`translate_single`) guide the initial translation.
+        """
+        model = model or self.model
+
+        # Step 1: Initial translation
+        initial_result = self.translate_single(
+            source_text, source_lang, target_lang, model, options, references=references, terms=terms
+        )
+        if not initial_result.success:
+            return initial_result
+
+        current_translation = initial_result.data["text"]
+        reflection_history = []
+        usage = [initial_result.metadata]
+
+        for i in range(iterations):
+            # Step 2: Reflect on translation
+            reflection_result = self.reflect_translation(
+                source_text, current_translation, source_lang, target_lang, model, options
+            )
+            if not reflection_result.success:
+                break
+            usage.append(reflection_result.metadata)
+
+            reflection = reflection_result.data["reflection"]
+
+            # Step 3: Improve translation based on reflection
+            improve_result = self.improve_translation(
+                source_text, current_translation, reflection, source_lang, target_lang, model, options
+            )
+            if not improve_result.success:
+                break
+            usage.append(improve_result.metadata)
+
+            improved = improve_result.data["improved_translation"]
+            reflection_history.append(
+                {
+                    "iteration": i + 1,
+                    "previous_translation": current_translation,
+                    "reflection": reflection,
+                    "improved_translation": improved,
+                }
+            )
+            current_translation = improved
+
+        return ToolResult(
+            success=True,
+            data={
+                "text": current_translation,
+                "source_lang": source_lang,
+                "target_lang": target_lang,
+                "model": model,
+                "reflection_history": reflection_history,
+                "iterations": len(reflection_history),
+            },
+            metadata=_total_usage(usage),
+        )
+
+    def reflect_translation(
+        self,
+        source_text: str,
+        translation: str,
+        source_lang: str,
+        target_lang: str,
+        model: Optional[str] = None,
+        options: Optional[GenerationOptions] = None,
+    ) -> ToolResult:
+        """
+        AI reflects on translation quality (反思翻译).
+
+        The AI analyzes:
+        1. Accuracy - Is the meaning preserved?
+        2. Fluency - Is the expression natural?
+        3. Style - Is the tone appropriate?
+        4. Terminology - Are terms translated correctly?
+        """
+        model = model or self.model
+
+        prompt = self._build_reflection_prompt(source_text, translation, source_lang, target_lang)
+
+        # Reflection is commentary rather than a translation, so it gets twice the room.
+        options = self._stage_options(source_text, source_lang, target_lang, options, "reflect", scale=2.0)
+
+        try:
+            start_time = time.time()
+            generation = self._generate(prompt, model, options)
+
+            return ToolResult(
+                success=True,
+                data={"reflection": strip_thinking(generation.text)[0].strip()},
+                metadata={"model": model, **generation.metrics(time.time() - start_time)},
+            )
+        except Exception as e:
+            return ToolResult(success=False, error=str(e))
+
+    def improve_translation(
+        self,
+        source_text: str,
+        current_translation: str,
+        reflection: str,
+        source_lang: str,
+        target_lang: str,
+        model: Optional[str] = None,
+        options: Optional[GenerationOptions] = None,
+    ) -> ToolResult:
+        """
+        Improve translation based on reflection (改进翻译).
+
+        Key innovation: Uses AI's own analysis to guide improvement,
+        creating a self-improving translation loop.
+        """
+        model = model or self.model
+
+        prompt = self._build_improvement_prompt(source_text, current_translation, reflection, source_lang, target_lang)
+
+        options = self._stage_options(source_text, source_lang, target_lang, options, "improve")
+
+        try:
+            start_time = time.time()
+            generation = self._generate(prompt, model, options)
+            improved = self._clean_translation(generation.text)
+            metadata = {"model": model, **generation.metrics(time.time() - start_time)}
+            if generation.truncated and not improved:
+                return ToolResult(success=False, error=_truncated_error(options), metadata=metadata)
+
+            return ToolResult(success=True, data={"improved_translation": improved}, metadata=metadata)
+        except Exception as e:
+            return ToolResult(success=False, error=str(e))
+
+    def translate_iterative(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_lang: str,
+        model: Optional[str] = None,
+        iterations: int = 3,
+        options: Optional[GenerationOptions] = None,
+    ) -> ToolResult:
+        """
+        Iterative refinement translation (千锤百炼模式).
+
+        This is the signature feature: configurable multi-round reflection
+        and improvement, allowing users to balance quality vs speed.
+
+        Args:
+            iterations: Number of improvement iterations (1-10)
+
+        Returns:
+            ToolResult with translation and full improvement history
+        """
+        return self.translate_with_reflection(source_text, source_lang, target_lang, model, iterations, options)
+
+    async def _agenerate(
+        self, prompt: str, model: str, options: Optional[GenerationOptions] = None
+    ) -> "GenerationResult":
+        """
+        Generate on the event loop.
+
+        Async-capable providers, wrapped or not, are awaited directly so
+        cancellation reaches the in-flight HTTP request; blocking providers
+        run in the default executor and finish in the background if cancelled.
+        """
+        from transcoder.providers import as_generation_result, is_async_provider
+
+        if is_async_provider(self._provider):
+            generation = as_generation_result(await self._provider.agenerate(prompt, model=model, options=options))
+            return self._count_thinking(model, options, generation)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self._generate, prompt, model, options))
+
+    async def afan_out(
+        self,
+        func: Callable[[str], Awaitable[ToolResult]],
+        target_langs: List[str],
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, dict]:
+        """
+        Asyncio counterpart of :meth:`fan_out`.
+
+        Languages are scheduled as concurrent tasks bounded by a semaphore.
+        Cancelling the caller cancels every outstanding language task.
+        """
+        target_langs = list(dict.fromkeys(target_langs))
+        workers = max_workers or self.max_workers or self._provider.parallelism
+        semaphore = asyncio.Semaphore(max(1, workers))
+
+        async def run(target_lang: str) -> ToolResult:
+            async with semaphore:
+                try:
+                    return await func(target_lang)
+                except Exception as e:
+                    return ToolResult(success=False, error=str(e))
+
+        outcomes = await asyncio.gather(*(run(target_lang) for target_lang in target_langs))
+
+        return self._collect(target_langs, outcomes)
+
+    async def adetect_language(self, text: str) -> str:
+        """Detect language of text without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.detect_language, text)
+
+    async def atranslate_single(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_lang: str,
+        model: Optional[str] = None,
+        options: Optional[GenerationOptions] = None,
+        references: Optional[List[dict]] = None,
+        terms: Optional[Dict[str, str]] = None,
     ) -> ToolResult:
         """Translate text to a single target language."""
         start_time = time.time()
 
         try:
             model = model or self.model
-            prompt = self._build_translation_prompt(source_text, source_lang, target_lang)
-
-            translation = self._provider.generate(prompt, model=model)
-            translation = self._clean_translation(translation)
-
-            elapsed = time.time() - start_time
-            word_count = len(translation.split())
-            tokens_per_second = word_count / elapsed if elapsed > 0 else 0
-
-            return ToolResult(
-                success=True,
-                data={
-                    "text": translation,
-                    "source_lang": source_lang,
-                    "target_lang": target_lang,
-                    "model": model,
-                },
-                metadata={
-                    "elapsed_time": round(elapsed, 2),
-                    "word_count": word_count,
-                    "tokens_per_second": round(tokens_per_second, 1),
-                },
+            prompt = self._build_translation_prompt(
+                source_text, source_lang, target_lang, references=references, terms=terms
             )
+            options = self._stage_options(source_text, source_lang, target_lang, options, "translate")
+
+            generation = await self._agenerate(prompt, model, options)
+            return self._translation_result(generation, source_lang, target_lang, model, start_time, options)
         except Exception as e:
             return ToolResult(success=False, error=str(e))
 
-    def translate(
+    async def atranslate(
         self,
         source_text: str,
         source_lang: str,
         target_langs: List[str],
         model: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        options: Optional[GenerationOptions] = None,
+        single_call: bool = False,
         use_vector_db: bool = False,
         use_terminology: bool = False,
         vector_db_service: Optional["VectorDBService"] = None,
         terminology_service: Optional["TerminologyService"] = None,
     ) -> ToolResult:
-        """Translate text to multiple target languages."""
-        results = {}
+        """Translate text to multiple target languages concurrently; see :meth:`translate`."""
+        vector_db_service = vector_db_service if use_vector_db else None
+        terminology_service = terminology_service if use_terminology else None
+        if vector_db_service is not None or terminology_service is not None:
+            return await self.atranslate_with_context(
+                source_text,
+                source_lang,
+                target_langs,
+                lambda target_lang, context: self.atranslate_single(
+                    source_text,
+                    context.source_lang,
+                    target_lang,
+                    model,
+                    options,
+                    context.references.get(target_lang),
+                    context.terms.get(target_lang),
+                ),
+                vector_db_service,
+                terminology_service,
+                model,
+                options,
+                max_workers,
+                translate_all=(
+                    (
+                        lambda langs, context: self.atranslate_multi(
+                            source_text, context.source_lang, langs, model, max_workers, options, context.terms
+                        )
+                    )
+                    if single_call
+                    else None
+                ),
+            )
+
+        if single_call:
+            return await self.atranslate_multi(source_text, source_lang, target_langs, model, max_workers, options)
+
+        start_time = time.time()
 
         if source_lang == "auto":
-            source_lang = self.detect_language(source_text)
+            source_lang = await self.adetect_language(source_text)
 
-        for target_lang in target_langs:
-            result = self.translate_single(source_text, source_lang, target_lang, model)
-            if result.success:
-                results[target_lang] = result.data
-            else:
-                results[target_lang] = {"error": result.error}
+        results = await self.afan_out(
+            lambda target_lang: self.atranslate_single(source_text, source_lang, target_lang, model, options),
+            target_langs,
+            max_workers=max_workers,
+        )
 
-        return ToolResult(success=True, data={"translations": results, "source_lang": source_lang})
+        return ToolResult(
+            success=True,
+            data={"translations": results, "source_lang": source_lang},
+            metadata={
+                "elapsed_time": round(time.time() - start_time, 2),
+                **_total_usage(r.get("metrics", {}) for r in results.values()),
+            },
+        )
 
-    def translate_with_reflection(
-        self, source_text: str, source_lang: str, target_lang: str, model: Optional[str] = None, iterations: int = 1
+    async def atranslate_with_context(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_langs: List[str],
+        translate_one: Callable[[str, TranslationContext], Awaitable[ToolResult]],
+        vector_db_service: Optional["VectorDBService"] = None,
+        terminology_service: Optional["TerminologyService"] = None,
+        model: Optional[str] = None,
+        options: Optional[GenerationOptions] = None,
+        max_workers: Optional[int] = None,
+        translate_all: Optional[Callable[[List[str], TranslationContext], Awaitable[ToolResult]]] = None,
     ) -> ToolResult:
-        """
-        Translate with reflection-based improvement (三省吾身模式).
+        """Translate with TM and glossary context; see :meth:`translate_with_context`."""
+        start_time = time.time()
+        target_langs = list(dict.fromkeys(target_langs))
+        model = model or self.model
+        loop = asyncio.get_running_loop()
+
+        # Lookups and TM edits are blocking calls; keep them off the event loop.
+        context = await loop.run_in_executor(
+            None,
+            functools.partial(
+                self.gather_context, source_text, source_lang, target_langs, vector_db_service, terminology_service
+            ),
+        )
+        translate_start = time.time()
+        reused = await loop.run_in_executor(
+            None, functools.partial(self.reuse_matches, source_text, context, model, options, max_workers)
+        )
+        remaining = [target_lang for target_lang in target_langs if target_lang not in reused]
+        fresh, combined = {}, None
+        if remaining and translate_all is not None:
+            combined = await translate_all(remaining, context)
+            fresh = combined.data["translations"]
+        elif remaining:
+            fresh = await self.afan_out(
+                lambda target_lang: translate_one(target_lang, context), remaining, max_workers=max_workers
+            )
+        context.timings["translate"] = round(time.time() - translate_start, 3)
 
-        This is the core innovation: AI self-reflection and improvement.
-        - Initial translation -> Reflection -> Improved translation
-        - Can iterate multiple times for better quality
-        """
+        return self._context_result(context, target_langs, reused, fresh, start_time, combined)
+
+    async def atranslate_multi(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_langs: List[str],
+        model: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        options: Optional[GenerationOptions] = None,
+        terms: Optional[Dict[str, Dict[str, str]]] = None,
+    ) -> ToolResult:
+        """Asyncio counterpart of :meth:`translate_multi`."""
+        start_time = time.time()
         model = model or self.model
+        terms = terms or {}
 
-        # Step 1: Initial translation
-        initial_result = self.translate_single(source_text, source_lang, target_lang, model)
+        if source_lang == "auto":
+            source_lang = await self.adetect_language(source_text)
+        target_langs = list(dict.fromkeys(target_langs))
+
+        prompt, call_options = self._multi_call_request(source_text, source_lang, target_langs, options, terms)
+        try:
+            generation = await self._agenerate(prompt, model, call_options)
+        except Exception:
+            generation = None
+        results = self._parse_multi_translation(generation, source_lang, target_langs, model)
+
+        fallback = [target_lang for target_lang in target_langs if target_lang not in results]
+        if fallback:
+            results.update(
+                await self.afan_out(
+                    lambda target_lang: self.atranslate_single(
+                        source_text, source_lang, target_lang, model, options, terms=terms.get(target_lang)
+                    ),
+                    fallback,
+                    max_workers=max_workers,
+                )
+            )
+
+        return self._multi_result(results, generation, source_lang, target_langs, fallback, start_time)
+
+    async def atranslate_with_reflection(
+        self,
+        source_text: str,
+        source_lang: str,
+        target_lang: str,
+        model: Optional[str] = None,
+        iterations: int = 1,
+        options: Optional[GenerationOptions] = None,
+        references: Optional[List[dict]] = None,
+        terms: Optional[Dict[str, str]] = None,
+    ) -> ToolResult:
+        """Translate with reflection-based improvement (三省吾身模式)."""
+        model = model or self.model
+
+        initial_result = await self.atranslate_single(
+            source_text, source_lang, target_lang, model, options, references, terms
+        )
         if not initial_result.success:
             return initial_result
 
         current_translation = initial_result.data["text"]
         reflection_history = []
+        usage = [initial_result.metadata]
 
         for i in range(iterations):
-            # Step 2: Reflect on translation
-            reflection_result = self.reflect_translation(
-                source_text, current_translation, source_lang, target_lang, model
+            reflection_result = await self.areflect_translation(
+                source_text, current_translation, source_lang, target_lang, model, options
             )
             if not reflection_result.success:
                 break
+            usage.append(reflection_result.metadata)
 
             reflection = reflection_result.data["reflection"]
 
-            # Step 3: Improve translation based on reflection
-            improve_result = self.improve_translation(
-                source_text, current_translation, reflection, source_lang, target_lang, model
+            improve_result = await self.aimprove_translation(
+                source_text, current_translation, reflection, source_lang, target_lang, model, options
             )
             if not improve_result.success:
                 break
+            usage.append(improve_result.metadata)
 
             improved = improve_result.data["improved_translation"]
             reflection_history.append(
@@ -254,23 +1631,161 @@ class TranslationService:
                 "reflection_history": reflection_history,
                 "iterations": len(reflection_history),
             },
+            metadata=_total_usage(usage),
         )
 
-    def reflect_translation(
-        self, source_text: str, translation: str, source_lang: str, target_lang: str, model: Optional[str] = None
+    async def areflect_translation(
+        self,
+        source_text: str,
+        translation: str,
+        source_lang: str,
+        target_lang: str,
+        model: Optional[str] = None,
+        options: Optional[GenerationOptions] = None,
     ) -> ToolResult:
-        """
-        AI reflects on translation quality (反思翻译).
+        """AI reflects on translation quality (反思翻译)."""
+        model = model or self.model
+        prompt = self._build_reflection_prompt(source_text, translation, source_lang, target_lang)
 
-        The AI analyzes:
-        1. Accuracy - Is the meaning preserved?
-        2. Fluency - Is the expression natural?
-        3. Style - Is the tone appropriate?
-        4. Terminology - Are terms translated correctly?
-        """
+        options = self._stage_options(source_text, source_lang, target_lang, options, "reflect", scale=2.0)
+
+        try:
+            start_time = time.time()
+            generation = await self._agenerate(prompt, model, options)
+
+            return ToolResult(
+                success=True,
+                data={"reflection": strip_thinking(generation.text)[0].strip()},
+                metadata={"model": model, **generation.metrics(time.time() - start_time)},
+            )
+        except Exception as e:
+            return ToolResult(success=False, error=str(e))
+
+    async def aimprove_translation(
+        self,
+        source_text: str,
+        current_translation: str,
+        reflection: str,
+        source_lang: str,
+        target_lang: str,
+        model: Optional[str] = None,
+        options: Optional[GenerationOptions] = None,
+    ) -> ToolResult:
+        """Improve translation based on reflection (改进翻译)."""
         model = model or self.model
+        prompt = self._build_improvement_prompt(source_text, current_translation, reflection, source_lang, target_lang)
 
-        prompt = f"""你是一位专业的翻译质量评审专家。请对以下翻译进行深入分析和反思。
+        options = self._stage_options(source_text, source_lang, target_lang, options, "improve")
+
+        try:
+            start_time = time.time()
+            generation = await self._agenerate(prompt, model, options)
+            improved = self._clean_translation(generation.text)
+            metadata = {"model": model, **generation.metrics(time.time() - start_time)}
+            if generation.truncated and not improved:
+                return ToolResult(success=False, error=_truncated_error(options), metadata=metadata)
+
+            return ToolResult(success=True, data={"improved_translation": improved}, metadata=metadata)
+        except Exception as e:
+            return ToolResult(success=False, error=str(e))
+
+    def _build_translation_prompt(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        context: Optional[str] = None,
+        references: Optional[List[dict]] = None,
+        terms: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """Build translation prompt."""
+        lang_names = self.SUPPORTED_LANGUAGES
+        source_name = lang_names.get(source_lang, source_lang)
+        target_name = lang_names.get(target_lang, target_lang)
+        context_block = f"上下文(仅供参考，不要翻译):\n{context}\n\n" if context else ""
+        if references:
+            examples = "\n".join(f"- 原文: {ref['source']}\n  译文: {ref['translation']}" for ref in references)
+            context_block += f"相似原文的已有译文(请保持用词和风格一致):\n{examples}\n\n"
+        if terms:
+            glossary = "\n".join(f"- {term} → {translation}" for term, translation in terms.items())
+            context_block += f"术语表(请使用以下译法):\n{glossary}\n\n"
+
+        return f"""请将以下{source_name}文本翻译成{target_name}。
+
+{context_block}原文:
+{text}
+
+请直接输出翻译结果，不要包含任何解释或其他内容。"""
+
+    def _build_adaptation_prompt(self, text: str, source_lang: str, target_lang: str, match: dict) -> str:
+        """Build minimal-edit prompt for a near-identical translation memory match."""
+        lang_names = self.SUPPORTED_LANGUAGES
+        source_name = lang_names.get(source_lang, source_lang)
+        target_name = lang_names.get(target_lang, target_lang)
+
+        return f"""下面是一条翻译记忆：{source_name}原文与其{target_name}译文。新原文与记忆原文只有细微差别。
+请只修改译文中与差别相关的部分，使其准确翻译新原文，其余内容保持不变。
+
+记忆原文:
+{match["source"]}
+
+记忆译文:
+{match["translation"]}
+
+新原文:
+{text}
+
+请直接输出修改后的译文，不要包含任何解释或其他内容。"""
+
+    def _build_multi_translation_prompt(
+        self,
+        text: str,
+        source_lang: str,
+        target_langs: List[str],
+        terms: Optional[Dict[str, Dict[str, str]]] = None,
+    ) -> str:
+        """Build single-call translation prompt for several target languages."""
+        lang_names = self.SUPPORTED_LANGUAGES
+        source_name = lang_names.get(source_lang, source_lang)
+        targets = "\n".join(f"- {lang}: {lang_names.get(lang, lang)}" for lang in target_langs)
+
+        glossary_block = ""
+        glossaries = [
+            f"{lang}:\n" + "\n".join(f"- {term} → {translation}" for term, translation in terms[lang].items())
+            for lang in target_langs
+            if terms and terms.get(lang)
+        ]
+        if glossaries:
+            glossary_block = "术语表(请使用以下译法):\n" + "\n".join(glossaries) + "\n\n"
+
+        return f"""请将以下{source_name}文本分别翻译成下列语言。
+
+目标语言(语言代码: 语言):
+{targets}
+
+{glossary_block}原文:
+{text}
+
+请以JSON对象输出，键为上述语言代码，值为对应的译文。只输出JSON，不要包含任何解释或其他内容。"""
+
+    def _build_batch_translation_prompt(self, block: str, source_lang: str, target_lang: str) -> str:
+        """Build packed-segment translation prompt."""
+        lang_names = self.SUPPORTED_LANGUAGES
+        source_name = lang_names.get(source_lang, source_lang)
+        target_name = lang_names.get(target_lang, target_lang)
+
+        return f"""请将以下{source_name}文本片段逐条翻译成{target_name}。
+每个片段以<seg id="编号">开头、以</seg>结尾。请保留相同的编号和标记，逐条单独翻译，不要合并、拆分或遗漏片段。
+
+{block}
+
+只输出带标记的译文，不要包含任何解释或其他内容。"""
+
+    def _build_reflection_prompt(
+        self, source_text: str, translation: str, source_lang: str, target_lang: str
+    ) -> str:
+        """Build reflection prompt."""
+        return f"""你是一位专业的翻译质量评审专家。请对以下翻译进行深入分析和反思。
 
 原文({source_lang}):
 {source_text}
@@ -286,31 +1801,17 @@ class TranslationService:
 
 请指出翻译中的问题，并提出具体的改进建议。直接输出分析和建议，不要包含其他内容。"""
 
-        try:
-            reflection = self._provider.generate(prompt, model=model)
-
-            return ToolResult(success=True, data={"reflection": reflection}, metadata={"model": model})
-        except Exception as e:
-            return ToolResult(success=False, error=str(e))
 
-    def improve_translation(
+    def _build_improvement_prompt(
         self,
         source_text: str,
         current_translation: str,
         reflection: str,
         source_lang: str,
         target_lang: str,
-        model: Optional[str] = None,
-    ) -> ToolResult:
-        """
-        Improve translation based on reflection (改进翻译).
-
-        Key innovation: Uses AI's own analysis to guide improvement,
-        creating a self-improving translation loop.
-        """
-        model = model or self.model
-
-        prompt = f"""你是一位专业翻译专家。请根据以下分析和建议，改进翻译。
+    ) -> str:
+        """Build improvement prompt."""
+        return f"""你是一位专业翻译专家。请根据以下分析和建议，改进翻译。
 
 原文({source_lang}):
 {source_text}
@@ -323,47 +1824,9 @@ class TranslationService:
 
 请输出改进后的翻译。只输出改进后的译文，不要包含任何解释或其他内容。"""
 
-        try:
-            improved = self._provider.generate(prompt, model=model)
-            improved = self._clean_translation(improved)
-
-            return ToolResult(success=True, data={"improved_translation": improved}, metadata={"model": model})
-        except Exception as e:
-            return ToolResult(success=False, error=str(e))
-
-    def translate_iterative(
-        self, source_text: str, source_lang: str, target_lang: str, model: Optional[str] = None, iterations: int = 3
-    ) -> ToolResult:
-        """
-        Iterative refinement translation (千锤百炼模式).
-
-        This is the signature feature: configurable multi-round reflection
-        and improvement, allowing users to balance quality vs speed.
-
-        Args:
-            iterations: Number of improvement iterations (1-10)
-
-        Returns:
-            ToolResult with translation and full improvement history
-        """
-        return self.translate_with_reflection(source_text, source_lang, target_lang, model, iterations)
-
-    def _build_translation_prompt(self, text: str, source_lang: str, target_lang: str) -> str:
-        """Build translation prompt."""
-        lang_names = self.SUPPORTED_LANGUAGES
-        source_name = lang_names.get(source_lang, source_lang)
-        target_name = lang_names.get(target_lang, target_lang)
-
-        return f"""请将以下{source_name}文本翻译成{target_name}。
-
-原文:
-{text}
-
-请直接输出翻译结果，不要包含任何解释或其他内容。"""
-
     def _clean_translation(self, text: str) -> str:
         """Clean translation output."""
-        text = text.strip()
+        text = strip_thinking(text)[0].strip()
 
         patterns = [
             ("以下是翻译", ""),
@@ -385,26 +1848,63 @@ class TranslationService:
         return text
 
 
+def _pair_key(source_text: str, translations: Dict[str, str]) -> str:
+    return json.dumps([source_text, translations], sort_keys=True, ensure_ascii=False)
+
+
 class VectorDBService:
-    """Vector database for translation memory using FAISS."""
+    """
+    Vector database for translation memory using FAISS.
+
+    Exact repeats are answered from a hash index (:meth:`lookup_exact`)
+    without loading the embedding model, which is only loaded on the first
+    add or similarity search.
+
+    Adds are appended to a write-ahead log (``tm.wal``) instead of
+    rewriting the index and metadata, so an insert costs O(1) disk I/O.
+    A background thread snapshots the index and metadata (atomically,
+    via temp file and rename) every ``snapshot_interval`` seconds or
+    ``snapshot_every`` adds; on startup the log is replayed on top of the
+    last snapshot. Call :meth:`close` (or :meth:`save`) to snapshot now.
+    Bulk imports go through :meth:`add_translation_pairs`, which encodes
+    and indexes whole batches and snapshots at checkpoints instead.
+    """
 
-    def __init__(self, db_path: str = "data/vector_db", embedding_model: str = None):
+    def __init__(
+        self,
+        db_path: str = "data/vector_db",
+        embedding_model: str = None,
+        snapshot_interval: float = 60.0,
+        snapshot_every: int = 1000,
+    ):
         if SentenceTransformer is None:
             raise ImportError("sentence-transformers is required for VectorDBService")
 
         self.db_path = db_path
         self.embedding_model_name = embedding_model or "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
-        self.model = SentenceTransformer(self.embedding_model_name)
+        self._model = None
         self.dimension = 384
+        self.exact_index = ExactMatchIndex()
+        self._lock = threading.RLock()
+        self._snapshot_lock = threading.Lock()
 
         self._load_or_create_index()
+        self._snapshots = PeriodicSnapshot(self._save_index, interval=snapshot_interval, max_pending=snapshot_every)
+
+    @property
+    def model(self) -> "SentenceTransformer":
+        """Embedding model, loaded on first use."""
+        if self._model is None:
+            self._model = SentenceTransformer(self.embedding_model_name)
+        return self._model
 
     def _load_or_create_index(self):
-        """Load or create FAISS index."""
+        """Load the last snapshot (or create an empty index) and replay the write-ahead log."""
         os.makedirs(self.db_path, exist_ok=True)
 
         index_path = os.path.join(self.db_path, "faiss_index.bin")
         metadata_path = os.path.join(self.db_path, "metadata.pkl")
+        self.wal = WriteAheadLog(os.path.join(self.db_path, "tm.wal"))
 
         if os.path.exists(index_path) and os.path.exists(metadata_path):
             self.index = faiss.read_index(index_path)
@@ -412,61 +1912,186 @@ class VectorDBService:
                 import pickle
 
                 self.metadata = pickle.load(f)
+            if self.index.ntotal != len(self.metadata):
+                # A crash between the two snapshot files; the metadata holds every embedding.
+                self.index = faiss.IndexFlatL2(self.dimension)
+                if self.metadata:
+                    self.index.add(np.array([item["embedding"] for item in self.metadata], dtype=np.float32))
         else:
             self.index = faiss.IndexFlatL2(self.dimension)
             self.metadata = []
 
+        stored = None
+        for record in self.wal.replay():
+            # Records up to the snapshot's size are already part of it; a record whose pair is
+            # already stored survived a crash during a snapshot that shrank the store.
+            if stored is None:
+                stored = {_pair_key(item["source"], item["translations"]) for item in self.metadata}
+            key = _pair_key(record["source"], record["translations"])
+            if record.get("seq", -1) >= len(self.metadata) and key not in stored:
+                self._append(record["source"], record["translations"], record["embedding"])
+                stored.add(key)
+        self.exact_index.rebuild(self.metadata)
+
+    def _append(self, source_text: str, translations: Dict[str, str], embedding: List[float]) -> int:
+        """Add one entry in memory (caller holds the lock); returns its sequence number."""
+        seq = len(self.metadata)
+        self.index.add(np.array([embedding], dtype=np.float32))
+        self.metadata.append({"source": source_text, "translations": translations, "embedding": embedding})
+        self.exact_index.add(source_text, translations)
+        return seq
+
+    def _extend(self, pairs: List[TranslationPair], embeddings: np.ndarray) -> None:
+        """Add a batch of entries in memory with one index add (caller holds the lock)."""
+        self.index.add(embeddings)
+        for (source_text, translations), embedding in zip(pairs, embeddings.tolist()):
+            self.metadata.append({"source": source_text, "translations": translations, "embedding": embedding})
+            self.exact_index.add(source_text, translations)
+
     def add_translation_pair(self, source_text: str, translations: Dict[str, str]) -> ToolResult:
-        """Add translation pair to vector database."""
+        """Add translation pair to vector database (logged, not rewritten; see the class docstring)."""
         try:
-            embedding = self.model.encode(source_text)
-            self.index.add(np.array([embedding]))
+            embedding = self.model.encode(source_text).tolist()
+            with self._lock:
+                seq = self._append(source_text, translations, embedding)
+                self.wal.append(
+                    {"seq": seq, "source": source_text, "translations": translations, "embedding": embedding}
+                )
+                total = len(self.metadata)
+            self._snapshots.mark()
+
+            return ToolResult(success=True, data={"total_pairs": total})
+        except Exception as e:
+            return ToolResult(success=False, error=str(e))
 
-            self.metadata.append({"source": source_text, "translations": translations, "embedding": embedding.tolist()})
+    def add_translation_pairs(
+        self,
+        pairs: Iterable[Union[TranslationPair, Dict[str, Any]]],
+        batch_size: int = 256,
+        checkpoint_every: Optional[int] = 10000,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> ToolResult:
+        """
+        Add many translation pairs with one encode and one index add per batch.
+
+        ``pairs`` are ``(source, translations)`` tuples or TM items and are
+        consumed lazily. Instead of logging every pair, the store is
+        snapshotted every ``checkpoint_every`` pairs (None: only at the end)
+        and when the import finishes, so a crash loses at most the pairs
+        since the last checkpoint. ``progress`` is called after each batch
+        with the running ``added`` count, ``batches``, ``checkpoints``,
+        ``elapsed`` seconds and ``pairs_per_second``.
+        """
+        stats = IngestProgress()
+        unsaved = 0
+        try:
+            for batch in iter_pair_batches(pairs, batch_size):
+                sources = [source_text for source_text, _ in batch]
+                embeddings = np.asarray(self.model.encode(sources, batch_size=batch_size), dtype=np.float32)
+                with self._lock:
+                    self._extend(batch, embeddings)
+                stats.add_batch(len(batch))
+                unsaved += len(batch)
+                if checkpoint_every and unsaved >= checkpoint_every:
+                    self.save()
+                    stats.checkpoints += 1
+                    unsaved = 0
+                if progress is not None:
+                    progress(stats.report())
+            if unsaved:
+                self.save()
+                stats.checkpoints += 1
+        except Exception as e:
+            # Leave what was added to the background snapshot.
+            self._snapshots.mark(unsaved)
+            return ToolResult(success=False, error=str(e), data=stats.report())
+        return ToolResult(success=True, data={**stats.report(), "total_pairs": len(self.metadata)})
 
-            self._save_index()
+    def lookup_exact(self, source_text: str, target_langs: Optional[List[str]] = None) -> Dict[str, str]:
+        """Stored translations of an exact (normalized) repeat of ``source_text``, per language."""
+        return self.exact_index.lookup(source_text, target_langs)
 
-            return ToolResult(success=True, data={"total_pairs": len(self.metadata)})
-        except Exception as e:
-            return ToolResult(success=False, error=str(e))
+    def search_similar(self, query_text: str, k: int = 5, tiers: Optional[LeverageTiers] = None) -> ToolResult:
+        """
+        Search for similar translations.
 
-    def search_similar(self, query_text: str, k: int = 5) -> ToolResult:
-        """Search for similar translations."""
+        Each match carries the embedding ``cosine``, the character
+        ``edit_ratio`` against the query and their combined ``score``
+        (weighted by ``tiers``); matches are sorted by score per language.
+        """
         if self.index.ntotal == 0:
             return ToolResult(success=True, data={"results": {}})
 
         try:
+            tiers = tiers or LeverageTiers()
             query_embedding = self.model.encode(query_text)
-            k = min(k, self.index.ntotal)
-            distances, indices = self.index.search(np.array([query_embedding]), k)
+            with self._lock:
+                k = min(k, self.index.ntotal)
+                distances, indices = self.index.search(np.array([query_embedding]), k)
 
             results = {}
             for idx, distance in zip(indices[0], distances[0]):
-                if idx < len(self.metadata):
+                if 0 <= idx < len(self.metadata):
                     item = self.metadata[idx]
                     similarity = 1 / (1 + distance)
+                    cosine = cosine_similarity(query_embedding, item["embedding"])
+                    edit = edit_ratio(query_text, item["source"])
 
                     for lang, trans in item["translations"].items():
                         if lang not in results:
                             results[lang] = []
                         results[lang].append(
-                            {"source": item["source"], "translation": trans, "similarity": float(similarity)}
+                            {
+                                "source": item["source"],
+                                "translation": trans,
+                                "similarity": float(similarity),
+                                "cosine": round(cosine, 4),
+                                "edit_ratio": round(edit, 4),
+                                "score": tiers.score(cosine, edit),
+                            }
                         )
 
+            for matches in results.values():
+                matches.sort(key=lambda match: match["score"], reverse=True)
             return ToolResult(success=True, data={"results": results})
         except Exception as e:
             return ToolResult(success=False, error=str(e))
 
     def _save_index(self):
-        """Save index and metadata."""
+        """Snapshot index and metadata atomically, then drop the log records they contain."""
         import pickle
 
         index_path = os.path.join(self.db_path, "faiss_index.bin")
         metadata_path = os.path.join(self.db_path, "metadata.pkl")
 
-        faiss.write_index(self.index, index_path)
-        with open(metadata_path, "wb") as f:
-            pickle.dump(self.metadata, f)
+        with self._snapshot_lock:
+            # Copy the state and set the log aside together, so adds made while writing stay logged.
+            with self._lock:
+                index = faiss.clone_index(self.index)
+                metadata = list(self.metadata)
+                self.wal.rotate()
+
+            def write_metadata(path: str) -> None:
+                with open(path, "wb") as f:
+                    pickle.dump(metadata, f)
+
+            atomic_write(metadata_path, write_metadata)
+            atomic_write(index_path, lambda path: faiss.write_index(index, path))
+            self.wal.discard_rotated()
+
+    def save(self) -> None:
+        """Snapshot now instead of waiting for the background snapshot."""
+        self._snapshots.flush(force=True)
+
+    def close(self) -> None:
+        """Stop background snapshots and persist pending adds."""
+        self._snapshots.stop()
+        self.wal.close()
+
+    @property
+    def version(self) -> str:
+        """Changes whenever translation memory content changes."""
+        return str(len(self.metadata))
 
     def get_statistics(self) -> ToolResult:
         """Get translation memory statistics."""
@@ -475,7 +2100,14 @@ class VectorDBService:
             for lang in item["translations"].keys():
                 lang_counts[lang] = lang_counts.get(lang, 0) + 1
 
-        return ToolResult(success=True, data={"total_items": len(self.metadata), "language_counts": lang_counts})
+        return ToolResult(
+            success=True,
+            data={
+                "total_items": len(self.metadata),
+                "language_counts": lang_counts,
+                "exact_entries": len(self.exact_index),
+            },
+        )
 
 
 class TerminologyService:
@@ -485,6 +2117,15 @@ class TerminologyService:
         self.db_path = db_path
         self.terminology_file = os.path.join(db_path, "terminology.json")
         self.terminology = self._load_terminology()
+        self._version: Optional[str] = None
+
+    @property
+    def version(self) -> str:
+        """Content hash of the glossary; changes whenever an entry changes."""
+        if self._version is None:
+            encoded = json.dumps(self.terminology, sort_keys=True, ensure_ascii=False).encode("utf-8")
+            self._version = hashlib.sha1(encoded).hexdigest()[:16]
+        return self._version
 
     def _load_terminology(self) -> Dict[str, Dict[str, str]]:
         """Load terminology database."""
@@ -497,6 +2138,7 @@ class TerminologyService:
 
     def _save_terminology(self):
         """Save terminology database."""
+        self._version = None
         with open(self.terminology_file, "w", encoding="utf-8") as f:
             json.dump(self.terminology, f, ensure_ascii=False, indent=2)
 
@@ -0,0 +1,200 @@
+"""
+TransCoder Translation Memory Matching
+
+Exact-match lookup for translation memory entries, checked before any
+embedding or similarity search, leverage tiers that decide how a fuzzy
+match is used, and batching of translation pairs for bulk ingestion.
+"""
+
+import difflib
+import hashlib
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from transcoder.cache import normalize_source_text
+
+
+class ExactMatchIndex:
+    """
+    Hash index from normalized source text to stored translations.
+
+    Entries with the same normalized source are merged, a later
+    translation for a language replacing an earlier one.
+
+    Usage:
+        index = ExactMatchIndex()
+        index.add("Hello", {"ja": "こんにちは"})
+        index.lookup(" Hello\\n", ["ja", "ko"])  # {"ja": "こんにちは"}
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[str, str]] = {}
+
+    @staticmethod
+    def key(source_text: str) -> str:
+        """Digest of the normalized source text."""
+        return hashlib.sha256(normalize_source_text(source_text).encode("utf-8")).hexdigest()
+
+    def add(self, source_text: str, translations: Dict[str, str]) -> None:
+        """Index the translations of ``source_text``; empty translations are ignored."""
+        stored = {lang: text for lang, text in translations.items() if text}
+        if stored:
+            self._entries.setdefault(self.key(source_text), {}).update(stored)
+
+    def rebuild(self, items: Iterable[dict]) -> None:
+        """Re-index TM metadata items (``{"source": ..., "translations": {...}}``) in order."""
+        self._entries = {}
+        for item in items:
+            self.add(item["source"], item["translations"])
+
+    def lookup(self, source_text: str, target_langs: Optional[List[str]] = None) -> Dict[str, str]:
+        """Stored translations of ``source_text``, limited to ``target_langs`` when given."""
+        stored = self._entries.get(self.key(source_text), {})
+        if target_langs is None:
+            return dict(stored)
+        return {lang: stored[lang] for lang in target_langs if lang in stored}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def edit_ratio(a: str, b: str) -> float:
+    """Character-level similarity of two normalized texts (1.0 when identical)."""
+    return difflib.SequenceMatcher(None, normalize_source_text(a), normalize_source_text(b), autojunk=False).ratio()
+
+
+def cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
+    """Cosine of the angle between two embeddings (0.0 for a zero vector)."""
+    a, b = np.asarray(a, dtype=np.float32), np.asarray(b, dtype=np.float32)
+    norm = float(np.linalg.norm(a) * np.linalg.norm(b))
+    return float(np.dot(a, b) / norm) if norm else 0.0
+
+
+_LOCKED_TOKEN = re.compile(r"\{[^{}]*\}|%(?:\d+\$)?[-+#0]*\d*(?:\.\d+)?[sdfix]|<[^<>]+>|\d+(?:[.,]\d+)*")
+
+
+def locked_tokens(text: str) -> List[str]:
+    """Numbers and placeholders (``{name}``, ``%s``, ``<b>``) in ``text``, sorted."""
+    return sorted(_LOCKED_TOKEN.findall(text))
+
+
+@dataclass
+class LeverageTiers:
+    """
+    Thresholds that turn a fuzzy TM match score into a leverage tier.
+
+    The score mixes the embedding cosine (meaning) with the character edit
+    ratio (surface form), so a paraphrase and a one-word change do not
+    look alike. Matches scoring at least ``high`` are reused directly (after
+    a minimal-edit pass when ``minimal_edit`` is set), matches from ``mid``
+    become full-length prompt references, and the rest are ignored. A high
+    match whose numbers or placeholders differ from the query is demoted to
+    a reference, since a near-identical score hides exactly that change.
+    """
+
+    high: float = 0.95
+    mid: float = 0.75
+    semantic_weight: float = 0.5
+    minimal_edit: bool = False
+    max_references: int = 3
+
+    def score(self, cosine: float, edit: float) -> float:
+        """Combined match score in [0, 1] (negative cosines count as 0)."""
+        return round(self.semantic_weight * max(cosine, 0.0) + (1 - self.semantic_weight) * edit, 4)
+
+    def tier(self, score: float) -> str:
+        """Tier ("high", "mid" or "low") of a match score."""
+        if score >= self.high:
+            return "high"
+        return "mid" if score >= self.mid else "low"
+
+    def classify(
+        self, matches: List[dict], source_text: Optional[str] = None
+    ) -> Tuple[str, Optional[dict], List[dict]]:
+        """
+        Pick the tier for one language from its scored matches.
+
+        Returns the tier ("none" without matches), the best match and the
+        mid-or-better matches to use as references, best first. With
+        ``source_text`` (the query), a high match is only kept high when its
+        numbers and placeholders are the query's.
+        """
+        if not matches:
+            return "none", None, []
+        ranked = sorted(matches, key=lambda match: match["score"], reverse=True)
+        references = [match for match in ranked if match["score"] >= self.mid][: self.max_references]
+        tier = self.tier(ranked[0]["score"])
+        if tier == "high" and source_text is not None:
+            if locked_tokens(ranked[0]["source"]) != locked_tokens(source_text):
+                tier = "mid"
+        return tier, ranked[0], references
+
+
+TranslationPair = Tuple[str, Dict[str, str]]
+
+
+def iter_pair_batches(
+    pairs: Iterable[Union[TranslationPair, Dict[str, Any]]], batch_size: int = 256
+) -> Iterator[List[TranslationPair]]:
+    """
+    Group translation pairs into lists of at most ``batch_size`` for bulk ingestion.
+
+    Pairs are ``(source, translations)`` tuples or TM items
+    (``{"source": ..., "translations": {...}}``). Empty translations are
+    dropped, and pairs left without a source or any translation are
+    skipped. ``pairs`` is consumed lazily, so a large import never has to
+    be held in memory at once.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    batch: List[TranslationPair] = []
+    for pair in pairs:
+        if isinstance(pair, dict):
+            source_text, translations = pair.get("source"), pair.get("translations") or {}
+        else:
+            source_text, translations = pair
+        translations = {lang: text for lang, text in translations.items() if text}
+        if not source_text or not translations:
+            continue
+        batch.append((source_text, translations))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+@dataclass
+class IngestProgress:
+    """
+    Running counts and throughput of a bulk translation memory import.
+
+    Usage:
+        progress = IngestProgress()
+        progress.add_batch(256)
+        progress.report()  # {"added": 256, "batches": 1, ..., "pairs_per_second": ...}
+    """
+
+    added: int = 0
+    batches: int = 0
+    checkpoints: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    def add_batch(self, count: int) -> None:
+        self.added += count
+        self.batches += 1
+
+    def report(self) -> Dict[str, Any]:
+        """Counts so far with the elapsed seconds and pairs per second."""
+        elapsed = time.perf_counter() - self.started
+        return {
+            "added": self.added,
+            "batches": self.batches,
+            "checkpoints": self.checkpoints,
+            "elapsed": round(elapsed, 3),
+            "pairs_per_second": round(self.added / elapsed, 1) if elapsed > 0 else 0.0,
+        }
@@ -0,0 +1,136 @@
+"""
+TransCoder Generation Options
+
+Typed generation settings shared by every provider, plus the
+source-proportional output cap that stops runaway generations.
+"""
+
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Dict, List, Optional
+
+# Output tokens per source token, relative to English. A language pair's
+# expansion ratio is target density / source density.
+TOKEN_DENSITY = {
+    "en": 1.0,
+    "zh-cn": 0.9,
+    "zh-tw": 1.0,
+    "zh-classical-cn": 0.6,
+    "zh-classical-tw": 0.6,
+    "ja": 1.1,
+    "ko": 1.3,
+    "es": 1.2,
+    "fr": 1.2,
+    "de": 1.2,
+    "ru": 1.4,
+    "ar": 1.4,
+    "pt": 1.2,
+}
+
+
+def _is_cjk(char: str) -> bool:
+    code = ord(char)
+    return (
+        0x3040 <= code <= 0x30FF  # Hiragana, Katakana
+        or 0x3400 <= code <= 0x4DBF  # CJK Extension A
+        or 0x4E00 <= code <= 0x9FFF  # CJK Unified Ideographs
+        or 0xAC00 <= code <= 0xD7AF  # Hangul syllables
+        or 0xF900 <= code <= 0xFAFF  # CJK Compatibility Ideographs
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough tokenizer-independent token estimate.
+
+    CJK characters count as one token each; other text as one token per
+    four characters. Good enough for sizing caps, not for accounting.
+    """
+    cjk = sum(1 for char in text if _is_cjk(char))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+# Extra output tokens for a reasoning model that may think before answering;
+# reasoning counts against the same limit as the answer.
+REASONING_TOKENS = 2048
+
+
+def output_token_cap(
+    source_text: str, source_lang: str, target_lang: str, factor: float = 4.0, floor: int = 256
+) -> int:
+    """
+    Output token budget proportional to the source length for a language pair.
+
+    ``factor`` leaves headroom for formatting and reasoning preambles;
+    ``floor`` keeps short inputs from being cut off.
+    """
+    ratio = TOKEN_DENSITY.get(target_lang, 1.0) / TOKEN_DENSITY.get(source_lang, 1.0)
+    return max(floor, int(estimate_tokens(source_text) * ratio * factor))
+
+
+@dataclass
+class GenerationOptions:
+    """
+    Backend-neutral generation settings.
+
+    Unset fields (None) leave the backend default in place.
+    ``max_tokens`` maps to Ollama ``num_predict`` and OpenAI ``max_tokens``;
+    ``num_ctx`` is Ollama-only. ``think=False`` turns off a reasoning
+    model's thinking (Ollama's ``think`` flag, or the ``/no_think`` prompt
+    switch for OpenAI-compatible backends). ``json_schema`` constrains the
+    output to JSON (Ollama ``format``; OpenAI JSON mode).
+    """
+
+    max_tokens: Optional[int] = None
+    num_ctx: Optional[int] = None
+    temperature: Optional[float] = None
+    seed: Optional[int] = None
+    stop: Optional[List[str]] = field(default=None)
+    think: Optional[bool] = None
+    json_schema: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["GenerationOptions"]:
+        """Build from a request payload, accepting ``num_predict`` as an alias for ``max_tokens``."""
+        if not data:
+            return None
+        data = dict(data)
+        if "num_predict" in data:
+            data.setdefault("max_tokens", data.pop("num_predict"))
+        known = {name: data[name] for name in cls.__dataclass_fields__ if data.get(name) is not None}
+        return cls(**known)
+
+    def merged(self, overrides: Optional["GenerationOptions"]) -> "GenerationOptions":
+        """Copy with every field set in ``overrides`` taking precedence."""
+        if overrides is None:
+            return replace(self)
+        return replace(self, **{k: v for k, v in asdict(overrides).items() if v is not None})
+
+    def with_cap(self, cap: int) -> "GenerationOptions":
+        """Copy whose ``max_tokens`` is at most ``cap``."""
+        max_tokens = cap if self.max_tokens is None else min(self.max_tokens, cap)
+        return replace(self, max_tokens=max_tokens)
+
+    def to_ollama(self) -> Dict[str, Any]:
+        """Ollama ``options`` mapping."""
+        mapping = {
+            "num_predict": self.max_tokens,
+            "num_ctx": self.num_ctx,
+            "temperature": self.temperature,
+            "seed": self.seed,
+            "stop": self.stop,
+        }
+        return {key: value for key, value in mapping.items() if value is not None}
+
+    def to_openai(self) -> Dict[str, Any]:
+        """Keyword arguments for ``chat.completions.create``."""
+        mapping = {
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "seed": self.seed,
+            "stop": self.stop,
+        }
+        return {key: value for key, value in mapping.items() if value is not None}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Set fields only, e.g. for cache keys and metadata."""
+        return {key: value for key, value in asdict(self).items() if value is not None}
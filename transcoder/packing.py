@@ -0,0 +1,76 @@
+"""
+TransCoder Segment Packing
+
+Groups many short strings (UI labels, messages) into numbered,
+delimiter-protected batches so one generation translates several of them,
+and parses the numbered answers back into individual segments.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List, Sequence
+
+from transcoder.options import estimate_tokens
+
+SEGMENT_OPEN = '<seg id="{id}">'
+SEGMENT_CLOSE = "</seg>"
+
+_SEGMENT_PATTERN = re.compile(r'<seg id="(\d+)">(.*?)</seg>', re.DOTALL)
+_OPEN_PATTERN = re.compile(r'<seg id="(\d+)">')
+# Per-segment overhead of the markup, in estimated tokens.
+_MARKUP_TOKENS = 8
+
+
+def can_pack(text: str) -> bool:
+    """Segments that contain the markup themselves cannot be delimited safely."""
+    return "<seg" not in text and SEGMENT_CLOSE not in text
+
+
+def pack_segments(segments: Sequence[str], budget_tokens: int = 1024, max_batch: int = 50) -> List[List[int]]:
+    """
+    Group segment indices into batches of at most ``budget_tokens`` estimated source tokens.
+
+    Indices keep their order within a batch. Segments that do not fit the
+    budget on their own, or that contain the markup, form single-segment
+    batches (translated without packing); empty segments are left out.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for index, text in enumerate(segments):
+        if not text.strip():
+            continue
+        cost = estimate_tokens(text) + _MARKUP_TOKENS
+        if cost > budget_tokens or not can_pack(text):
+            batches.append([index])
+            continue
+        if current and (used + cost > budget_tokens or len(current) >= max_batch):
+            batches.append(current)
+            current, used = [], 0
+        current.append(index)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def format_batch(texts: Sequence[str]) -> str:
+    """Number and delimit ``texts`` (ids start at 1) for a batch prompt."""
+    return "\n".join(f"{SEGMENT_OPEN.format(id=i)}{text}{SEGMENT_CLOSE}" for i, text in enumerate(texts, 1))
+
+
+def parse_batch(answer: str, count: int) -> Dict[int, str]:
+    """
+    Recover translations from a batch answer, keyed by 0-based position.
+
+    Only segments whose boundary came back intact are returned: an id in
+    range, appearing exactly once, with non-empty content and no stray
+    markup inside. Callers retry the missing positions individually.
+    """
+    opened = Counter(int(seg_id) for seg_id in _OPEN_PATTERN.findall(answer))
+    results = {}
+    for match in _SEGMENT_PATTERN.finditer(answer):
+        seg_id, text = int(match.group(1)), match.group(2).strip()
+        if 1 <= seg_id <= count and opened[seg_id] == 1 and text and can_pack(text):
+            results[seg_id - 1] = text
+    return results
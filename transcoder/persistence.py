@@ -0,0 +1,215 @@
+"""
+TransCoder Append-Only Persistence
+
+Write-ahead log, atomic file replacement and background snapshotting for
+stores (such as the translation memory) that would otherwise rewrite
+their whole state on every insert.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+def atomic_write(path: str, write: Callable[[str], None]) -> None:
+    """
+    Replace ``path`` atomically with the file that ``write(tmp_path)`` produces.
+
+    The temporary file is created in the same directory, flushed to disk
+    and renamed over ``path``, so readers and crashes see either the old
+    or the new file, never a partial one.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    os.close(fd)
+    try:
+        write(tmp_path)
+        with open(tmp_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _ends_with_newline(path: str) -> bool:
+    """True for an empty file or one whose last byte is a newline."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+class WriteAheadLog:
+    """
+    Append-only JSON-lines log of records added since the last snapshot.
+
+    Appends cost O(1) regardless of how much the store holds. A record cut
+    short by a crash is skipped on replay. Callers number their records
+    (e.g. with a ``seq`` field) so replay can skip records a snapshot
+    already contains.
+
+    To snapshot without losing concurrent appends, :meth:`rotate` the log
+    while holding the store's lock (moving its records aside), write the
+    snapshot, then :meth:`discard_rotated`. Replay reads rotated records
+    first, so a crash at any point loses nothing.
+
+    Usage:
+        wal = WriteAheadLog("data/vector_db/tm.wal")
+        wal.append({"seq": 0, "source": "Hello", "translations": {"ja": "こんにちは"}})
+        for record in wal.replay():
+            ...
+    """
+
+    def __init__(self, path: str, fsync: bool = False):
+        """
+        Args:
+            path: Log file path
+            fsync: Force every append to disk (survives power loss, not just process crashes)
+        """
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Write one record and flush it."""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                # Kept open across appends and closed by close()/rotate(), so no context manager.
+                self._file = open(self.path, "a", encoding="utf-8")  # noqa: SIM115
+                if not _ends_with_newline(self.path):
+                    # Never glue a record onto a line torn by a crash.
+                    self._file.write("\n")
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    @property
+    def rotated_path(self) -> str:
+        return self.path + ".old"
+
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        """Yield the logged records in order (rotated ones first), skipping torn or corrupt lines."""
+        for path in (self.rotated_path, self.path):
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+    def rotate(self) -> None:
+        """Move the current records aside; later appends start a new log."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if not os.path.exists(self.path):
+                return
+            if not os.path.exists(self.rotated_path):
+                os.replace(self.path, self.rotated_path)
+                return
+            # An earlier snapshot failed; keep its records and add the new ones.
+            with open(self.path, encoding="utf-8") as src, open(self.rotated_path, "a", encoding="utf-8") as dst:
+                dst.write(src.read())
+            os.remove(self.path)
+
+    def discard_rotated(self) -> None:
+        """Drop the rotated records once a snapshot containing them is on disk."""
+        with self._lock:
+            if os.path.exists(self.rotated_path):
+                os.remove(self.rotated_path)
+
+    def reset(self) -> None:
+        """Drop every logged record (after a full rewrite of the store)."""
+        self.rotate()
+        self.discard_rotated()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class PeriodicSnapshot:
+    """
+    Run ``snapshot()`` on a background thread when a store has pending changes.
+
+    A snapshot is taken every ``interval`` seconds while changes are
+    pending, or as soon as ``max_pending`` changes have accumulated.
+    Failures are kept in :attr:`last_error` and retried next time.
+
+    Usage:
+        snapshots = PeriodicSnapshot(store.save_snapshot, interval=60, max_pending=1000)
+        store.add(...)
+        snapshots.mark()
+        snapshots.stop()  # takes a final snapshot
+    """
+
+    def __init__(self, snapshot: Callable[[], None], interval: float = 60.0, max_pending: int = 1000):
+        self.snapshot = snapshot
+        self.interval = interval
+        self.max_pending = max_pending
+        self.pending = 0
+        self.snapshots = 0
+        self.last_error: Optional[str] = None
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def mark(self, count: int = 1) -> None:
+        """Record ``count`` new changes; starts the background thread on first use."""
+        with self._condition:
+            self.pending += count
+            if self._thread is None and not self._stopped:
+                self._thread = threading.Thread(target=self._run, name="transcoder-snapshot", daemon=True)
+                self._thread.start()
+            if self.pending >= self.max_pending:
+                self._condition.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._stopped or self.pending >= self.max_pending, self.interval)
+                if self._stopped:
+                    return
+                if not self.pending:
+                    continue
+            self.flush()
+
+    def flush(self, force: bool = False) -> None:
+        """Take a snapshot now if changes are pending (or regardless, with ``force``)."""
+        with self._condition:
+            pending, self.pending = self.pending, 0
+        if not pending and not force:
+            return
+        try:
+            self.snapshot()
+            self.snapshots += 1
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            with self._condition:
+                self.pending += pending
+            if force:
+                raise
+
+    def stop(self) -> None:
+        """Stop the background thread and take a final snapshot of pending changes."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
@@ -4,9 +4,18 @@ TransCoder LLM Provider Abstraction Layer
 Supports multiple LLM backends: Ollama (default), OpenAI, and more.
 """
 
+import asyncio
+import functools
+import inspect
 import os
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Generator, Iterator, List, Optional, Tuple, Union
+
+from transcoder.options import GenerationOptions, estimate_tokens
+from transcoder.thinking import NO_THINK_DIRECTIVE, THINK_OPEN, honours_no_think, strip_thinking
 
 _proxy_vars = ["ALL_PROXY", "all_proxy", "HTTPS_PROXY", "https_proxy", "HTTP_PROXY", "http_proxy"]
 _saved_proxy = {}
@@ -25,19 +34,206 @@ for var, value in _saved_proxy.items():
     os.environ[var] = value
 
 try:
-    from openai import OpenAI
+    from openai import AsyncOpenAI, OpenAI
 except ImportError:
     OpenAI = None
+    AsyncOpenAI = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+def is_transport_error(error: BaseException) -> bool:
+    """True for connection failures and timeouts, as opposed to errors reported by the backend."""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return httpx is not None and isinstance(error, httpx.TransportError)
+
+
+def normalize_model_name(name: Optional[str]) -> Optional[str]:
+    """Ollama treats ``name`` and ``name:latest`` as the same model."""
+    if name and ":" not in name:
+        return f"{name}:latest"
+    return name
+
+
+def _seconds(nanoseconds: Optional[int]) -> Optional[float]:
+    return nanoseconds / 1e9 if nanoseconds else None
+
+
+def _rate(tokens: Optional[int], seconds: Optional[float]) -> Optional[float]:
+    return round(tokens / seconds, 1) if tokens and seconds else None
+
+
+@dataclass
+class GenerationResult:
+    """
+    Generated text plus the token accounting reported by the backend.
+
+    Token counts come from the provider response (Ollama ``prompt_eval_count``
+    / ``eval_count``, OpenAI ``usage``); durations are in seconds and are
+    None when the backend does not report them.
+    """
+
+    text: str
+    model: Optional[str] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    prompt_duration: Optional[float] = None
+    completion_duration: Optional[float] = None
+    load_duration: Optional[float] = None
+    time_to_first_token: Optional[float] = None
+    finish_reason: Optional[str] = None
+    thinking: Optional[str] = None
+    thinking_tokens_saved: Optional[int] = None
+
+    def __str__(self) -> str:
+        return self.text
+
+    @classmethod
+    def from_ollama(cls, response: Any, text: Optional[str] = None) -> "GenerationResult":
+        """Build from an Ollama generate/chat response (or the final ``done`` stream chunk)."""
+        if text is None:
+            message = response.get("message")
+            text = message.get("content", "") if message else response.get("response", "")
+        prompt_duration = _seconds(response.get("prompt_eval_duration"))
+        load_duration = _seconds(response.get("load_duration"))
+        return cls(
+            text=text.strip(),
+            model=response.get("model"),
+            prompt_tokens=response.get("prompt_eval_count"),
+            completion_tokens=response.get("eval_count"),
+            prompt_duration=prompt_duration,
+            completion_duration=_seconds(response.get("eval_duration")),
+            load_duration=load_duration,
+            time_to_first_token=(load_duration or 0) + (prompt_duration or 0) or None,
+            finish_reason=response.get("done_reason"),
+            thinking=response.get("thinking") or None,
+        )
+
+    @classmethod
+    def from_openai(
+        cls, usage: Any, text: str, model: Optional[str] = None, finish_reason: Optional[str] = None
+    ) -> "GenerationResult":
+        """Build from an OpenAI ``usage`` object; durations are not reported by the API."""
+        return cls(
+            text=(text or "").strip(),
+            model=model,
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+            finish_reason=finish_reason,
+        )
+
+    @property
+    def thinking_tokens(self) -> int:
+        """Estimated tokens spent on reasoning, whether inline ``<think>`` or reported separately."""
+        inline = strip_thinking(self.text)[1] if THINK_OPEN in self.text else ""
+        return estimate_tokens(inline + (self.thinking or ""))
+
+    @property
+    def truncated(self) -> bool:
+        """Whether generation stopped at the output token limit rather than finishing."""
+        return self.finish_reason == "length"
+
+    @property
+    def prefill_tokens_per_second(self) -> Optional[float]:
+        """Prompt processing throughput."""
+        return _rate(self.prompt_tokens, self.prompt_duration)
+
+    @property
+    def decode_tokens_per_second(self) -> Optional[float]:
+        """Output generation throughput."""
+        return _rate(self.completion_tokens, self.completion_duration)
+
+    def metrics(self, elapsed: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Usage figures for ``ToolResult.metadata``.
+
+        When the backend reports no decode duration, decode throughput is
+        derived from ``elapsed`` wall time after the first token.
+        """
+        decode = self.decode_tokens_per_second
+        if decode is None and elapsed:
+            decode = _rate(self.completion_tokens, elapsed - (self.time_to_first_token or 0))
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "prefill_tokens_per_second": self.prefill_tokens_per_second,
+            "decode_tokens_per_second": decode,
+            "time_to_first_token": round(self.time_to_first_token, 3) if self.time_to_first_token else None,
+            "load_time": round(self.load_duration, 3) if self.load_duration else None,
+            "finish_reason": self.finish_reason,
+            "truncated": self.truncated,
+            "thinking_tokens": self.thinking_tokens,
+            "thinking_tokens_saved": self.thinking_tokens_saved,
+        }
+
+
+def as_generation_result(value: Union[str, GenerationResult]) -> GenerationResult:
+    """Accept plain strings from providers that predate :class:`GenerationResult`."""
+    if isinstance(value, GenerationResult):
+        return value
+    return GenerationResult(text=value)
+
+
+class GenerationStream:
+    """
+    Iterator over generated text deltas.
+
+    Wraps a generator that yields deltas and returns a
+    :class:`GenerationResult`; once exhausted, that result (with usage
+    reported by the backend) is available as :attr:`result`.
+    """
+
+    def __init__(self, deltas: Generator[str, None, Optional[GenerationResult]]):
+        self._deltas = deltas
+        self.result: Optional[GenerationResult] = None
+
+    def __iter__(self) -> "GenerationStream":
+        return self
+
+    def __next__(self) -> str:
+        try:
+            return next(self._deltas)
+        except StopIteration as stop:
+            self.result = stop.value
+            raise
+
+    def close(self) -> None:
+        self._deltas.close()
 
 
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
 
     @abstractmethod
-    def generate(self, prompt: str, model: Optional[str] = None) -> str:
+    def generate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
         """Generate text from prompt."""
         pass
 
+    def generate_stream(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> Iterator[str]:
+        """
+        Yield generated text deltas as they are produced.
+
+        Providers without native streaming yield the full response once.
+        Implementations return a :class:`GenerationStream` so callers can
+        read usage once the stream is exhausted.
+        """
+        return GenerationStream(self._single_delta(prompt, model, options))
+
+    def _single_delta(
+        self, prompt: str, model: Optional[str], options: Optional[GenerationOptions]
+    ) -> Generator[str, None, GenerationResult]:
+        result = as_generation_result(self.generate(prompt, model=model, options=options))
+        yield result.text
+        return result
+
     @abstractmethod
     def get_available_models(self) -> List[str]:
         """Get list of available models."""
@@ -48,9 +244,76 @@ class LLMProvider(ABC):
         """Check if provider is available."""
         pass
 
+    @property
+    def parallelism(self) -> int:
+        """Number of generations the backend can serve concurrently."""
+        return 1
+
+
+class AsyncLLMProvider(ABC):
+    """
+    Abstract base class for asyncio-native LLM providers.
+
+    Implementations keep a pooled async HTTP client per event loop so a
+    single process can hold many generations in flight without a thread
+    per call.
+    """
+
+    @abstractmethod
+    async def agenerate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
+        """Generate text from prompt."""
+        pass
+
+    @abstractmethod
+    def astream(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> AsyncIterator[str]:
+        """Yield generated text deltas as they are produced."""
+        pass
+
+    @abstractmethod
+    async def aget_available_models(self) -> List[str]:
+        """Get list of available models."""
+        pass
+
+    async def aclose(self) -> None:  # noqa: B027 - optional hook; nothing to close without a pooled client
+        """Release pooled connections held by the async client."""
+
+
+class _LoopBoundClient:
+    """Holds one async client per event loop; httpx pools cannot cross loops."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._loop = None
+        self._client = None
+
+    def get(self) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = self._factory()
+            self._loop = loop
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            close = getattr(self._client, "close", None) or getattr(self._client, "aclose", None)
+            if close is not None:
+                await close()
+        self._client = None
+        self._loop = None
+
 
-class OllamaProvider(LLMProvider):
-    """Ollama LLM provider (default, local)."""
+class OllamaProvider(LLMProvider, AsyncLLMProvider):
+    """
+    Ollama LLM provider (default, local).
+
+    Each provider owns long-lived sync and async clients with a keep-alive
+    connection pool sized to ``pool_size`` (default: twice the parallelism),
+    so providers pointing at different hosts never share global state.
+    """
 
     def __init__(
         self,
@@ -58,43 +321,139 @@ class OllamaProvider(LLMProvider):
         default_model: str = "qwen3:0.6b",
         use_proxy: bool = False,
         proxy_url: Optional[str] = None,
+        parallelism: Optional[int] = None,
+        pool_size: Optional[int] = None,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 300.0,
+        keep_alive: Optional[Union[str, float]] = None,
     ):
         self.host = host
         self.default_model = default_model
         self.use_proxy = use_proxy
         self.proxy_url = proxy_url
+        self._parallelism = parallelism or int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
+        self.pool_size = pool_size or self._parallelism * 2
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.keep_alive = keep_alive
+        self.model_keep_alive: Dict[str, Union[str, float]] = {}
+        self._client = None
+        self._async_client = _LoopBoundClient(self._create_async_client)
 
-        if ollama:
-            if use_proxy and proxy_url:
-                for var in _proxy_vars:
-                    if var in os.environ:
-                        del os.environ[var]
-                if proxy_url.startswith("socks://"):
-                    proxy_url = proxy_url.replace("socks://", "socks5://")
-                os.environ["HTTPS_PROXY"] = proxy_url
-                os.environ["HTTP_PROXY"] = proxy_url
-            elif not use_proxy:
-                for var in _proxy_vars:
-                    if var in os.environ:
-                        del os.environ[var]
-
-            ollama.host = host
-
-    def generate(self, prompt: str, model: Optional[str] = None) -> str:
-        """Generate text using Ollama."""
+    @property
+    def parallelism(self) -> int:
+        """Concurrent generations served by the Ollama host (OLLAMA_NUM_PARALLEL)."""
+        return self._parallelism
+
+    def _request_kwargs(self, model: str, options: Optional[GenerationOptions] = None) -> dict:
+        """Per-request options; ``keep_alive`` must be resent on every call or Ollama reverts to its default."""
+        kwargs: dict = {}
+        keep_alive = self.model_keep_alive.get(normalize_model_name(model), self.keep_alive)
+        if keep_alive is not None:
+            kwargs["keep_alive"] = keep_alive
+        if options is not None and options.to_ollama():
+            kwargs["options"] = options.to_ollama()
+        if options is not None and options.think is not None:
+            kwargs["think"] = options.think
+        if options is not None and options.json_schema is not None:
+            kwargs["format"] = options.json_schema
+        return kwargs
+
+    def _client_kwargs(self) -> dict:
+        """httpx settings shared by the sync and async clients."""
+        kwargs: dict = {}
+        if httpx is not None:
+            kwargs["timeout"] = httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+            kwargs["limits"] = httpx.Limits(
+                max_connections=self.pool_size, max_keepalive_connections=self.pool_size, keepalive_expiry=60.0
+            )
+
+        if self.use_proxy and self.proxy_url:
+            proxy_url = self.proxy_url
+            if proxy_url.startswith("socks://"):
+                proxy_url = proxy_url.replace("socks://", "socks5://")
+            kwargs["proxy"] = proxy_url
+        else:
+            # Ignore proxy environment variables so local hosts are reached directly.
+            kwargs["trust_env"] = False
+
+        return kwargs
+
+    @property
+    def client(self):
+        """Lazy-loaded pooled Ollama client."""
         if ollama is None:
             raise ImportError("ollama package not installed. Run: pip install ollama")
 
+        if self._client is None:
+            self._client = ollama.Client(host=self.host, **self._client_kwargs())
+
+        return self._client
+
+    def generate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
+        """Generate text using Ollama."""
+        model = model or self.default_model
+        response = self.client.generate(model=model, prompt=prompt, **self._request_kwargs(model, options))
+        return GenerationResult.from_ollama(response)
+
+    def generate_stream(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationStream:
+        """Stream response deltas from Ollama; usage comes from the final ``done`` chunk."""
         model = model or self.default_model
-        response = ollama.generate(model=model, prompt=prompt)
-        return response.get("response", "").strip()
+        return GenerationStream(self._stream(model, prompt, options))
+
+    def _stream(
+        self, model: str, prompt: str, options: Optional[GenerationOptions]
+    ) -> Generator[str, None, GenerationResult]:
+        start_time = time.time()
+        first_token_time = None
+        deltas = []
+        thinking = []
+        result = None
+        kwargs = self._request_kwargs(model, options)
+        for chunk in self.client.generate(model=model, prompt=prompt, stream=True, **kwargs):
+            thinking.append(chunk.get("thinking") or "")
+            delta = chunk.get("response", "")
+            if delta:
+                if first_token_time is None:
+                    first_token_time = time.time() - start_time
+                deltas.append(delta)
+                yield delta
+            if chunk.get("done"):
+                result = GenerationResult.from_ollama(chunk, text="".join(deltas))
+
+        result = result or GenerationResult(text="".join(deltas).strip(), model=model)
+        result.thinking = "".join(thinking) or None
+        result.time_to_first_token = first_token_time
+        return result
+
+    def load(self, model: Optional[str] = None) -> GenerationResult:
+        """Load ``model`` into memory without generating; ``load_duration`` reports the cost."""
+        model = model or self.default_model
+        response = self.client.generate(model=model, prompt="", **self._request_kwargs(model))
+        return GenerationResult.from_ollama(response)
+
+    def running_models(self) -> List[Dict[str, Any]]:
+        """Models currently loaded on the host (``/api/ps``)."""
+        models = self.client.ps().get("models", [])
+        return [
+            {
+                "model": normalize_model_name(m.get("model") or m.get("name")),
+                "size_vram": m.get("size_vram"),
+                "expires_at": str(m["expires_at"]) if m.get("expires_at") else None,
+            }
+            for m in models
+        ]
 
     def get_available_models(self) -> List[str]:
         """Get list of available Ollama models."""
         if ollama is None:
             return []
         try:
-            models = ollama.list()
+            models = self.client.list()
             return [m["model"] for m in models.get("models", [])]
         except Exception:
             return []
@@ -104,22 +463,81 @@ class OllamaProvider(LLMProvider):
         if ollama is None:
             return False
         try:
-            ollama.list()
+            self.client.list()
             return True
         except Exception:
             return False
 
+    def _create_async_client(self):
+        """Create a pooled ollama.AsyncClient bound to this provider's host."""
+        return ollama.AsyncClient(host=self.host, **self._client_kwargs())
+
+    @property
+    def async_client(self):
+        """Async Ollama client for the running event loop."""
+        if ollama is None:
+            raise ImportError("ollama package not installed. Run: pip install ollama")
+        return self._async_client.get()
+
+    async def agenerate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
+        """Generate text using Ollama without blocking the event loop."""
+        model = model or self.default_model
+        response = await self.async_client.generate(
+            model=model, prompt=prompt, **self._request_kwargs(model, options)
+        )
+        return GenerationResult.from_ollama(response)
+
+    async def astream(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> AsyncIterator[str]:
+        """Stream response deltas from Ollama."""
+        model = model or self.default_model
+        stream = await self.async_client.generate(
+            model=model, prompt=prompt, stream=True, **self._request_kwargs(model, options)
+        )
+        async for chunk in stream:
+            delta = chunk.get("response", "")
+            if delta:
+                yield delta
 
-class OpenAIProvider(LLMProvider):
+    async def aget_available_models(self) -> List[str]:
+        """Get list of available Ollama models."""
+        if ollama is None:
+            return []
+        try:
+            models = await self.async_client.list()
+            return [m["model"] for m in models.get("models", [])]
+        except Exception:
+            return []
+
+    async def aclose(self) -> None:
+        """Close the pooled async client."""
+        await self._async_client.close()
+
+
+class OpenAIProvider(LLMProvider, AsyncLLMProvider):
     """OpenAI API provider."""
 
     def __init__(
-        self, api_key: Optional[str] = None, base_url: Optional[str] = None, default_model: str = "gpt-4o-mini"
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        default_model: str = "gpt-4o-mini",
+        parallelism: int = 8,
     ):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.base_url = base_url or os.getenv("OPENAI_BASE_URL")
         self.default_model = default_model
+        self._parallelism = parallelism
         self._client = None
+        self._async_client = _LoopBoundClient(self._create_async_client)
+
+    @property
+    def parallelism(self) -> int:
+        """Concurrent requests issued against the API."""
+        return self._parallelism
 
     @property
     def client(self):
@@ -141,15 +559,77 @@ class OpenAIProvider(LLMProvider):
 
         return self._client
 
-    def generate(self, prompt: str, model: Optional[str] = None) -> str:
+    @staticmethod
+    def _messages(prompt: str, options: Optional[GenerationOptions], model: Optional[str]) -> List[dict]:
+        """
+        Chat messages. There is no think flag, so thinking is turned off with
+        the prompt switch, sent only to models that understand it.
+        """
+        if options is not None and options.think is False and honours_no_think(model):
+            prompt = f"{prompt}\n{NO_THINK_DIRECTIVE}"
+        return [{"role": "user", "content": prompt}]
+
+    @staticmethod
+    def _completion_kwargs(options: Optional[GenerationOptions]) -> dict:
+        """Sampling arguments; translation defaults to a low temperature unless overridden."""
+        kwargs: dict = {"temperature": 0.3}
+        if options is not None:
+            kwargs.update(options.to_openai())
+            if options.json_schema is not None:
+                kwargs["response_format"] = {"type": "json_object"}
+        return kwargs
+
+    def generate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
         """Generate text using OpenAI API."""
         model = model or self.default_model
 
         response = self.client.chat.completions.create(
-            model=model, messages=[{"role": "user", "content": prompt}], temperature=0.3
+            model=model, messages=self._messages(prompt, options, model), **self._completion_kwargs(options)
+        )
+
+        choice = response.choices[0]
+        return GenerationResult.from_openai(
+            response.usage, choice.message.content, model=model, finish_reason=choice.finish_reason
+        )
+
+    def generate_stream(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationStream:
+        """Stream response deltas from the OpenAI API; usage arrives in the final event."""
+        model = model or self.default_model
+        return GenerationStream(self._stream(model, prompt, options))
+
+    def _stream(
+        self, model: str, prompt: str, options: Optional[GenerationOptions]
+    ) -> Generator[str, None, GenerationResult]:
+        start_time = time.time()
+        first_token_time = None
+        deltas = []
+        usage = None
+        finish_reason = None
+        stream = self.client.chat.completions.create(
+            model=model,
+            messages=self._messages(prompt, options, model),
+            stream=True,
+            stream_options={"include_usage": True},
+            **self._completion_kwargs(options),
         )
+        for event in stream:
+            if event.choices and event.choices[0].delta.content:
+                if first_token_time is None:
+                    first_token_time = time.time() - start_time
+                deltas.append(event.choices[0].delta.content)
+                yield event.choices[0].delta.content
+            if event.choices and event.choices[0].finish_reason:
+                finish_reason = event.choices[0].finish_reason
+            if getattr(event, "usage", None) is not None:
+                usage = event.usage
 
-        return response.choices[0].message.content.strip()
+        result = GenerationResult.from_openai(usage, "".join(deltas), model=model, finish_reason=finish_reason)
+        result.time_to_first_token = first_token_time
+        return result
 
     def get_available_models(self) -> List[str]:
         """Get list of available OpenAI models."""
@@ -172,6 +652,708 @@ class OpenAIProvider(LLMProvider):
         except Exception:
             return False
 
+    def _create_async_client(self):
+        """Create a pooled AsyncOpenAI client."""
+        if not self.api_key:
+            raise ValueError(
+                "OpenAI API key required. Set OPENAI_API_KEY environment variable or pass api_key parameter."
+            )
+
+        client_kwargs = {"api_key": self.api_key}
+        if self.base_url:
+            client_kwargs["base_url"] = self.base_url
+        if httpx is not None:
+            client_kwargs["http_client"] = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self._parallelism * 4, max_keepalive_connections=self._parallelism)
+            )
+
+        return AsyncOpenAI(**client_kwargs)
+
+    @property
+    def async_client(self):
+        """AsyncOpenAI client for the running event loop."""
+        if AsyncOpenAI is None:
+            raise ImportError("openai package not installed. Run: pip install openai")
+        return self._async_client.get()
+
+    async def agenerate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
+        """Generate text using the OpenAI API without blocking the event loop."""
+        model = model or self.default_model
+
+        response = await self.async_client.chat.completions.create(
+            model=model, messages=self._messages(prompt, options, model), **self._completion_kwargs(options)
+        )
+
+        choice = response.choices[0]
+        return GenerationResult.from_openai(
+            response.usage, choice.message.content, model=model, finish_reason=choice.finish_reason
+        )
+
+    async def astream(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> AsyncIterator[str]:
+        """Stream response deltas from the OpenAI API."""
+        model = model or self.default_model
+
+        stream = await self.async_client.chat.completions.create(
+            model=model,
+            messages=self._messages(prompt, options, model),
+            stream=True,
+            **self._completion_kwargs(options),
+        )
+        async for event in stream:
+            if event.choices and event.choices[0].delta.content:
+                yield event.choices[0].delta.content
+
+    async def aget_available_models(self) -> List[str]:
+        """Get list of available OpenAI models."""
+        if not self.api_key:
+            return []
+
+        try:
+            models_response = await self.async_client.models.list()
+            return sorted([m.id for m in models_response.data if "gpt" in m.id.lower()])
+        except Exception:
+            return ["gpt-4o", "gpt-4o-mini", "gpt-4-turbo", "gpt-4", "gpt-3.5-turbo"]
+
+    async def aclose(self) -> None:
+        """Close the pooled async client."""
+        await self._async_client.close()
+
+
+class _PooledHost:
+    """Routing state for one Ollama host in an :class:`OllamaPoolProvider`."""
+
+    def __init__(self, provider: OllamaProvider):
+        self.provider = provider
+        self.outstanding = 0
+        self.healthy = True
+        self.resident: set = set()
+        self.last_error: Optional[str] = None
+
+    def load(self) -> float:
+        return self.outstanding / max(1, self.provider.parallelism)
+
+
+class OllamaPoolProvider(LLMProvider, AsyncLLMProvider):
+    """
+    Load-balance generations across several Ollama hosts.
+
+    Each request goes to the host with the fewest outstanding requests
+    relative to its parallelism, preferring healthy hosts that already have
+    the requested model loaded (as reported by ``/api/ps``) while they have
+    free slots. A background thread refreshes health and residency every
+    ``health_interval`` seconds; a host that fails a request is marked
+    unhealthy until the next successful check.
+
+    Usage:
+        provider = OllamaPoolProvider(["http://gpu1:11434", "http://gpu2:11434"], default_model="qwen3:0.6b")
+    """
+
+    def __init__(
+        self,
+        hosts: List[str],
+        default_model: str = "qwen3:0.6b",
+        health_interval: Optional[float] = 10.0,
+        **host_kwargs: Any,
+    ):
+        """
+        Args:
+            hosts: Ollama base URLs
+            default_model: Model used when a request names none
+            health_interval: Seconds between health/residency checks (None disables the checker)
+            **host_kwargs: Passed to each :class:`OllamaProvider` (use_proxy, parallelism, timeouts, ...)
+        """
+        if not hosts:
+            raise ValueError("OllamaPoolProvider needs at least one host")
+
+        self.default_model = default_model
+        self.health_interval = health_interval
+        self.hosts = [
+            _PooledHost(OllamaProvider(host=host, default_model=default_model, **host_kwargs)) for host in hosts
+        ]
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._checker: Optional[threading.Thread] = None
+
+    @property
+    def parallelism(self) -> int:
+        """Combined parallelism of every host."""
+        return sum(host.provider.parallelism for host in self.hosts)
+
+    def refresh(self) -> None:
+        """Check every host's health and which models it has loaded."""
+        for host in self.hosts:
+            try:
+                resident = {m["model"] for m in host.provider.running_models()}
+                with self._lock:
+                    host.resident = resident
+                    host.healthy = True
+                    host.last_error = None
+            except Exception as e:
+                with self._lock:
+                    host.healthy = False
+                    host.last_error = str(e)
+
+    def _ensure_checker(self) -> None:
+        if self.health_interval and self._checker is None:
+            with self._lock:
+                if self._checker is not None:
+                    return
+                self._checker = threading.Thread(target=self._check_loop, name="transcoder-ollama-health", daemon=True)
+            self._checker.start()
+
+    def _check_loop(self) -> None:
+        while not self._stopped.is_set():
+            self.refresh()
+            self._stopped.wait(self.health_interval)
+
+    def close(self) -> None:
+        """Stop the background health checker."""
+        self._stopped.set()
+
+    def _acquire(self, model: str) -> _PooledHost:
+        """Pick a host for ``model`` and count the request against it."""
+        self._ensure_checker()
+        key = normalize_model_name(model)
+        with self._lock:
+            candidates = [host for host in self.hosts if host.healthy] or self.hosts
+            host = min(
+                candidates,
+                key=lambda h: (h.outstanding >= h.provider.parallelism, key not in h.resident, h.load()),
+            )
+            host.outstanding += 1
+            return host
+
+    def _release(self, host: _PooledHost, model: str, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            host.outstanding -= 1
+            if error is None:
+                # The host has the model loaded now, whatever /api/ps said before.
+                host.resident.add(normalize_model_name(model))
+            elif is_transport_error(error):
+                host.healthy = False
+                host.last_error = str(error)
+
+    def generate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
+        """Generate on the least-loaded suitable host."""
+        model = model or self.default_model
+        host = self._acquire(model)
+        try:
+            result = host.provider.generate(prompt, model=model, options=options)
+        except Exception as e:
+            self._release(host, model, e)
+            raise
+        self._release(host, model)
+        return result
+
+    def generate_stream(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationStream:
+        """Stream from the least-loaded suitable host; the slot is held until the stream ends."""
+        model = model or self.default_model
+        return GenerationStream(self._stream(prompt, model, options))
+
+    def _stream(
+        self, prompt: str, model: str, options: Optional[GenerationOptions]
+    ) -> Generator[str, None, Optional[GenerationResult]]:
+        host = self._acquire(model)
+        error = None
+        try:
+            stream = host.provider.generate_stream(prompt, model=model, options=options)
+            yield from stream
+            return getattr(stream, "result", None)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._release(host, model, error)
+
+    async def agenerate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
+        """Generate on the least-loaded suitable host without blocking the event loop."""
+        model = model or self.default_model
+        host = self._acquire(model)
+        try:
+            result = await host.provider.agenerate(prompt, model=model, options=options)
+        except Exception as e:
+            self._release(host, model, e)
+            raise
+        self._release(host, model)
+        return result
+
+    async def astream(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> AsyncIterator[str]:
+        """Stream from the least-loaded suitable host."""
+        model = model or self.default_model
+        host = self._acquire(model)
+        error = None
+        try:
+            async for delta in host.provider.astream(prompt, model=model, options=options):
+                yield delta
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._release(host, model, error)
+
+    def get_available_models(self) -> List[str]:
+        """Models available on any host."""
+        models: List[str] = []
+        for host in self.hosts:
+            models.extend(m for m in host.provider.get_available_models() if m not in models)
+        return models
+
+    async def aget_available_models(self) -> List[str]:
+        """Models available on any host."""
+        models: List[str] = []
+        for host in self.hosts:
+            models.extend(m for m in await host.provider.aget_available_models() if m not in models)
+        return models
+
+    def is_available(self) -> bool:
+        """True when at least one host responds."""
+        return any(host.provider.is_available() for host in self.hosts)
+
+    async def aclose(self) -> None:
+        """Close every host's pooled async client and stop the health checker."""
+        self.close()
+        for host in self.hosts:
+            await host.provider.aclose()
+
+    def host_status(self) -> List[Dict[str, Any]]:
+        """Per-host health, load and resident models."""
+        with self._lock:
+            return [
+                {
+                    "host": host.provider.host,
+                    "healthy": host.healthy,
+                    "outstanding": host.outstanding,
+                    "parallelism": host.provider.parallelism,
+                    "resident_models": sorted(host.resident),
+                    "last_error": host.last_error,
+                }
+                for host in self.hosts
+            ]
+
+
+class ProviderWrapper(LLMProvider, AsyncLLMProvider):
+    """
+    Base class for providers that add behaviour around another provider.
+
+    Everything not overridden is delegated to the wrapped provider. The
+    async methods await the wrapped provider when it is asyncio-native (see
+    :func:`is_async_provider`) and run its blocking methods in the default
+    executor otherwise.
+    """
+
+    def __init__(self, provider: LLMProvider):
+        self.provider = provider
+
+    @property
+    def default_model(self) -> Optional[str]:
+        """Default model of the wrapped provider."""
+        return getattr(self.provider, "default_model", None)
+
+    @property
+    def parallelism(self) -> int:
+        return self.provider.parallelism
+
+    def generate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
+        return self.provider.generate(prompt, model=model, options=options)
+
+    def generate_stream(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> Iterator[str]:
+        return self.provider.generate_stream(prompt, model=model, options=options)
+
+    def get_available_models(self) -> List[str]:
+        return self.provider.get_available_models()
+
+    def is_available(self) -> bool:
+        return self.provider.is_available()
+
+    async def agenerate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
+        return await agenerate_with(self.provider, prompt, model, options)
+
+    def astream(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> AsyncIterator[str]:
+        return astream_with(self.provider, prompt, model, options)
+
+    async def aget_available_models(self) -> List[str]:
+        if is_async_provider(self.provider):
+            return await self.provider.aget_available_models()
+        return await _run_blocking(self.provider.get_available_models)
+
+    async def aclose(self) -> None:
+        if is_async_provider(self.provider):
+            await self.provider.aclose()
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes not found on the wrapper itself.
+        if name == "provider":
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+
+def is_async_provider(provider: LLMProvider) -> bool:
+    """True if the provider, or the one at the bottom of a chain of wrappers, is asyncio-native."""
+    while isinstance(provider, ProviderWrapper):
+        provider = provider.provider
+    return isinstance(provider, AsyncLLMProvider)
+
+
+async def _run_blocking(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking call in the default executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+_EXHAUSTED = object()
+
+
+async def _aiterate_blocking(open_stream: Callable[[], Iterator[str]]) -> AsyncIterator[str]:
+    """Relay a blocking stream through the default executor, one delta at a time."""
+    loop = asyncio.get_running_loop()
+    stream = iter(await loop.run_in_executor(None, open_stream))
+    pending = None
+    try:
+        while True:
+            # Shielded so a cancelled caller never closes the stream while a worker is inside next().
+            pending = loop.run_in_executor(None, next, stream, _EXHAUSTED)
+            delta = await asyncio.shield(pending)
+            if delta is _EXHAUSTED:
+                return
+            yield delta
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            if pending is None or pending.done():
+                close()
+            else:
+                pending.add_done_callback(lambda _: close())
+
+
+async def aclose_stream(stream: AsyncIterator[str]) -> None:
+    """Close an async stream early so the provider releases its request (and any scheduler slot)."""
+    close = getattr(stream, "aclose", None)
+    if close is not None:
+        await close()
+
+
+async def agenerate_with(
+    provider: LLMProvider, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+) -> GenerationResult:
+    """Await ``provider.agenerate`` when it is asyncio-native, else run ``generate`` in the default executor."""
+    if is_async_provider(provider):
+        return await provider.agenerate(prompt, model=model, options=options)
+    return await _run_blocking(provider.generate, prompt, model=model, options=options)
+
+
+def astream_with(
+    provider: LLMProvider, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+) -> AsyncIterator[str]:
+    """``provider.astream`` when it is asyncio-native, else its blocking stream relayed through the executor."""
+    if is_async_provider(provider):
+        return provider.astream(prompt, model=model, options=options)
+    return _aiterate_blocking(functools.partial(provider.generate_stream, prompt, model=model, options=options))
+
+
+def accepts_options(method: Callable) -> bool:
+    """True if a provider method takes the ``options`` argument (or ``**kwargs``)."""
+    try:
+        parameters = inspect.signature(method).parameters.values()
+    except (TypeError, ValueError):
+        return True
+    return any(parameter.name == "options" or parameter.kind is parameter.VAR_KEYWORD for parameter in parameters)
+
+
+class LegacyProviderAdapter(ProviderWrapper):
+    """
+    Adapt a provider written to the original ``generate(prompt, model)`` contract.
+
+    Generation options (output caps, thinking switches, sampling settings)
+    are dropped for the methods that do not accept them. Use :meth:`wrap`,
+    which leaves providers that take options untouched.
+    """
+
+    @classmethod
+    def wrap(cls, provider: LLMProvider) -> LLMProvider:
+        return provider if accepts_options(provider.generate) else cls(provider)
+
+    def generate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
+        return self.provider.generate(prompt, model=model)
+
+    def generate_stream(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> Iterator[str]:
+        if getattr(type(self.provider), "generate_stream", None) in (None, LLMProvider.generate_stream):
+            # The inherited default would call generate() with options; use ours instead.
+            return GenerationStream(self._single_delta(prompt, model, options))
+        if accepts_options(self.provider.generate_stream):
+            return self.provider.generate_stream(prompt, model=model, options=options)
+        return self.provider.generate_stream(prompt, model=model)
+
+    async def agenerate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
+        if not is_async_provider(self.provider):
+            return await _run_blocking(self.generate, prompt, model, options)
+        if accepts_options(self.provider.agenerate):
+            return await self.provider.agenerate(prompt, model=model, options=options)
+        return await self.provider.agenerate(prompt, model=model)
+
+    def astream(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> AsyncIterator[str]:
+        if not is_async_provider(self.provider):
+            return _aiterate_blocking(functools.partial(self.generate_stream, prompt, model, options))
+        if accepts_options(self.provider.astream):
+            return self.provider.astream(prompt, model=model, options=options)
+        return self.provider.astream(prompt, model=model)
+
+
+def find_wrapper(provider: LLMProvider, wrapper_type: type) -> Optional[LLMProvider]:
+    """Return the first ``wrapper_type`` in a chain of provider wrappers, if any."""
+    while provider is not None:
+        if isinstance(provider, wrapper_type):
+            return provider
+        provider = provider.provider if isinstance(provider, ProviderWrapper) else None
+    return None
+
+
+class _Flight:
+    """A single in-flight generation shared by every identical caller."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[GenerationResult] = None
+        self.error: Optional[BaseException] = None
+
+
+class _StreamFlight:
+    """A single in-flight stream; chunks are buffered so late callers can replay them."""
+
+    def __init__(self):
+        self.subscribers = 0
+        self.chunks: List[str] = []
+        self.done = False
+        self.result: Optional[GenerationResult] = None
+        self.error: Optional[BaseException] = None
+        self.condition = threading.Condition()
+
+    def follow(self) -> Generator[str, None, Optional[GenerationResult]]:
+        index = 0
+        while True:
+            with self.condition:
+                while index >= len(self.chunks) and not self.done:
+                    self.condition.wait()
+                pending = self.chunks[index:]
+                finished = self.done
+            for chunk in pending:
+                yield chunk
+            index += len(pending)
+            if finished and index >= len(self.chunks):
+                if self.error is not None:
+                    raise self.error
+                return self.result
+
+
+class _Subscription(GenerationStream):
+    """One caller's view of a shared stream; it leaves the flight when closed, even before its first chunk."""
+
+    def __init__(self, flight: _StreamFlight, lock: threading.Lock):
+        self._flight = flight
+        self._lock = lock
+        self._left = False
+        super().__init__(self._follow())
+
+    def _follow(self) -> Generator[str, None, Optional[GenerationResult]]:
+        try:
+            return (yield from self._flight.follow())
+        finally:
+            self._leave()
+
+    def _leave(self) -> None:
+        with self._lock:
+            if not self._left:
+                self._left = True
+                self._flight.subscribers -= 1
+
+    def close(self) -> None:
+        # Closing a generator that never started skips its finally block, so leave explicitly.
+        super().close()
+        self._leave()
+
+
+class _AsyncFlight:
+    """An in-flight asyncio generation and the number of callers awaiting it."""
+
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlightProvider(ProviderWrapper):
+    """
+    Coalesce concurrent identical requests into one generation.
+
+    Calls with the same prompt and model that overlap in time share the
+    first caller's in-flight generation and all receive its result.
+    Streaming callers attach to an in-progress stream, replaying the chunks
+    produced so far before following live output; once every caller has
+    closed its stream, the upstream stream is closed too. Results are not
+    kept once the flight lands; use a result cache for that.
+
+    :meth:`agenerate` coalesces callers on the same event loop and cancels
+    the shared generation once every caller has been cancelled;
+    :meth:`astream` is not coalesced.
+    """
+
+    def __init__(self, provider: LLMProvider):
+        super().__init__(provider)
+        self._lock = threading.Lock()
+        self._flights: Dict[Tuple, _Flight] = {}
+        self._streams: Dict[Tuple, _StreamFlight] = {}
+        self._aflights: Dict[Tuple, _AsyncFlight] = {}
+        self.coalesced = 0
+
+    def _key(self, prompt: str, model: Optional[str], options: Optional[GenerationOptions]) -> Tuple:
+        settings = tuple(sorted((k, repr(v)) for k, v in options.to_dict().items())) if options else ()
+        return (model or self.default_model, prompt, settings)
+
+    def generate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
+        """Generate text, joining an identical in-flight request if there is one."""
+        key = self._key(prompt, model, options)
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self.provider.generate(prompt, model=model, options=options)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def agenerate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
+        """Asyncio counterpart of :meth:`generate`."""
+        loop = asyncio.get_running_loop()
+        key = (loop,) + self._key(prompt, model, options)
+        with self._lock:
+            flight = self._aflights.get(key)
+            if flight is None:
+                flight = self._aflights[key] = _AsyncFlight(
+                    loop.create_task(agenerate_with(self.provider, prompt, model, options))
+                )
+                flight.task.add_done_callback(lambda _: self._land(key, flight))
+            else:
+                self.coalesced += 1
+            flight.waiters += 1
+
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            with self._lock:
+                flight.waiters -= 1
+                abandoned = flight.waiters == 0 and not flight.task.done()
+            if abandoned:
+                # Every caller was cancelled; cancel the upstream request and let new callers start afresh.
+                self._land(key, flight)
+                flight.task.cancel()
+
+    def _land(self, key: Tuple, flight: _AsyncFlight) -> None:
+        with self._lock:
+            if self._aflights.get(key) is flight:
+                del self._aflights[key]
+
+    def generate_stream(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationStream:
+        """Stream text, attaching to an identical in-progress stream if there is one."""
+        key = self._key(prompt, model, options)
+        with self._lock:
+            flight = self._streams.get(key)
+            if flight is None:
+                flight = self._streams[key] = _StreamFlight()
+                threading.Thread(
+                    target=self._pump,
+                    args=(key, flight, prompt, model, options),
+                    name="transcoder-singleflight",
+                    daemon=True,
+                ).start()
+            else:
+                self.coalesced += 1
+            flight.subscribers += 1
+
+        return _Subscription(flight, self._lock)
+
+    def _pump(
+        self,
+        key: Tuple,
+        flight: _StreamFlight,
+        prompt: str,
+        model: Optional[str],
+        options: Optional[GenerationOptions],
+    ) -> None:
+        """Drive the upstream stream independently of any single consumer, until none is left."""
+        stream = None
+        try:
+            stream = self.provider.generate_stream(prompt, model=model, options=options)
+            for chunk in stream:
+                with flight.condition:
+                    flight.chunks.append(chunk)
+                    flight.condition.notify_all()
+                with self._lock:
+                    if flight.subscribers == 0:
+                        # Every caller went away; stop generating and let new callers start afresh.
+                        del self._streams[key]
+                        break
+            else:
+                flight.result = getattr(stream, "result", None)
+        except BaseException as e:
+            flight.error = e
+        finally:
+            if stream is not None and hasattr(stream, "close"):
+                stream.close()
+            with self._lock:
+                if self._streams.get(key) is flight:
+                    del self._streams[key]
+            with flight.condition:
+                flight.done = True
+                flight.condition.notify_all()
+
 
 def create_provider(provider_type: str = "ollama", model: Optional[str] = None, **kwargs) -> LLMProvider:
     """
@@ -181,8 +1363,9 @@ def create_provider(provider_type: str = "ollama", model: Optional[str] = None,
         provider_type: "ollama" or "openai"
         model: Default model to use
         **kwargs: Additional provider-specific arguments
-            For Ollama: host, use_proxy, proxy_url
-            For OpenAI: api_key, base_url
+            For Ollama: host (comma-separated for several hosts) or hosts, use_proxy, proxy_url,
+                parallelism, pool_size, connect_timeout, read_timeout, health_interval
+            For OpenAI: api_key, base_url, parallelism
 
     Returns:
         LLMProvider instance
@@ -190,16 +1373,38 @@ def create_provider(provider_type: str = "ollama", model: Optional[str] = None,
     provider_type = provider_type.lower()
 
     if provider_type == "ollama":
+        hosts = kwargs.get("hosts") or kwargs.get("host", "http://localhost:11434")
+        if isinstance(hosts, str):
+            hosts = [h.strip() for h in hosts.split(",") if h.strip()]
+        if len(hosts) > 1:
+            return OllamaPoolProvider(
+                hosts,
+                default_model=model or "qwen3:0.6b",
+                health_interval=kwargs.get("health_interval", 10.0),
+                use_proxy=kwargs.get("use_proxy", False),
+                proxy_url=kwargs.get("proxy_url"),
+                parallelism=kwargs.get("parallelism"),
+                pool_size=kwargs.get("pool_size"),
+                connect_timeout=kwargs.get("connect_timeout", 5.0),
+                read_timeout=kwargs.get("read_timeout", 300.0),
+            )
         return OllamaProvider(
-            host=kwargs.get("host", "http://localhost:11434"),
+            host=hosts[0],
             default_model=model or "qwen3:0.6b",
             use_proxy=kwargs.get("use_proxy", False),
             proxy_url=kwargs.get("proxy_url"),
+            parallelism=kwargs.get("parallelism"),
+            pool_size=kwargs.get("pool_size"),
+            connect_timeout=kwargs.get("connect_timeout", 5.0),
+            read_timeout=kwargs.get("read_timeout", 300.0),
         )
 
     elif provider_type == "openai":
         return OpenAIProvider(
-            api_key=kwargs.get("api_key"), base_url=kwargs.get("base_url"), default_model=model or "gpt-4o-mini"
+            api_key=kwargs.get("api_key"),
+            base_url=kwargs.get("base_url"),
+            default_model=model or "gpt-4o-mini",
+            parallelism=kwargs.get("parallelism") or 8,
         )
 
     else:
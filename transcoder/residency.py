@@ -0,0 +1,174 @@
+"""
+TransCoder Model Residency
+
+Keeps track of which Ollama models are loaded, preloads models ahead of the
+first request and applies per-model ``keep_alive`` policies.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from transcoder.providers import (
+    LLMProvider,
+    OllamaPoolProvider,
+    OllamaProvider,
+    ProviderWrapper,
+    normalize_model_name,
+)
+
+# Ollama reports a few milliseconds of load_duration even for resident models.
+_COLD_LOAD_THRESHOLD = 0.5
+
+
+def parse_keep_alive(value: str) -> Union[str, float]:
+    """Ollama accepts durations ("30m") or seconds; numeric strings are sent as numbers."""
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def parse_keep_alive_policy(spec: str) -> Dict[str, Union[str, float]]:
+    """Parse ``"model=keep_alive,..."`` (e.g. ``"qwen3:4b=5m,qwen3:0.6b=-1"``)."""
+    policy: Dict[str, Union[str, float]] = {}
+    for item in spec.split(","):
+        model, sep, value = item.strip().rpartition("=")
+        if sep and model:
+            policy[model.strip()] = parse_keep_alive(value.strip())
+    return policy
+
+
+def ollama_backends(provider: LLMProvider) -> List[OllamaProvider]:
+    """Find the Ollama providers behind any wrappers (one per host for a pool)."""
+    while isinstance(provider, ProviderWrapper):
+        provider = provider.provider
+    if isinstance(provider, OllamaPoolProvider):
+        return [host.provider for host in provider.hosts]
+    if isinstance(provider, OllamaProvider):
+        return [provider]
+    return []
+
+
+class ResidencyManager:
+    """
+    Preload models and report their residency.
+
+    Usage:
+        residency = ResidencyManager(service.provider, default_keep_alive="30m", keep_alive={"qwen3:4b": "5m"})
+        residency.preload_async("qwen3:0.6b")
+        residency.cold_start_warning("qwen3:4b")  # "Model qwen3:4b is not loaded; ..."
+
+    Residency is read from ``/api/ps`` at most every ``refresh_interval``
+    seconds. Observed cold-load times (``load_duration``) are kept per model
+    to estimate the cost of requesting a model that is not loaded. Providers
+    other than Ollama have no residency: every model is reported resident.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        keep_alive: Optional[Dict[str, Union[str, float]]] = None,
+        default_keep_alive: Optional[Union[str, float]] = None,
+        refresh_interval: float = 5.0,
+    ):
+        """
+        Args:
+            provider: Translation provider (wrappers and host pools are looked through)
+            keep_alive: Per-model keep_alive values (e.g. {"qwen3:4b": "5m"}); -1 keeps a model loaded
+            default_keep_alive: keep_alive for models without their own entry (None: Ollama's default)
+            refresh_interval: Seconds a residency snapshot is reused
+        """
+        self.backends = ollama_backends(provider)
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._resident: Dict[str, Dict[str, Any]] = {}
+        self._refreshed_at = 0.0
+        self._load_times: Dict[str, float] = {}
+
+        for backend in self.backends:
+            if default_keep_alive is not None:
+                backend.keep_alive = default_keep_alive
+            for model, value in (keep_alive or {}).items():
+                backend.model_keep_alive[normalize_model_name(model)] = value
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the provider has model residency at all."""
+        return bool(self.backends)
+
+    def refresh(self) -> Dict[str, Dict[str, Any]]:
+        """Re-read loaded models from every host."""
+        resident: Dict[str, Dict[str, Any]] = {}
+        for backend in self.backends:
+            try:
+                running = backend.running_models()
+            except Exception:
+                continue
+            for entry in running:
+                info = resident.setdefault(entry["model"], {"hosts": [], "expires_at": entry["expires_at"]})
+                info["hosts"].append(backend.host)
+        with self._lock:
+            self._resident = resident
+            self._refreshed_at = time.monotonic()
+        return resident
+
+    def resident_models(self) -> Dict[str, Dict[str, Any]]:
+        """Loaded models with their hosts and expiry, refreshed when stale."""
+        with self._lock:
+            fresh = time.monotonic() - self._refreshed_at < self.refresh_interval
+            resident = dict(self._resident)
+        return resident if fresh else self.refresh()
+
+    def is_resident(self, model: str) -> bool:
+        """Whether ``model`` is loaded on at least one host."""
+        if not self.enabled:
+            return True
+        return normalize_model_name(model) in self.resident_models()
+
+    def preload(self, model: str) -> Dict[str, Any]:
+        """Load ``model`` on every host and record how long it took."""
+        load_times = []
+        errors = []
+        for backend in self.backends:
+            try:
+                result = backend.load(model)
+                load_times.append(result.load_duration or 0.0)
+            except Exception as e:
+                errors.append(f"{backend.host}: {e}")
+        if load_times:
+            self.observe(model, max(load_times))
+        self.refresh()
+        return {"model": model, "load_time": round(max(load_times), 3) if load_times else None, "errors": errors}
+
+    def preload_async(self, model: str) -> threading.Thread:
+        """Preload in the background so startup is not blocked."""
+        thread = threading.Thread(target=self.preload, args=(model,), name="transcoder-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def observe(self, model: str, load_time: Optional[float]) -> None:
+        """Record a reported load time; only genuine cold loads update the estimate."""
+        if load_time and load_time >= _COLD_LOAD_THRESHOLD:
+            with self._lock:
+                self._load_times[normalize_model_name(model)] = load_time
+
+    def expected_load_time(self, model: str) -> Optional[float]:
+        """Last observed cold-load time for ``model``, if any."""
+        with self._lock:
+            return self._load_times.get(normalize_model_name(model))
+
+    def cold_start_warning(self, model: Optional[str]) -> Optional[str]:
+        """Warning for requests naming a model that is not loaded, else None."""
+        if not model or self.is_resident(model):
+            return None
+        expected = self.expected_load_time(model)
+        cost = f"about {expected:.1f}s" if expected else "several seconds"
+        return f"Model {model} is not loaded; the first request will include {cost} of model load time"
+
+    def get_status(self) -> Dict[str, Any]:
+        """Residency snapshot for the models endpoint."""
+        resident = self.resident_models() if self.enabled else {}
+        with self._lock:
+            load_times = {model: round(t, 3) for model, t in self._load_times.items()}
+        return {"enabled": self.enabled, "resident": resident, "load_times": load_times}
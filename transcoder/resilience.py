@@ -0,0 +1,673 @@
+"""
+TransCoder Provider Resilience
+
+Deadlines, retries with exponential backoff, hedged requests and circuit
+breaking with failover around any :class:`~transcoder.providers.LLMProvider`.
+"""
+
+import asyncio
+import queue
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Callable, Dict, Generator, Iterator, List, Optional
+
+from transcoder.options import GenerationOptions
+from transcoder.providers import (
+    GenerationResult,
+    GenerationStream,
+    LLMProvider,
+    ProviderWrapper,
+    OllamaPoolProvider,
+    aclose_stream,
+    agenerate_with,
+    astream_with,
+    is_async_provider,
+    is_transport_error,
+)
+
+try:
+    import openai
+except ImportError:
+    openai = None
+
+_TRANSIENT_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+_DONE = object()
+
+
+def _close_upstream(stream: Iterator[str]) -> None:
+    """Close a provider stream so it releases its HTTP response."""
+    close = getattr(stream, "close", None)
+    if close is None:
+        return
+    try:
+        close()
+    except ValueError:
+        # A generator still inside next() on the producer thread; the producer closes it when that returns.
+        pass
+
+
+class DeadlineExceededError(TimeoutError):
+    """A provider call did not finish within its deadline."""
+
+
+def _spans_hosts(provider: LLMProvider) -> bool:
+    """True if repeated calls to ``provider`` can land on different backends (a multi-host pool)."""
+    while isinstance(provider, ProviderWrapper):
+        provider = provider.provider
+    return isinstance(provider, OllamaPoolProvider) and len(provider.hosts) > 1
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """True for errors worth retrying: connection failures, timeouts, throttling and 5xx responses."""
+    if isinstance(error, DeadlineExceededError):
+        return False
+    if is_transport_error(error):
+        return True
+    if openai is not None and isinstance(error, openai.APIConnectionError):
+        return True
+    return getattr(error, "status_code", None) in _TRANSIENT_STATUS
+
+
+class ResilientProvider(ProviderWrapper):
+    """
+    Add deadlines, retries and hedging to a provider.
+
+    Every call gets ``deadline`` seconds in total, retries included. Transient
+    failures (see :func:`is_transient_error`) are retried up to
+    ``max_retries`` times with exponential backoff and jitter. With
+    ``hedge`` enabled, a generation still running after the observed p95
+    latency is duplicated on another backend and the first answer wins.
+    That backend is ``hedge_provider``, or by default the wrapped provider
+    when it is a multi-host :class:`~transcoder.providers.OllamaPoolProvider`,
+    which routes the duplicate to a less busy host. Hedging onto the single
+    backend that is already slow would only add load, so without either
+    there is no hedging.
+
+    Streams are retried only while no delta has been delivered, and fail
+    with :class:`DeadlineExceededError` when no delta arrives for ``deadline``
+    seconds.
+
+    Calls that overrun their deadline are abandoned, not interrupted; they
+    finish in the background bounded by the provider's own read timeout.
+
+    Usage:
+        provider = ResilientProvider(create_provider("ollama"), deadline=60, max_retries=2, hedge=True)
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        deadline: Optional[float] = 120.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        hedge: bool = False,
+        hedge_provider: Optional[LLMProvider] = None,
+        hedge_delay: Optional[float] = None,
+        hedge_min_samples: int = 20,
+        latency_window: int = 200,
+    ):
+        """
+        Args:
+            provider: Provider to wrap
+            deadline: Total seconds per call including retries (None for no deadline)
+            max_retries: Retries after the first attempt on transient errors
+            backoff_base: First backoff delay in seconds; doubles on every retry
+            backoff_max: Upper bound on a single backoff delay
+            hedge: Duplicate slow generations and take the first result
+            hedge_provider: Backend for duplicate requests (defaults to ``provider`` if it is a multi-host pool)
+            hedge_delay: Fixed hedging delay; by default the p95 of recent latencies
+            hedge_min_samples: Latency samples required before p95-based hedging starts
+            latency_window: Number of recent latencies kept for the p95 estimate
+        """
+        super().__init__(provider)
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        if hedge_provider is None and _spans_hosts(provider):
+            hedge_provider = provider
+        self.hedge_provider = hedge_provider
+        self.hedge_delay = hedge_delay
+        self.hedge_min_samples = hedge_min_samples
+        self._latencies: deque = deque(maxlen=latency_window)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(4, self.provider.parallelism * 4), thread_name_prefix="transcoder-resilience"
+        )
+        self.stats: Dict[str, int] = {"calls": 0, "retries": 0, "timeouts": 0, "hedges": 0, "hedge_wins": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    @property
+    def latency_p95(self) -> Optional[float]:
+        """95th percentile of recent successful generation latencies."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def _current_hedge_delay(self) -> Optional[float]:
+        if not self.hedge or self.hedge_provider is None:
+            return None
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        if len(self._latencies) < self.hedge_min_samples:
+            return None
+        return self.latency_p95
+
+    def _remaining(self, started: float) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return self.deadline - (time.monotonic() - started)
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2**attempt))
+        return delay * (0.5 + random.random() / 2)
+
+    def _retry_delay(self, error: Exception, attempt: int, started: float) -> Optional[float]:
+        """Backoff before retrying after ``error``, or None when it should propagate."""
+        if attempt >= self.max_retries or not is_transient_error(error):
+            return None
+        delay = self._backoff(attempt)
+        remaining = self._remaining(started)
+        if remaining is not None and delay >= remaining:
+            return None
+        self._count("retries")
+        return delay
+
+    def _attempt_budget(self, started: float) -> Optional[float]:
+        """Seconds left for the next attempt; raises once the deadline has passed."""
+        remaining = self._remaining(started)
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceededError(f"Generation exceeded its {self.deadline}s deadline")
+        return remaining
+
+    def _retrying(self, attempt_fn: Callable[[Optional[float]], Any]) -> Any:
+        """Run ``attempt_fn(remaining)`` with retries on transient errors within the deadline."""
+        started = time.monotonic()
+        self._count("calls")
+        attempt = 0
+        while True:
+            try:
+                return attempt_fn(self._attempt_budget(started))
+            except DeadlineExceededError:
+                self._count("timeouts")
+                raise
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, started)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+
+    def generate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
+        """Generate within the deadline, retrying transient failures and hedging slow calls."""
+        return self._retrying(lambda remaining: self._attempt(prompt, model, options, remaining))
+
+    def _attempt(
+        self, prompt: str, model: Optional[str], options: Optional[GenerationOptions], remaining: Optional[float]
+    ) -> GenerationResult:
+        """One (possibly hedged) attempt bounded by ``remaining`` seconds."""
+        started = time.monotonic()
+        primary = self._executor.submit(self.provider.generate, prompt, model=model, options=options)
+        futures: List[Future] = [primary]
+
+        hedge_delay = self._current_hedge_delay()
+        if hedge_delay is not None and (remaining is None or hedge_delay < remaining):
+            done, _ = wait(futures, timeout=hedge_delay)
+            if not done:
+                self._count("hedges")
+                futures.append(
+                    self._executor.submit(self.hedge_provider.generate, prompt, model=model, options=options)
+                )
+
+        error: Optional[BaseException] = None
+        while futures:
+            timeout = None if remaining is None else max(0.0, remaining - (time.monotonic() - started))
+            done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceededError(f"Generation exceeded its {self.deadline}s deadline")
+            for future in done:
+                futures.remove(future)
+                if future.exception() is None:
+                    if future is not primary:
+                        self._count("hedge_wins")
+                    with self._lock:
+                        self._latencies.append(time.monotonic() - started)
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def generate_stream(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationStream:
+        """Stream with a stall deadline, retrying transient failures that occur before the first delta."""
+        return GenerationStream(self._stream(prompt, model, options))
+
+    def _stream(
+        self, prompt: str, model: Optional[str], options: Optional[GenerationOptions]
+    ) -> Generator[str, None, Optional[GenerationResult]]:
+        started = time.monotonic()
+        self._count("calls")
+        attempt = 0
+        while True:
+            delivered = False
+            try:
+                stream = self.provider.generate_stream(prompt, model=model, options=options)
+                for delta in self._with_stall_timeout(stream):
+                    delivered = True
+                    yield delta
+                with self._lock:
+                    self._latencies.append(time.monotonic() - started)
+                return getattr(stream, "result", None)
+            except DeadlineExceededError:
+                self._count("timeouts")
+                raise
+            except Exception as e:
+                delay = None if delivered else self._retry_delay(e, attempt, started)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+
+    def _with_stall_timeout(self, stream: Iterator[str]) -> Iterator[str]:
+        """Relay deltas from a producer thread, failing if none arrives within the deadline."""
+        if self.deadline is None:
+            yield from stream
+            return
+
+        items: "queue.Queue" = queue.Queue()
+        stopped = threading.Event()
+
+        def produce() -> None:
+            try:
+                for delta in stream:
+                    if stopped.is_set():
+                        break
+                    items.put((delta, None))
+            except Exception as e:
+                items.put((None, e))
+            finally:
+                _close_upstream(stream)
+                items.put((_DONE, None))
+
+        threading.Thread(target=produce, name="transcoder-resilience-stream", daemon=True).start()
+        try:
+            while True:
+                try:
+                    delta, error = items.get(timeout=self.deadline)
+                except queue.Empty:
+                    raise DeadlineExceededError(f"No output for {self.deadline}s") from None
+                if error is not None:
+                    raise error
+                if delta is _DONE:
+                    return
+                yield delta
+        finally:
+            stopped.set()
+            _close_upstream(stream)
+
+    async def agenerate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
+        """Asyncio counterpart of :meth:`generate`; overrunning attempts are cancelled rather than abandoned."""
+        started = time.monotonic()
+        self._count("calls")
+        attempt = 0
+        while True:
+            try:
+                return await self._aattempt(prompt, model, options, self._attempt_budget(started))
+            except DeadlineExceededError:
+                self._count("timeouts")
+                raise
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, started)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def _aattempt(
+        self, prompt: str, model: Optional[str], options: Optional[GenerationOptions], remaining: Optional[float]
+    ) -> GenerationResult:
+        """Asyncio counterpart of :meth:`_attempt`."""
+        started = time.monotonic()
+        primary = asyncio.ensure_future(agenerate_with(self.provider, prompt, model, options))
+        tasks = {primary}
+        try:
+            hedge_delay = self._current_hedge_delay()
+            if hedge_delay is not None and (remaining is None or hedge_delay < remaining):
+                done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+                if not done:
+                    self._count("hedges")
+                    tasks.add(asyncio.ensure_future(agenerate_with(self.hedge_provider, prompt, model, options)))
+
+            error: Optional[BaseException] = None
+            while tasks:
+                timeout = None if remaining is None else max(0.0, remaining - (time.monotonic() - started))
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise DeadlineExceededError(f"Generation exceeded its {self.deadline}s deadline")
+                for task in done:
+                    tasks.remove(task)
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._count("hedge_wins")
+                        with self._lock:
+                            self._latencies.append(time.monotonic() - started)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def astream(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> AsyncIterator[str]:
+        """Asyncio counterpart of :meth:`generate_stream`."""
+        started = time.monotonic()
+        self._count("calls")
+        attempt = 0
+        while True:
+            delivered = False
+            stream = astream_with(self.provider, prompt, model, options)
+            try:
+                while True:
+                    try:
+                        delta = await asyncio.wait_for(stream.__anext__(), self.deadline)
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError:
+                        raise DeadlineExceededError(f"No output for {self.deadline}s") from None
+                    delivered = True
+                    yield delta
+                with self._lock:
+                    self._latencies.append(time.monotonic() - started)
+                return
+            except DeadlineExceededError:
+                self._count("timeouts")
+                raise
+            except Exception as e:
+                delay = None if delivered else self._retry_delay(e, attempt, started)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+            finally:
+                await aclose_stream(stream)
+
+
+class CircuitOpenError(RuntimeError):
+    """The primary backend's circuit is open and no fallback is configured."""
+
+
+class CircuitBreakerProvider(ProviderWrapper):
+    """
+    Fail fast on a dead backend and fail over to a fallback provider.
+
+    The circuit opens after ``failure_threshold`` consecutive failures,
+    counting transient errors, timeouts and calls slower than
+    ``latency_threshold``. While it is open, calls go straight to
+    ``fallback``, or raise :class:`CircuitOpenError` when there is none.
+    After ``recovery_timeout`` seconds the circuit half-opens and lets a
+    single probe call through to the primary. Success closes the circuit;
+    failure opens it for another ``recovery_timeout``.
+
+    Usage:
+        fallback = create_provider("openai", model="qwen3", base_url="http://localhost:8000/v1", api_key="none")
+        provider = CircuitBreakerProvider(create_provider("ollama"), fallback=fallback, fallback_model="qwen3")
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        fallback: Optional[LLMProvider] = None,
+        fallback_model: Optional[str] = None,
+        failure_threshold: int = 5,
+        latency_threshold: Optional[float] = None,
+        recovery_timeout: float = 30.0,
+    ):
+        """
+        Args:
+            provider: Primary provider
+            fallback: Provider serving traffic while the primary's circuit is open
+            fallback_model: Model requested from the fallback (defaults to the caller's model)
+            failure_threshold: Consecutive failures that open the circuit
+            latency_threshold: Seconds after which a successful call still counts as a failure
+            recovery_timeout: Seconds the circuit stays open before a half-open probe
+        """
+        super().__init__(provider)
+        self.fallback = fallback
+        self.fallback_model = fallback_model
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"trips": 0, "fallback_calls": 0, "rejected": 0}
+
+    @property
+    def state(self) -> str:
+        """Current circuit state: ``closed``, ``open`` or ``half_open``."""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def _admit(self) -> bool:
+        """Whether this call may go to the primary; claims the probe slot when half-open."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                self._state = self.HALF_OPEN
+            if self._state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def _record(self, success: bool) -> None:
+        with self._lock:
+            self._probing = False
+            if success:
+                self._state = self.CLOSED
+                self._failures = 0
+                return
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.stats["trips"] += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    @staticmethod
+    def _counts_as_failure(error: BaseException) -> bool:
+        return isinstance(error, TimeoutError) or is_transient_error(error)
+
+    def _fallback_model(self, model: Optional[str]) -> Optional[str]:
+        return self.fallback_model or model
+
+    def _reject(self) -> CircuitOpenError:
+        with self._lock:
+            self.stats["rejected"] += 1
+        return CircuitOpenError("Backend unavailable (circuit open) and no fallback provider configured")
+
+    def _failover(self, model: Optional[str]) -> Optional[str]:
+        """Count a fallback call and return the model to request from the fallback."""
+        with self._lock:
+            self.stats["fallback_calls"] += 1
+        return self._fallback_model(model)
+
+    def _use_fallback(
+        self, method: str, prompt: str, model: Optional[str], options: Optional[GenerationOptions]
+    ) -> Any:
+        return getattr(self.fallback, method)(prompt, model=self._failover(model), options=options)
+
+    def generate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
+        """Generate on the primary while its circuit is closed, otherwise on the fallback."""
+        if not self._admit():
+            if self.fallback is None:
+                raise self._reject()
+            return self._use_fallback("generate", prompt, model, options)
+
+        started = time.monotonic()
+        try:
+            result = self.provider.generate(prompt, model=model, options=options)
+        except Exception as e:
+            if not self._counts_as_failure(e):
+                self._record(True)
+                raise
+            self._record(False)
+            if self.fallback is None:
+                raise
+            return self._use_fallback("generate", prompt, model, options)
+
+        elapsed = time.monotonic() - started
+        self._record(self.latency_threshold is None or elapsed <= self.latency_threshold)
+        return result
+
+    def generate_stream(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationStream:
+        """Stream from the primary while its circuit is closed, failing over before the first delta."""
+        return GenerationStream(self._stream(prompt, model, options))
+
+    def _stream(
+        self, prompt: str, model: Optional[str], options: Optional[GenerationOptions]
+    ) -> Generator[str, None, Optional[GenerationResult]]:
+        if not self._admit():
+            if self.fallback is None:
+                raise self._reject()
+            stream = self._use_fallback("generate_stream", prompt, model, options)
+            yield from stream
+            return getattr(stream, "result", None)
+
+        started = time.monotonic()
+        delivered = False
+        try:
+            stream = self.provider.generate_stream(prompt, model=model, options=options)
+            for delta in stream:
+                delivered = True
+                yield delta
+        except Exception as e:
+            if not self._counts_as_failure(e):
+                self._record(True)
+                raise
+            self._record(False)
+            if delivered or self.fallback is None:
+                raise
+            stream = self._use_fallback("generate_stream", prompt, model, options)
+            yield from stream
+            return getattr(stream, "result", None)
+        except GeneratorExit:
+            self._record(True)
+            raise
+
+        elapsed = time.monotonic() - started
+        self._record(self.latency_threshold is None or elapsed <= self.latency_threshold)
+        return getattr(stream, "result", None)
+
+    async def agenerate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
+        """Asyncio counterpart of :meth:`generate`."""
+        if not self._admit():
+            if self.fallback is None:
+                raise self._reject()
+            return await agenerate_with(self.fallback, prompt, self._failover(model), options)
+
+        started = time.monotonic()
+        try:
+            result = await agenerate_with(self.provider, prompt, model, options)
+        except asyncio.CancelledError:
+            self._record(True)
+            raise
+        except Exception as e:
+            if not self._counts_as_failure(e):
+                self._record(True)
+                raise
+            self._record(False)
+            if self.fallback is None:
+                raise
+            return await agenerate_with(self.fallback, prompt, self._failover(model), options)
+
+        elapsed = time.monotonic() - started
+        self._record(self.latency_threshold is None or elapsed <= self.latency_threshold)
+        return result
+
+    async def astream(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> AsyncIterator[str]:
+        """Asyncio counterpart of :meth:`generate_stream`."""
+        if self._admit():
+            started = time.monotonic()
+            delivered = False
+            stream = astream_with(self.provider, prompt, model, options)
+            try:
+                async for delta in stream:
+                    delivered = True
+                    yield delta
+            except Exception as e:
+                if not self._counts_as_failure(e):
+                    self._record(True)
+                    raise
+                self._record(False)
+                if delivered or self.fallback is None:
+                    raise
+            except (GeneratorExit, asyncio.CancelledError):
+                self._record(True)
+                raise
+            else:
+                elapsed = time.monotonic() - started
+                self._record(self.latency_threshold is None or elapsed <= self.latency_threshold)
+                return
+            finally:
+                await aclose_stream(stream)
+        elif self.fallback is None:
+            raise self._reject()
+
+        stream = astream_with(self.fallback, prompt, self._failover(model), options)
+        try:
+            async for delta in stream:
+                yield delta
+        finally:
+            await aclose_stream(stream)
+
+    async def aclose(self) -> None:
+        """Close the pooled async clients of the primary and the fallback."""
+        await super().aclose()
+        if self.fallback is not None and is_async_provider(self.fallback):
+            await self.fallback.aclose()
+
+    def is_available(self) -> bool:
+        """True when the primary or the fallback can serve requests."""
+        if self.state != self.OPEN and self.provider.is_available():
+            return True
+        return self.fallback is not None and self.fallback.is_available()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Circuit state and failover counters."""
+        with self._lock:
+            failures = self._failures
+        return {"state": self.state, "consecutive_failures": failures, **self.stats}
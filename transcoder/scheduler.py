@@ -0,0 +1,249 @@
+"""
+TransCoder Model-Affinity Scheduler
+
+Groups queued generations by model so a memory-constrained Ollama host
+drains one model's work before loading the next, instead of swapping
+weights on every request.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Generator, Iterator, Optional
+
+from transcoder.options import GenerationOptions
+from transcoder.providers import (
+    GenerationResult,
+    GenerationStream,
+    LLMProvider,
+    ProviderWrapper,
+    aclose_stream,
+    agenerate_with,
+    astream_with,
+    normalize_model_name,
+)
+
+
+class _Ticket:
+    """A queued request waiting for a slot."""
+
+    __slots__ = ("model", "enqueued", "admitted", "wake")
+
+    def __init__(self, model: str, wake: Optional[Callable[[], None]] = None):
+        self.model = model
+        self.enqueued = time.monotonic()
+        self.admitted = False
+        self.wake = wake
+
+
+class ModelAffinityScheduler:
+    """
+    Admit at most ``capacity`` concurrent generations, one model at a time.
+
+    Requests queue per model. While the active model has queued work it
+    keeps the slots. The scheduler switches models only after the active
+    model has drained its in-flight calls, and does so when the active
+    model's queue is empty, when it has been served ``max_batch`` times
+    since the last switch while others wait (the fairness bound), or when
+    another model's oldest request has waited ``max_wait`` seconds. On a
+    switch, the model with the oldest waiting request goes next.
+
+    Usage:
+        scheduler = ModelAffinityScheduler(capacity=4, max_batch=32, max_wait=10.0)
+        with scheduler.slot("qwen3:0.6b"):
+            client.generate(model="qwen3:0.6b", prompt=prompt)
+    """
+
+    def __init__(self, capacity: int = 1, max_batch: int = 32, max_wait: float = 10.0):
+        """
+        Args:
+            capacity: Concurrent generations admitted (the backend's parallelism)
+            max_batch: Requests served for one model before yielding to waiting models
+            max_wait: Seconds a request may wait before forcing a switch to its model
+        """
+        self.capacity = max(1, capacity)
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.active_model: Optional[str] = None
+        self._queues: "OrderedDict[str, Deque[_Ticket]]" = OrderedDict()
+        self._in_flight = 0
+        self._served = 0
+        self._condition = threading.Condition()
+        self.switches = 0
+
+    def _others_waiting(self) -> Dict[str, float]:
+        """Oldest enqueue time of every waiting model other than the active one."""
+        return {
+            model: queue[0].enqueued for model, queue in self._queues.items() if queue and model != self.active_model
+        }
+
+    def _should_switch(self, others: Dict[str, float]) -> bool:
+        if not others:
+            return False
+        if self._served >= self.max_batch:
+            return True
+        return time.monotonic() - min(others.values()) >= self.max_wait
+
+    def _dispatch(self) -> None:
+        """Admit queued tickets into free slots (caller holds the condition)."""
+        admitted = False
+        while self._in_flight < self.capacity:
+            active_queue = self._queues.get(self.active_model) if self.active_model else None
+            others = self._others_waiting()
+            # A freshly switched-to model is always served at least once.
+            if active_queue and (self._served == 0 or not self._should_switch(others)):
+                ticket = active_queue.popleft()
+                ticket.admitted = True
+                if ticket.wake is not None:
+                    ticket.wake()
+                self._in_flight += 1
+                self._served += 1
+                admitted = True
+                continue
+
+            candidates = others or {m: q[0].enqueued for m, q in self._queues.items() if q}
+            if not candidates or self._in_flight > 0:
+                # Nothing queued, or the active model is still draining.
+                break
+            next_model = min(candidates, key=candidates.get)
+            if next_model != self.active_model:
+                self.switches += 1
+            self.active_model = next_model
+            self._served = 0
+
+        if admitted:
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, model: str) -> Iterator[None]:
+        """Block until a slot for ``model`` is granted; release it on exit."""
+        ticket = _Ticket(normalize_model_name(model))
+        with self._condition:
+            self._queues.setdefault(ticket.model, deque()).append(ticket)
+            self._dispatch()
+            try:
+                while not ticket.admitted:
+                    # Wake up periodically so max_wait can force a switch while slots are busy.
+                    self._condition.wait(timeout=self.max_wait)
+                    self._dispatch()
+            except BaseException:
+                if not ticket.admitted:
+                    self._queues[ticket.model].remove(ticket)
+                    raise
+                self._in_flight -= 1
+                self._dispatch()
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def aslot(self, model: str) -> AsyncIterator[None]:
+        """Asyncio counterpart of :meth:`slot`; waits without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        granted = asyncio.Event()
+        ticket = _Ticket(normalize_model_name(model), wake=lambda: loop.call_soon_threadsafe(granted.set))
+        with self._condition:
+            self._queues.setdefault(ticket.model, deque()).append(ticket)
+            self._dispatch()
+        try:
+            while not ticket.admitted:
+                try:
+                    await asyncio.wait_for(granted.wait(), self.max_wait)
+                except asyncio.TimeoutError:
+                    with self._condition:
+                        self._dispatch()
+        except BaseException:
+            with self._condition:
+                if not ticket.admitted:
+                    self._queues[ticket.model].remove(ticket)
+                    raise
+            self._release()
+            raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._dispatch()
+            self._condition.notify_all()
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Number of queued (not yet admitted) requests per model."""
+        with self._condition:
+            return {model: len(queue) for model, queue in self._queues.items() if queue}
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Active model, slot usage, queue depth per model and switch count."""
+        with self._condition:
+            return {
+                "active_model": self.active_model,
+                "in_flight": self._in_flight,
+                "capacity": self.capacity,
+                "queue_depth": {model: len(queue) for model, queue in self._queues.items() if queue},
+                "switches": self.switches,
+            }
+
+
+class ScheduledProvider(ProviderWrapper):
+    """
+    Route a provider's generations through a :class:`ModelAffinityScheduler`.
+
+    Streams hold their slot until they are exhausted or closed.
+    """
+
+    def __init__(self, provider: LLMProvider, scheduler: Optional[ModelAffinityScheduler] = None, **kwargs: Any):
+        """
+        Args:
+            provider: Provider to wrap
+            scheduler: Shared scheduler (by default one sized to the provider's parallelism)
+            **kwargs: ``max_batch`` / ``max_wait`` for the default scheduler
+        """
+        super().__init__(provider)
+        self.scheduler = scheduler or ModelAffinityScheduler(capacity=provider.parallelism, **kwargs)
+
+    def generate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
+        """Generate once the scheduler grants a slot for the model."""
+        with self.scheduler.slot(model or self.default_model):
+            return self.provider.generate(prompt, model=model, options=options)
+
+    def generate_stream(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationStream:
+        """Stream once the scheduler grants a slot for the model."""
+        return GenerationStream(self._stream(prompt, model, options))
+
+    def _stream(
+        self, prompt: str, model: Optional[str], options: Optional[GenerationOptions]
+    ) -> Generator[str, None, Optional[GenerationResult]]:
+        with self.scheduler.slot(model or self.default_model):
+            stream = self.provider.generate_stream(prompt, model=model, options=options)
+            yield from stream
+            return getattr(stream, "result", None)
+
+    async def agenerate(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> GenerationResult:
+        """Asyncio counterpart of :meth:`generate`."""
+        async with self.scheduler.aslot(model or self.default_model):
+            return await agenerate_with(self.provider, prompt, model, options)
+
+    async def astream(
+        self, prompt: str, model: Optional[str] = None, options: Optional[GenerationOptions] = None
+    ) -> AsyncIterator[str]:
+        """Asyncio counterpart of :meth:`generate_stream`."""
+        async with self.scheduler.aslot(model or self.default_model):
+            stream = astream_with(self.provider, prompt, model, options)
+            try:
+                async for delta in stream:
+                    yield delta
+            finally:
+                await aclose_stream(stream)
@@ -0,0 +1,115 @@
+"""
+TransCoder Document Segmentation
+
+Splits long documents into sentence-aligned segments (CJK and Latin
+punctuation alike) that can be translated independently, and reassembles
+translated segments with the original whitespace and paragraph structure.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+from transcoder.options import estimate_tokens
+
+# Paragraph breaks: a newline followed by optional whitespace and another newline.
+_PARAGRAPH_BREAK = re.compile(r"\n[^\S\n]*\n\s*")
+# Sentence ends: CJK terminators need no following space; Latin ones do.
+# Closing quotes and brackets stay with the sentence they end.
+_SENTENCE_END = re.compile(r"(?:[。！？；…]+|[.!?]+(?=\s)|\n)[”’」』）)\]\"']*\s*")
+
+# Target languages written without spaces between sentences.
+_UNSPACED_LANGS = ("zh-cn", "zh-tw", "zh-classical-cn", "zh-classical-tw", "ja")
+
+
+@dataclass
+class Segment:
+    """A translatable piece of a document and the whitespace that follows it."""
+
+    text: str
+    trailing: str = ""
+    paragraph: int = 0
+
+
+@dataclass
+class Document:
+    """A document split into segments; ``leading`` is whitespace before the first one."""
+
+    segments: List[Segment] = field(default_factory=list)
+    leading: str = ""
+
+    def assemble(self, texts: Sequence[Optional[str]], target_lang: Optional[str] = None) -> str:
+        """
+        Join translated ``texts`` (aligned with :attr:`segments`) with the original whitespace.
+
+        A missing translation (None) keeps the source segment. Line breaks
+        are always preserved; spaces between sentences are dropped for
+        Chinese and Japanese targets and added where an unspaced (CJK)
+        source joined sentences directly.
+        """
+        parts = [self.leading]
+        for index, (segment, text) in enumerate(zip(self.segments, texts)):
+            parts.append(segment.text if text is None else text)
+            parts.append(_separator(segment, index == len(self.segments) - 1, target_lang))
+        return "".join(parts)
+
+
+def _separator(segment: Segment, last: bool, target_lang: Optional[str]) -> str:
+    trailing = segment.trailing
+    if last or target_lang is None or "\n" in trailing:
+        return trailing
+    if target_lang in _UNSPACED_LANGS:
+        return ""
+    return trailing or " "
+
+
+def split_sentences(paragraph: str) -> List[str]:
+    """Split a paragraph into sentences, each keeping its trailing whitespace."""
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(paragraph):
+        sentences.append(paragraph[start : match.end()])
+        start = match.end()
+    if start < len(paragraph):
+        sentences.append(paragraph[start:])
+    return [sentence for sentence in sentences if sentence]
+
+
+def segment_document(text: str, max_tokens: int = 300) -> Document:
+    """
+    Split ``text`` into segments of whole sentences.
+
+    Consecutive sentences of a paragraph are merged while the segment stays
+    within ``max_tokens`` estimated tokens, so segments are neither tiny
+    nor larger than a small model handles comfortably; a single longer
+    sentence becomes its own segment. Segments never span paragraphs.
+    """
+    stripped = text.lstrip()
+    document = Document(leading=text[: len(text) - len(stripped)])
+
+    position = 0
+    paragraphs = []
+    for match in _PARAGRAPH_BREAK.finditer(stripped):
+        paragraphs.append((stripped[position : match.start()], match.group()))
+        position = match.end()
+    paragraphs.append((stripped[position:], ""))
+
+    for number, (paragraph, separator) in enumerate(paragraphs):
+        current = ""
+        for sentence in split_sentences(paragraph):
+            if current and estimate_tokens(current + sentence) > max_tokens:
+                document.segments.append(_segment(current, number))
+                current = ""
+            current += sentence
+        if current:
+            segment = _segment(current, number)
+            segment.trailing += separator
+            document.segments.append(segment)
+        elif document.segments:
+            document.segments[-1].trailing += separator
+    return document
+
+
+def _segment(text: str, paragraph: int) -> Segment:
+    content = text.rstrip()
+    return Segment(text=content, trailing=text[len(content) :], paragraph=paragraph)
@@ -0,0 +1,138 @@
+"""
+TransCoder Streaming Helpers
+
+Utilities shared by the streaming translation paths.
+"""
+
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+def multiplex(
+    sources: List[Callable[[], Iterable[T]]],
+    max_workers: Optional[int] = None,
+    on_error: Optional[Callable[[int, Exception], T]] = None,
+) -> Iterator[T]:
+    """
+    Run several generators concurrently and interleave their items.
+
+    Each entry in ``sources`` is a zero-argument callable returning an
+    iterable; it is consumed on its own worker thread and items are yielded
+    in arrival order. Closing the returned generator (e.g. on client
+    disconnect) stops every producer at its next item.
+
+    Args:
+        sources: Factories for the iterables to consume
+        max_workers: Concurrent producers (defaults to one per source)
+        on_error: Maps ``(source_index, exception)`` to an item to yield
+            when a producer raises; the exception is re-raised if omitted
+    """
+    if not sources:
+        return
+
+    items: "queue.Queue" = queue.Queue()
+    stopped = threading.Event()
+
+    def produce(index: int) -> None:
+        try:
+            for item in sources[index]():
+                if stopped.is_set():
+                    break
+                items.put((index, item, None))
+        except Exception as e:
+            items.put((index, None, e))
+        finally:
+            items.put((index, _DONE, None))
+
+    executor = ThreadPoolExecutor(max_workers=max_workers or len(sources), thread_name_prefix="transcoder-stream")
+    try:
+        for index in range(len(sources)):
+            executor.submit(produce, index)
+
+        remaining = len(sources)
+        while remaining:
+            index, item, error = items.get()
+            if item is _DONE:
+                remaining -= 1
+            elif error is not None:
+                if on_error is None:
+                    raise error
+                yield on_error(index, error)
+            else:
+                yield item
+    finally:
+        stopped.set()
+        executor.shutdown(wait=False)
+
+
+class DeltaFramer:
+    """
+    Coalesce streamed text deltas into delta-only frames.
+
+    Frames carry only new text plus its character ``offset`` in the full
+    output, so total payload stays linear in output length. Tiny deltas are
+    buffered until ``frame_size`` characters or ``frame_age`` seconds have
+    accumulated. Every ``checksum_every`` frames (and on the final frame)
+    a running CRC32 of the UTF-8 text so far is attached for verification.
+
+    Usage:
+        framer = DeltaFramer(frame_size=32, frame_age=0.05)
+        for delta in deltas:
+            frame = framer.push(delta)
+            if frame:
+                send(frame)
+        frame = framer.flush(final=True)
+    """
+
+    def __init__(self, frame_size: int = 32, frame_age: float = 0.05, checksum_every: int = 16):
+        self.frame_size = frame_size
+        self.frame_age = frame_age
+        self.checksum_every = checksum_every
+        self.offset = 0
+        self.seq = 0
+        self.checksum = 0
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._buffer_started = 0.0
+
+    def push(self, delta: str) -> Optional[dict]:
+        """Buffer a delta; return a frame once the size or age bound is reached."""
+        if not delta:
+            return None
+        if not self._buffer:
+            self._buffer_started = time.monotonic()
+        self._buffer.append(delta)
+        self._buffered += len(delta)
+
+        # The first frame goes out immediately to keep time-to-first-token low.
+        if self.seq == 0 or self._buffered >= self.frame_size:
+            return self.flush()
+        if time.monotonic() - self._buffer_started >= self.frame_age:
+            return self.flush()
+        return None
+
+    def flush(self, final: bool = False) -> Optional[dict]:
+        """Emit buffered text as a frame, if any."""
+        if not self._buffer:
+            return None
+
+        content = "".join(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+
+        frame = {"content": content, "offset": self.offset, "seq": self.seq}
+        self.offset += len(content)
+        self.seq += 1
+        self.checksum = zlib.crc32(content.encode("utf-8"), self.checksum)
+
+        if final or (self.checksum_every and self.seq % self.checksum_every == 0):
+            frame["checksum"] = f"{self.checksum:08x}"
+        return frame
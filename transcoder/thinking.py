@@ -0,0 +1,150 @@
+"""
+TransCoder Reasoning Control
+
+Helpers for reasoning models (e.g. Qwen3) that emit a ``<think>...</think>``
+block before their answer: per-stage suppression settings, removal of
+think blocks from complete and streamed output, and an estimate of the
+reasoning tokens saved by suppression.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+# Qwen3's soft switch; appended to prompts for backends without a think flag.
+NO_THINK_DIRECTIVE = "/no_think"
+
+STAGES = ("translate", "reflect", "improve")
+
+
+def honours_no_think(model: Optional[str]) -> bool:
+    """True for Qwen3-family models, which read :data:`NO_THINK_DIRECTIVE` as a switch rather than as text."""
+    return bool(model) and "qwen3" in model.lower()
+
+
+def parse_no_think(spec: str) -> Dict[str, bool]:
+    """Parse ``"translate,improve"`` (or ``"all"``) into a per-stage ``think`` mapping."""
+    stages: Iterable[str] = STAGES if spec.strip() == "all" else (s.strip() for s in spec.split(","))
+    return {stage: False for stage in stages if stage in STAGES}
+
+
+def _partial_tag(text: str, tag: str) -> int:
+    """Length of the longest suffix of ``text`` that is a proper prefix of ``tag``."""
+    for size in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:size]):
+            return size
+    return 0
+
+
+class ThinkingFilter:
+    """
+    Remove think blocks from text arriving in pieces.
+
+    Tags split across deltas are handled by holding back a trailing partial
+    tag until the next delta. Whitespace between a think block and the
+    answer is dropped. Reasoning text is collected in :attr:`reasoning`.
+
+    Usage:
+        thinking = ThinkingFilter()
+        for delta in stream:
+            visible = thinking.feed(delta)
+            if visible:
+                send(visible)
+        send(thinking.flush())
+    """
+
+    def __init__(self):
+        self.inside = False
+        self._pending = ""
+        self._visible_started = False
+        self._reasoning: List[str] = []
+
+    @property
+    def reasoning(self) -> str:
+        """Reasoning text removed so far."""
+        return "".join(self._reasoning)
+
+    def _emit(self, text: str, out: List[str]) -> None:
+        if self.inside:
+            self._reasoning.append(text)
+            return
+        if not self._visible_started:
+            text = text.lstrip()
+            self._visible_started = bool(text)
+        out.append(text)
+
+    def feed(self, delta: str) -> str:
+        """Consume a delta and return its visible part (possibly empty)."""
+        text = self._pending + delta
+        self._pending = ""
+        out: List[str] = []
+        while text:
+            tag = THINK_CLOSE if self.inside else THINK_OPEN
+            index = text.find(tag)
+            if index < 0:
+                keep = _partial_tag(text, tag)
+                self._emit(text[: len(text) - keep], out)
+                self._pending = text[len(text) - keep :]
+                break
+            self._emit(text[:index], out)
+            text = text[index + len(tag) :]
+            self.inside = not self.inside
+            if not self.inside:
+                # The answer starts after the block; drop the separating whitespace.
+                self._visible_started = False
+        return "".join(out)
+
+    def flush(self) -> str:
+        """Release held-back text at the end of the stream; an unterminated block stays removed."""
+        pending, self._pending = self._pending, ""
+        out: List[str] = []
+        if pending:
+            self._emit(pending, out)
+        return "".join(out)
+
+
+def strip_thinking(text: str) -> Tuple[str, str]:
+    """Split ``text`` into its visible answer and the reasoning removed from it."""
+    thinking = ThinkingFilter()
+    visible = thinking.feed(text) + thinking.flush()
+    return visible, thinking.reasoning
+
+
+class ThinkingSavings:
+    """
+    Estimate the reasoning tokens saved by turning thinking off.
+
+    Generations that ran with thinking on record how many reasoning tokens
+    a model spends on average; every generation with thinking off is then
+    credited that average. Until a model has been seen thinking, its
+    savings are unknown (None).
+
+    Usage:
+        savings = ThinkingSavings()
+        savings.record("qwen3:0.6b", think=None, thinking_tokens=420)
+        savings.record("qwen3:0.6b", think=False, thinking_tokens=0)  # 420
+        savings.saved  # 420
+    """
+
+    def __init__(self):
+        self.saved = 0
+        self._observed: Dict[Optional[str], Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def estimate(self, model: Optional[str]) -> Optional[int]:
+        """Average reasoning tokens per generation seen for ``model``, if any."""
+        count, total = self._observed.get(model, (0, 0))
+        return round(total / count) if count else None
+
+    def record(self, model: Optional[str], think: Optional[bool], thinking_tokens: int) -> Optional[int]:
+        """Record one generation; returns the tokens it saved when thinking was off."""
+        with self._lock:
+            if think is False:
+                saved = self.estimate(model)
+                self.saved += saved or 0
+                return saved
+            count, total = self._observed.get(model, (0, 0))
+            self._observed[model] = (count + 1, total + thinking_tokens)
+            return None